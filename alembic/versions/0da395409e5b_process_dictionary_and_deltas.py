@@ -0,0 +1,95 @@
+"""process_dictionary_and_deltas
+
+Revision ID: 0da395409e5b
+Revises: 25d2a487f1ba
+Create Date: 2026-10-17 19:13:01.029802
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0da395409e5b'
+down_revision = '25d2a487f1ba'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('process_name',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('process_status',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('status')
+    )
+    with op.batch_alter_table('process_info', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('name_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('status_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('departed', sa.Boolean(), nullable=False, server_default=sa.false()))
+        batch_op.add_column(sa.Column('is_keyframe', sa.Boolean(), nullable=False, server_default=sa.false()))
+        batch_op.create_foreign_key('fk_process_info_status_id', 'process_status', ['status_id'], ['id'])
+        batch_op.create_foreign_key('fk_process_info_name_id', 'process_name', ['name_id'], ['id'])
+
+    # 已有记录的名称和状态写入字典表；迁移前每次采集都保存了完整排行，全部标记为关键帧
+    op.execute(
+        "INSERT INTO process_name (name) "
+        "SELECT DISTINCT COALESCE(name, '') FROM process_info"
+    )
+    op.execute(
+        "INSERT INTO process_status (status) "
+        "SELECT DISTINCT COALESCE(status, '') FROM process_info"
+    )
+    op.execute(
+        "UPDATE process_info SET "
+        "name_id = (SELECT process_name.id FROM process_name WHERE process_name.name = COALESCE(process_info.name, '')), "
+        "status_id = (SELECT process_status.id FROM process_status "
+        "WHERE process_status.status = COALESCE(process_info.status, '')), "
+        "is_keyframe = 1"
+    )
+
+    with op.batch_alter_table('process_info', schema=None) as batch_op:
+        batch_op.drop_index('ix_process_info_timestamp_cpu')
+        batch_op.drop_index('ix_process_info_timestamp_memory')
+        batch_op.create_index(
+            'ix_process_info_keyframe_timestamp', ['timestamp'], unique=False,
+            sqlite_where=sa.text('is_keyframe = 1'), postgresql_where=sa.text('is_keyframe')
+        )
+        batch_op.create_index(batch_op.f('ix_process_info_timestamp'), ['timestamp'], unique=False)
+        batch_op.drop_column('status')
+        batch_op.drop_column('name')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('process_info', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('name', sa.VARCHAR(length=100), nullable=True))
+        batch_op.add_column(sa.Column('status', sa.VARCHAR(length=50), nullable=True))
+
+    # 旧结构的每次采集都是完整排行：还原名称和状态，删除离开排行的标记记录（增量记录无法还原为完整排行）
+    op.execute(
+        "UPDATE process_info SET "
+        "name = (SELECT process_name.name FROM process_name WHERE process_name.id = process_info.name_id), "
+        "status = (SELECT process_status.status FROM process_status WHERE process_status.id = process_info.status_id)"
+    )
+    op.execute("DELETE FROM process_info WHERE departed = 1")
+
+    with op.batch_alter_table('process_info', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_process_info_name_id', type_='foreignkey')
+        batch_op.drop_constraint('fk_process_info_status_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_process_info_timestamp'))
+        batch_op.drop_index('ix_process_info_keyframe_timestamp')
+        batch_op.create_index('ix_process_info_timestamp_memory', ['timestamp', 'memory_percent'], unique=False)
+        batch_op.create_index('ix_process_info_timestamp_cpu', ['timestamp', 'cpu_percent'], unique=False)
+        batch_op.drop_column('is_keyframe')
+        batch_op.drop_column('departed')
+        batch_op.drop_column('status_id')
+        batch_op.drop_column('name_id')
+
+    op.drop_table('process_status')
+    op.drop_table('process_name')
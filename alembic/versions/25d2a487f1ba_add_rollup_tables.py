@@ -0,0 +1,203 @@
+"""add_rollup_tables
+
+Revision ID: 25d2a487f1ba
+Revises: bd916d50b4e0
+Create Date: 2026-10-17 19:01:25.958632
+
+"""
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '25d2a487f1ba'
+down_revision = 'bd916d50b4e0'
+branch_labels = None
+depends_on = None
+
+# 汇总粒度（秒）到表名后缀的映射
+RESOLUTIONS = {60: '1m', 300: '5m', 3600: '1h'}
+EPOCH = datetime(1970, 1, 1)
+
+
+def _bucket(timestamp, resolution: int) -> datetime:
+    """时间所在时间桶的起点"""
+    seconds = int((timestamp - EPOCH).total_seconds())
+    return EPOCH + timedelta(seconds=seconds - seconds % resolution)
+
+
+def _backfill(source: str, key_column, fields, target_prefix: str) -> None:
+    """根据已有的原始数据生成各粒度的汇总数据"""
+    bind = op.get_bind()
+    columns = ['timestamp'] + ([key_column] if key_column else []) + list(fields)
+    result = bind.execute(sa.text(
+        f"SELECT {', '.join(columns)} FROM {source} WHERE timestamp IS NOT NULL ORDER BY timestamp"
+    ))
+    buckets = {resolution: {} for resolution in RESOLUTIONS}
+    for row in result:
+        timestamp = row[0]
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        key = row[1] if key_column else None
+        values = row[2:] if key_column else row[1:]
+        for resolution, aggregates in buckets.items():
+            bucket_key = (_bucket(timestamp, resolution), key)
+            aggregate = aggregates.get(bucket_key)
+            if aggregate is None:
+                aggregate = aggregates[bucket_key] = {'count': 0}
+                for field in fields:
+                    aggregate[f'{field}_min'] = aggregate[f'{field}_max'] = None
+                    aggregate[f'{field}_sum'] = 0.0
+            aggregate['count'] += 1
+            for field, value in zip(fields, values):
+                value = value or 0.0
+                current_min = aggregate[f'{field}_min']
+                current_max = aggregate[f'{field}_max']
+                aggregate[f'{field}_min'] = value if current_min is None else min(current_min, value)
+                aggregate[f'{field}_max'] = value if current_max is None else max(current_max, value)
+                aggregate[f'{field}_sum'] += value
+
+    for resolution, aggregates in buckets.items():
+        table = sa.table(
+            f'{target_prefix}_{RESOLUTIONS[resolution]}',
+            *[sa.column(name) for name in ['timestamp', 'count'] + ([key_column] if key_column else [])],
+            *[sa.column(f'{field}_{suffix}') for field in fields for suffix in ('min', 'max', 'sum')]
+        )
+        rows = []
+        for (bucket, key), aggregate in aggregates.items():
+            row = dict(aggregate, timestamp=bucket)
+            if key_column:
+                row[key_column] = key
+            rows.append(row)
+        if rows:
+            op.bulk_insert(table, rows)
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('disk_rollup_1h',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('device', sa.String(length=100), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('percent_min', sa.Float(), nullable=True),
+    sa.Column('percent_max', sa.Float(), nullable=True),
+    sa.Column('percent_sum', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('disk_rollup_1h', schema=None) as batch_op:
+        batch_op.create_index('ix_disk_rollup_1h_device_timestamp', ['device', 'timestamp'], unique=True)
+        batch_op.create_index(batch_op.f('ix_disk_rollup_1h_timestamp'), ['timestamp'], unique=False)
+
+    op.create_table('disk_rollup_1m',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('device', sa.String(length=100), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('percent_min', sa.Float(), nullable=True),
+    sa.Column('percent_max', sa.Float(), nullable=True),
+    sa.Column('percent_sum', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('disk_rollup_1m', schema=None) as batch_op:
+        batch_op.create_index('ix_disk_rollup_1m_device_timestamp', ['device', 'timestamp'], unique=True)
+        batch_op.create_index(batch_op.f('ix_disk_rollup_1m_timestamp'), ['timestamp'], unique=False)
+
+    op.create_table('disk_rollup_5m',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('device', sa.String(length=100), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('percent_min', sa.Float(), nullable=True),
+    sa.Column('percent_max', sa.Float(), nullable=True),
+    sa.Column('percent_sum', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('disk_rollup_5m', schema=None) as batch_op:
+        batch_op.create_index('ix_disk_rollup_5m_device_timestamp', ['device', 'timestamp'], unique=True)
+        batch_op.create_index(batch_op.f('ix_disk_rollup_5m_timestamp'), ['timestamp'], unique=False)
+
+    op.create_table('system_rollup_1h',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('cpu_percent_min', sa.Float(), nullable=True),
+    sa.Column('cpu_percent_max', sa.Float(), nullable=True),
+    sa.Column('cpu_percent_sum', sa.Float(), nullable=True),
+    sa.Column('memory_percent_min', sa.Float(), nullable=True),
+    sa.Column('memory_percent_max', sa.Float(), nullable=True),
+    sa.Column('memory_percent_sum', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('system_rollup_1h', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_system_rollup_1h_timestamp'), ['timestamp'], unique=True)
+
+    op.create_table('system_rollup_1m',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('cpu_percent_min', sa.Float(), nullable=True),
+    sa.Column('cpu_percent_max', sa.Float(), nullable=True),
+    sa.Column('cpu_percent_sum', sa.Float(), nullable=True),
+    sa.Column('memory_percent_min', sa.Float(), nullable=True),
+    sa.Column('memory_percent_max', sa.Float(), nullable=True),
+    sa.Column('memory_percent_sum', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('system_rollup_1m', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_system_rollup_1m_timestamp'), ['timestamp'], unique=True)
+
+    op.create_table('system_rollup_5m',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('cpu_percent_min', sa.Float(), nullable=True),
+    sa.Column('cpu_percent_max', sa.Float(), nullable=True),
+    sa.Column('cpu_percent_sum', sa.Float(), nullable=True),
+    sa.Column('memory_percent_min', sa.Float(), nullable=True),
+    sa.Column('memory_percent_max', sa.Float(), nullable=True),
+    sa.Column('memory_percent_sum', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('system_rollup_5m', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_system_rollup_5m_timestamp'), ['timestamp'], unique=True)
+
+    # ### end Alembic commands ###
+
+    # 已有的原始数据生成汇总数据
+    _backfill('system_info', None, ('cpu_percent', 'memory_percent'), 'system_rollup')
+    _backfill('disk_info', 'device', ('percent',), 'disk_rollup')
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('system_rollup_5m', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_system_rollup_5m_timestamp'))
+
+    op.drop_table('system_rollup_5m')
+    with op.batch_alter_table('system_rollup_1m', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_system_rollup_1m_timestamp'))
+
+    op.drop_table('system_rollup_1m')
+    with op.batch_alter_table('system_rollup_1h', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_system_rollup_1h_timestamp'))
+
+    op.drop_table('system_rollup_1h')
+    with op.batch_alter_table('disk_rollup_5m', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_disk_rollup_5m_timestamp'))
+        batch_op.drop_index('ix_disk_rollup_5m_device_timestamp')
+
+    op.drop_table('disk_rollup_5m')
+    with op.batch_alter_table('disk_rollup_1m', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_disk_rollup_1m_timestamp'))
+        batch_op.drop_index('ix_disk_rollup_1m_device_timestamp')
+
+    op.drop_table('disk_rollup_1m')
+    with op.batch_alter_table('disk_rollup_1h', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_disk_rollup_1h_timestamp'))
+        batch_op.drop_index('ix_disk_rollup_1h_device_timestamp')
+
+    op.drop_table('disk_rollup_1h')
+    # ### end Alembic commands ###
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""load_average_columns
+
+Revision ID: 47f139ee31f2
+Revises: 0da395409e5b
+Create Date: 2026-10-17 19:19:23.634287
+
+"""
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '47f139ee31f2'
+down_revision = '0da395409e5b'
+branch_labels = None
+depends_on = None
+
+# 回填时每批读取和更新的行数
+BATCH_SIZE = 5000
+# 汇总粒度（秒）到表名后缀的映射
+RESOLUTIONS = {60: '1m', 300: '5m', 3600: '1h'}
+LOAD_FIELDS = ('load_avg_1', 'load_avg_5', 'load_avg_15')
+EPOCH = datetime(1970, 1, 1)
+
+system_info = sa.table(
+    'system_info',
+    sa.column('id', sa.Integer),
+    sa.column('timestamp', sa.DateTime),
+    sa.column('load_average', sa.String),
+    *[sa.column(field, sa.Float) for field in LOAD_FIELDS]
+)
+
+
+def _rollup_table(resolution: int):
+    """汇总表中时间桶、样本数和平均负载相关的列"""
+    return sa.table(
+        f'system_rollup_{RESOLUTIONS[resolution]}',
+        sa.column('timestamp', sa.DateTime),
+        sa.column('count', sa.Integer),
+        *[sa.column(f'{field}_{suffix}', sa.Float) for field in LOAD_FIELDS for suffix in ('min', 'max', 'sum')]
+    )
+
+
+def _bucket(timestamp, resolution: int) -> datetime:
+    """时间所在时间桶的起点"""
+    seconds = int((timestamp - EPOCH).total_seconds())
+    return EPOCH + timedelta(seconds=seconds - seconds % resolution)
+
+
+def _parse_load_average(value):
+    """解析旧的字符串形式的平均负载（如 "(0.5, 0.4, 0.3)"），无法解析时返回三个None"""
+    parts = (value or '').strip('()[] ').split(',')
+    if len(parts) != 3:
+        return None, None, None
+    try:
+        return tuple(float(part) for part in parts)
+    except ValueError:
+        return None, None, None
+
+
+def _backfill_load_columns() -> None:
+    """按主键分批把字符串形式的平均负载写入三个数值列"""
+    bind = op.get_bind()
+    update = system_info.update().where(system_info.c.id == sa.bindparam('row_id')).values(
+        **{field: sa.bindparam(field) for field in LOAD_FIELDS}
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(system_info.c.id, system_info.c.load_average)
+            .where(system_info.c.id > last_id, system_info.c.load_average.isnot(None))
+            .order_by(system_info.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        bind.execute(update, [
+            dict(zip(LOAD_FIELDS, _parse_load_average(load_average)), row_id=row_id)
+            for row_id, load_average in rows
+        ])
+        last_id = rows[-1][0]
+
+
+def _backfill_rollups() -> None:
+    """根据仍保留的原始数据填充各粒度汇总表的平均负载
+
+    汇总数据的保留时间比原始数据长，原始数据已删除的时间桶保持为空；原始数据只剩一部分的时间桶
+    按剩余样本的平均值乘以时间桶的样本数估算合计，使 合计 / 样本数 仍为平均值。
+    """
+    bind = op.get_bind()
+    buckets = {resolution: {} for resolution in RESOLUTIONS}
+    result = bind.execute(
+        sa.select(system_info.c.timestamp, *[system_info.c[field] for field in LOAD_FIELDS])
+        .where(system_info.c.timestamp.isnot(None))
+        .order_by(system_info.c.timestamp)
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    for row in result:
+        values = [value or 0.0 for value in row[1:]]
+        for resolution, aggregates in buckets.items():
+            aggregate = aggregates.get(_bucket(row[0], resolution))
+            if aggregate is None:
+                aggregates[_bucket(row[0], resolution)] = [1, list(values), list(values), list(values)]
+                continue
+            aggregate[0] += 1
+            for index, value in enumerate(values):
+                aggregate[1][index] = min(aggregate[1][index], value)
+                aggregate[2][index] = max(aggregate[2][index], value)
+                aggregate[3][index] += value
+
+    for resolution, aggregates in buckets.items():
+        table = _rollup_table(resolution)
+        counts = dict(bind.execute(sa.select(table.c.timestamp, table.c.count)).all())
+        update = table.update().where(table.c.timestamp == sa.bindparam('bucket')).values(**{
+            f'{field}_{suffix}': sa.bindparam(f'{field}_{suffix}')
+            for field in LOAD_FIELDS for suffix in ('min', 'max', 'sum')
+        })
+        rows = []
+        for bucket, (samples, minimums, maximums, sums) in aggregates.items():
+            count = counts.get(bucket)
+            if not count:
+                continue
+            row = {'bucket': bucket}
+            for index, field in enumerate(LOAD_FIELDS):
+                row[f'{field}_min'] = minimums[index]
+                row[f'{field}_max'] = maximums[index]
+                row[f'{field}_sum'] = sums[index] * count / samples
+            rows.append(row)
+        for offset in range(0, len(rows), BATCH_SIZE):
+            bind.execute(update, rows[offset:offset + BATCH_SIZE])
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('system_info', schema=None) as batch_op:
+        for field in LOAD_FIELDS:
+            batch_op.add_column(sa.Column(field, sa.Float(), nullable=True))
+
+    _backfill_load_columns()
+
+    with op.batch_alter_table('system_info', schema=None) as batch_op:
+        batch_op.drop_column('load_average')
+
+    for suffix in RESOLUTIONS.values():
+        with op.batch_alter_table(f'system_rollup_{suffix}', schema=None) as batch_op:
+            for field in LOAD_FIELDS:
+                batch_op.add_column(sa.Column(f'{field}_min', sa.Float(), nullable=True))
+                batch_op.add_column(sa.Column(f'{field}_max', sa.Float(), nullable=True))
+                batch_op.add_column(sa.Column(f'{field}_sum', sa.Float(), nullable=True))
+
+    _backfill_rollups()
+
+
+def downgrade() -> None:
+    for suffix in RESOLUTIONS.values():
+        with op.batch_alter_table(f'system_rollup_{suffix}', schema=None) as batch_op:
+            for field in reversed(LOAD_FIELDS):
+                batch_op.drop_column(f'{field}_sum')
+                batch_op.drop_column(f'{field}_max')
+                batch_op.drop_column(f'{field}_min')
+
+    with op.batch_alter_table('system_info', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('load_average', sa.VARCHAR(length=100), nullable=True))
+
+    # 还原为旧版本写入的 str(tuple) 格式
+    bind = op.get_bind()
+    update = system_info.update().where(system_info.c.id == sa.bindparam('row_id')).values(
+        load_average=sa.bindparam('value')
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(system_info.c.id, *[system_info.c[field] for field in LOAD_FIELDS])
+            .where(system_info.c.id > last_id)
+            .order_by(system_info.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(update, [
+            {'row_id': row[0], 'value': str(tuple(row[1:])) if row[1] is not None else None}
+            for row in rows
+        ])
+        last_id = rows[-1][0]
+
+    with op.batch_alter_table('system_info', schema=None) as batch_op:
+        for field in reversed(LOAD_FIELDS):
+            batch_op.drop_column(field)
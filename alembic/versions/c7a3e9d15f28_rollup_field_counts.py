@@ -0,0 +1,50 @@
+"""rollup_field_counts
+
+Revision ID: c7a3e9d15f28
+Revises: 47f139ee31f2
+Create Date: 2026-10-17 20:05:41.218306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a3e9d15f28'
+down_revision = '47f139ee31f2'
+branch_labels = None
+depends_on = None
+
+# 汇总表名到各字段的映射
+ROLLUP_FIELDS = {
+    **{
+        f'system_rollup_{suffix}': ('cpu_percent', 'memory_percent', 'load_avg_1', 'load_avg_5', 'load_avg_15')
+        for suffix in ('1m', '5m', '1h')
+    },
+    **{f'disk_rollup_{suffix}': ('percent',) for suffix in ('1m', '5m', '1h')}
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table_name, fields in ROLLUP_FIELDS.items():
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            for field in fields:
+                batch_op.add_column(sa.Column(f'{field}_count', sa.Integer(), nullable=False, server_default=sa.text('0')))
+
+        # 已有的时间桶：有合计的字段按全部样本都有值计算（迁移前缺失的值按0累加，无法区分）
+        table = sa.table(table_name, sa.column('count', sa.Integer), *[
+            sa.column(f'{field}_{suffix}', sa.Float if suffix == 'sum' else sa.Integer)
+            for field in fields for suffix in ('sum', 'count')
+        ])
+        for field in fields:
+            bind.execute(
+                table.update().where(table.c[f'{field}_sum'].isnot(None)).values(**{f'{field}_count': table.c.count})
+            )
+
+
+def downgrade() -> None:
+    for table_name, fields in ROLLUP_FIELDS.items():
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            for field in reversed(fields):
+                batch_op.drop_column(f'{field}_count')
@@ -1,100 +1,90 @@
 # app/api/handlers/memory_handler.py
 from flask import jsonify
-from sqlalchemy import desc
-from typing import Dict, List, Tuple
-from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
 from loguru import logger
 
 from app.database.database_manager import DatabaseManager
-from app.database.models import SystemInfo
-from app.utils.helpers import get_current_local_time  # 添加缺失的导入
+from app.monitoring.latest_snapshot import latest_snapshot
+from app.monitoring.ring_buffer import recent_metrics
+from app.config.config import Config
+from app.utils.helpers import arrays_to_points, trend_window
 
 class MemoryHandler:
     """内存信息处理器"""
     
+    # 允许查询的最长时间范围（小时）
+    MAX_HOURS = 24 * 30
+    
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
         self.logger = logger
     
     def get_memory_info(self) -> Tuple[Dict, int]:
-        """获取内存信息API（从数据库获取最新数据和历史数据）"""
+        """获取内存信息API（从存储引擎获取最新数据和历史数据）"""
         try:
-            with self.db_manager.get_session() as session:
-                # 获取最新的系统信息
-                latest_system_info = session.query(SystemInfo).order_by(desc(SystemInfo.timestamp)).first()
-                
-                # 获取最近一段时间的历史数据（例如最近1小时的数据）
-                one_hour_ago = get_current_local_time() - timedelta(hours=1)
-                history_data = session.query(SystemInfo.timestamp, SystemInfo.memory_percent)\
-                    .filter(SystemInfo.timestamp >= one_hour_ago)\
-                    .order_by(SystemInfo.timestamp)\
-                    .all()
-                
-                # 转换历史数据为列表格式
-                history_list = []
-                for record in history_data:
-                    history_list.append({
-                        'timestamp': record.timestamp.isoformat(),
-                        'memory_percent': record.memory_percent
-                    })
-                
-                if latest_system_info:
-                    response_data = {
-                        'memory_percent': latest_system_info.memory_percent,
-                        'history': history_list
-                    }
-                    return jsonify(response_data), 200
-                else:
-                    # 如果没有数据，返回空数据
-                    return jsonify({
-                        'memory_percent': 0,
-                        'history': []
-                    }), 200
+            storage = self.db_manager.storage
+            # 获取最新的系统信息
+            _, system_rows = storage.latest('system')
+            
+            # 获取最近1小时的历史数据（按时间范围自动选择原始数据或汇总数据）
+            start, end, points = trend_window(None, None, self.MAX_HOURS, Config.TREND_MAX_POINTS)
+            history_list = recent_metrics.system_series(('memory_percent',), start, end, points)
+            if history_list is None:
+                history_list = arrays_to_points(
+                    storage.range('system', ('memory_percent',), start, end, points), ('memory_percent',)
+                )
+            
+            if system_rows:
+                response_data = {
+                    'memory_percent': system_rows[0]['memory_percent'],
+                    'history': history_list
+                }
+                return jsonify(response_data), 200
+            else:
+                # 如果没有数据，返回空数据
+                return jsonify({
+                    'memory_percent': 0,
+                    'history': []
+                }), 200
         except Exception as e:
             self.logger.error(f"获取内存信息时出错: {e}")
             return jsonify({'error': str(e)}), 500
     
     def get_system_memory(self) -> Tuple[Dict, int]:
-        """获取系统内存信息API（从数据库获取最新数据）"""
+        """获取系统内存信息API（返回采集后预先序列化的最新数据，尚未采集时从存储引擎获取）"""
+        cached = latest_snapshot.response('system_memory')
+        if cached is not None:
+            return cached, 200
         try:
-            with self.db_manager.get_session() as session:
-                # 获取最新的系统信息
-                latest_system_info = session.query(SystemInfo).order_by(desc(SystemInfo.timestamp)).first()
-                
-                if latest_system_info:
-                    response_data = {
-                        'memory_percent': latest_system_info.memory_percent
-                    }
-                    return jsonify(response_data), 200
-                else:
-                    # 如果没有数据，返回空数据
-                    return jsonify({
-                        'memory_percent': 0
-                    }), 200
+            # 获取最新的系统信息
+            _, system_rows = self.db_manager.storage.latest('system')
+            
+            if system_rows:
+                response_data = {
+                    'memory_percent': system_rows[0]['memory_percent']
+                }
+                return jsonify(response_data), 200
+            else:
+                # 如果没有数据，返回空数据
+                return jsonify({
+                    'memory_percent': 0
+                }), 200
         except Exception as e:
             self.logger.error(f"获取内存信息时出错: {e}")
             return jsonify({'error': str(e)}), 500
     
-    def get_trend_memory(self) -> Tuple[Dict, int]:
-        """获取内存使用趋势数据API（从数据库获取历史数据）"""
+    def get_trend_memory(self, hours: Optional[float] = None, points: Optional[int] = None) -> Tuple[Dict, int]:
+        """获取内存使用趋势数据API（最近的时间范围读取内存环形缓冲区，否则按时间范围选择原始数据或汇总数据）"""
+        start, end, points = trend_window(hours, points, self.MAX_HOURS, Config.TREND_MAX_POINTS)
         try:
-            with self.db_manager.get_session() as session:
-                # 获取最近一段时间的历史数据（例如最近1小时的数据）
-                one_hour_ago = get_current_local_time() - timedelta(hours=1)
-                history_data = session.query(SystemInfo.timestamp, SystemInfo.memory_percent)\
-                    .filter(SystemInfo.timestamp >= one_hour_ago)\
-                    .order_by(SystemInfo.timestamp)\
-                    .all()
-                
-                # 转换历史数据为列表格式
-                history_list = []
-                for record in history_data:
-                    history_list.append({
-                        'timestamp': record.timestamp.isoformat(),
-                        'memory_percent': record.memory_percent
-                    })
-                
-                return jsonify({'history': history_list}), 200
+            # 最近的时间范围直接读取内存中的环形缓冲区
+            history_list = recent_metrics.system_series(('memory_percent',), start, end, points)
+            if history_list is None:
+                history_list = arrays_to_points(
+                    self.db_manager.storage.range('system', ('memory_percent',), start, end, points), ('memory_percent',)
+                )
+            
+            return jsonify({'history': history_list}), 200
         except Exception as e:
             self.logger.error(f"获取内存趋势数据时出错: {e}")
             return jsonify({'error': str(e)}), 500
\ No newline at end of file
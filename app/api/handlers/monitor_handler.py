@@ -0,0 +1,43 @@
+# app/api/handlers/monitor_handler.py
+from flask import jsonify
+from loguru import logger
+
+from app.database.database_manager import DatabaseManager
+from app.database.retention import retention_manager
+from app.database.write_buffer import write_buffer
+from app.monitoring.collection_stats import collection_stats
+
+
+class MonitorHandler:
+    """监控系统自身运行状态处理器"""
+    
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+        self.logger = logger
+    
+    def get_collection_stats(self):
+        """获取采集任务的调度延迟、耗时和跳过次数"""
+        try:
+            return jsonify(collection_stats.to_dict())
+        except Exception as e:
+            self.logger.error(f"获取采集任务统计时出错: {e}")
+            return jsonify({'error': str(e)}), 500
+    
+    def get_retention_report(self):
+        """获取最近一次过期数据清理的结果（删除行数和耗时）"""
+        try:
+            return jsonify({
+                'policies': retention_manager.policies,
+                'last_run': retention_manager.last_report
+            })
+        except Exception as e:
+            self.logger.error(f"获取过期数据清理报告时出错: {e}")
+            return jsonify({'error': str(e)}), 500
+    
+    def get_write_buffer_stats(self):
+        """获取快照写入缓冲的队列深度、写入耗时和溢出次数"""
+        try:
+            return jsonify(write_buffer.to_dict())
+        except Exception as e:
+            self.logger.error(f"获取写入缓冲统计时出错: {e}")
+            return jsonify({'error': str(e)}), 500
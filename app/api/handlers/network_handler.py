@@ -0,0 +1,50 @@
+# app/api/handlers/network_handler.py
+from flask import jsonify
+from typing import Dict, Optional, Tuple
+from loguru import logger
+
+from app.database.database_manager import DatabaseManager
+from app.config.config import Config
+from app.utils.helpers import arrays_to_points, trend_window
+
+class NetworkHandler:
+    """网络信息处理器"""
+    
+    # 趋势接口输出的速率字段
+    RATE_FIELDS = (
+        'bytes_sent_per_sec', 'bytes_recv_per_sec',
+        'packets_sent_per_sec', 'packets_recv_per_sec',
+        'errin_per_sec', 'errout_per_sec',
+        'dropin_per_sec', 'dropout_per_sec'
+    )
+    
+    # 允许查询的最长时间范围（小时）
+    MAX_HOURS = 24 * 7
+    
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+        self.logger = logger
+    
+    def get_trend_network(
+        self,
+        interface: Optional[str] = None,
+        hours: Optional[float] = None,
+        points: Optional[int] = None
+    ) -> Tuple[Dict, int]:
+        """获取网络流量趋势数据API（从存储引擎获取历史数据，按网卡分组并降采样）"""
+        start, end, points = trend_window(hours, points, self.MAX_HOURS, Config.TREND_MAX_POINTS)
+        
+        try:
+            series_by_interface = self.db_manager.storage.range(
+                'network', self.RATE_FIELDS, start, end, points, key=interface or None
+            )
+            
+            # 按网卡分组历史数据
+            history_by_interface = {
+                name: arrays_to_points(series, self.RATE_FIELDS) for name, series in series_by_interface.items()
+            }
+            
+            return jsonify({'history': history_by_interface}), 200
+        except Exception as e:
+            self.logger.error(f"获取网络流量趋势数据时出错: {e}")
+            return jsonify({'error': str(e)}), 500
@@ -1,60 +1,98 @@
 # app/api/handlers/process_handler.py
 from flask import jsonify
-from sqlalchemy import desc, func
-from typing import Dict, List, Tuple
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from loguru import logger
 
 from app.database.database_manager import DatabaseManager
-from app.database.models import ProcessInfo
+from app.database.storage import StorageEngine
+from app.monitoring.collector import SystemCollector
+from app.monitoring.latest_snapshot import latest_snapshot
+from app.monitoring.process_table import ProcessTable
+from app.config.config import Config
 
 class ProcessHandler:
     """进程信息处理器"""
-    
+
+    # 排序参数的简写
+    SORT_ALIASES = {
+        'memory': 'memory_percent',
+        'cpu': 'cpu_percent',
+        'threads': 'num_threads',
+        'fds': 'num_fds'
+    }
+
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
         self.logger = logger
-    
-    def get_processes(self) -> Tuple[Dict, int]:
-        """获取进程信息API（从数据库获取最新数据）"""
+
+    def get_processes(
+        self,
+        sort: Optional[str] = None,
+        limit: Optional[int] = None,
+        at: Optional[str] = None
+    ) -> Tuple[Dict, int]:
+        """获取进程信息API（优先使用采集器预先计算的排行；指定at时从数据库重建该时刻的排行）"""
+        sort_key = self.SORT_ALIASES.get(sort, sort) if sort else ProcessTable.DEFAULT_RANK_KEY
+        if sort_key not in ProcessTable.RANK_KEYS:
+            return jsonify({'error': f'不支持的排序字段: {sort}'}), 400
+        if limit is None or limit <= 0 or limit > Config.PROCESS_TOP_N:
+            limit = Config.PROCESS_TOP_N
+        at_time = None
+        if at:
+            try:
+                at_time = datetime.fromisoformat(at)
+            except ValueError:
+                return jsonify({'error': f'无效的时间: {at}'}), 400
+            if at_time.tzinfo is not None:
+                at_time = at_time.astimezone().replace(tzinfo=None)
+
         try:
-            with self.db_manager.get_session() as session:
-                # 获取最新的进程信息
-                # 获取最新的时间戳
-                latest_timestamp = session.query(func.max(ProcessInfo.timestamp)).first()
-                
-                if latest_timestamp and latest_timestamp[0]:
-                    # 只获取最新时间戳的数据
-                    latest_processes = session.query(ProcessInfo).filter(
-                        ProcessInfo.timestamp == latest_timestamp[0]
-                    ).all()
-                else:
-                    latest_processes = []
-                
-                # 转换为列表格式
-                processes_list = []
-                for proc in latest_processes:
-                    processes_list.append({
-                        'pid': proc.pid,
-                        'name': proc.name,
-                        'status': proc.status,
-                        'cpu_percent': proc.cpu_percent,
-                        'memory_percent': proc.memory_percent,
-                        'create_time': proc.create_time
-                    })
-                
-                # 按内存占用率排序，取前20个进程
-                processes_list.sort(key=lambda x: x['memory_percent'], reverse=True)
-                processes_list = processes_list[:20]
-                
-                # 转换时间为ISO格式字符串
-                collection_time = None
-                if latest_timestamp and latest_timestamp[0]:
-                    collection_time = latest_timestamp[0].isoformat()
-                
-                return jsonify({
-                    'processes': processes_list,
-                    'collection_time': collection_time
-                }), 200
+            if at_time is None and limit == Config.PROCESS_TOP_N:
+                # 默认数量的排行在采集后已序列化
+                cached = latest_snapshot.response(f'processes:{sort_key}')
+                if cached is not None:
+                    return cached, 200
+            if at_time is None:
+                # 采集器在内存中维护的排行
+                rankings, ranked_at = SystemCollector.get_process_rankings()
+                if sort_key in rankings:
+                    return jsonify({
+                        'processes': rankings[sort_key][:limit],
+                        'sort': sort_key,
+                        'collection_time': ranked_at.isoformat() if ranked_at else None
+                    }), 200
+
+            return self._get_processes_from_db(sort_key, limit, at_time)
         except Exception as e:
             self.logger.error(f"获取进程信息时出错: {e}")
-            return jsonify({'error': str(e)}), 500
\ No newline at end of file
+            return jsonify({'error': str(e)}), 500
+
+    def _get_processes_from_db(
+        self,
+        sort_key: str,
+        limit: int,
+        at: Optional[datetime] = None
+    ) -> Tuple[Dict, int]:
+        """从存储引擎重建最新或某一时刻的进程排行（没有保存的排序字段按内存占用率排序）"""
+        if sort_key not in StorageEngine.PROCESS_FIELDS:
+            sort_key = ProcessTable.DEFAULT_RANK_KEY
+
+        collection_time, processes = self.db_manager.storage.latest(StorageEngine.PROCESS, at)
+        processes = sorted(processes, key=lambda proc: proc[sort_key] or 0, reverse=True)[:limit]
+
+        return jsonify({
+            'processes': [
+                {
+                    'pid': proc['pid'],
+                    'name': proc['name'],
+                    'status': proc['status'],
+                    'cpu_percent': proc['cpu_percent'],
+                    'memory_percent': proc['memory_percent'],
+                    'create_time': proc['create_time']
+                }
+                for proc in processes
+            ],
+            'sort': sort_key,
+            'collection_time': collection_time.isoformat() if collection_time else None
+        }), 200
@@ -4,11 +4,9 @@ import os
 from jinja2 import Environment, FileSystemLoader
 from typing import Dict, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy import desc, func
 from loguru import logger
 
 from app.database.database_manager import DatabaseManager
-from app.database.models import SystemInfo, DiskInfo, ProcessInfo, AlertRecord
 from app.monitoring.collector import SystemCollector
 from app.config.config import Config
 from app.utils.helpers import get_current_local_time
@@ -19,6 +17,9 @@ from app.utils.chart_utils import ChartGenerator
 class ReportHandler:
     """报告处理器"""
     
+    # 周报统计平均值和最大值的系统信息字段
+    SUMMARY_FIELDS = ('cpu_percent', 'memory_percent', 'load_avg_1')
+    
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
         self.logger = logger
@@ -26,9 +27,10 @@ class ReportHandler:
     def send_weekly_report(self) -> Tuple[Dict, int]:
         """发送周报邮件API"""
         try:
-            # 1. 从数据库获取一周的数据
-            week_ago = datetime.now() - timedelta(days=7)
-            two_weeks_ago = datetime.now() - timedelta(days=14)
+            # 1. 从存储引擎获取一周的数据
+            now = datetime.now()
+            week_ago = now - timedelta(days=7)
+            two_weeks_ago = now - timedelta(days=14)
             
             # 获取服务器详细信息
             server_info = SystemCollector.get_detailed_system_info()
@@ -45,125 +47,90 @@ class ReportHandler:
                 'free': 0
             }
             
-            with self.db_manager.get_session() as session:
-                # 获取系统信息统计数据
-                cpu_avg = session.query(func.avg(SystemInfo.cpu_percent)).filter(
-                    SystemInfo.timestamp >= week_ago
-                ).scalar() or 0
-                
-                memory_avg = session.query(func.avg(SystemInfo.memory_percent)).filter(
-                    SystemInfo.timestamp >= week_ago
-                ).scalar() or 0
-                
-                # 获取磁盘使用率最高值
-                disk_max = session.query(func.max(DiskInfo.percent)).filter(
-                    DiskInfo.timestamp >= week_ago
-                ).scalar() or 0
-                
-                # 根据本周内存和磁盘使用情况生成真实的预警信息
-                alerts_data = []
-                
-                # 检查内存使用情况
-                if memory_avg > Config.MEMORY_THRESHOLD:
-                    alerts_data.append({
-                        'timestamp': datetime.now(),
-                        'alert_type': 'memory',
-                        'message': f'本周平均内存使用率 {memory_avg:.2f}% 超过阈值 {Config.MEMORY_THRESHOLD}%',
-                        'is_sent': 1
-                    })
-                
-                # 检查磁盘使用情况
-                if disk_max > Config.DISK_THRESHOLD:
-                    # 获取磁盘使用率最高的记录详情
-                    max_disk_record = session.query(DiskInfo).filter(
-                        DiskInfo.timestamp >= week_ago
-                    ).order_by(desc(DiskInfo.percent)).first()
-                    
-                    if max_disk_record:
-                        alerts_data.append({
-                            'timestamp': max_disk_record.timestamp,
-                            'alert_type': 'disk',
-                            'message': f'本周磁盘 {max_disk_record.device} 最高使用率 {max_disk_record.percent:.2f}% 超过阈值 {Config.DISK_THRESHOLD}%',
-                            'is_sent': 1
-                        })
-                
-                # 获取高负载进程（按内存使用率排序，取前10）
-                # 首先获取最新的时间戳
-                latest_timestamp = session.query(func.max(ProcessInfo.timestamp)).filter(
-                    ProcessInfo.timestamp >= week_ago
-                ).scalar()
-                
-                # 然后获取该时间戳下的所有进程数据，并按内存使用率排序取前10
-                top_processes = session.query(ProcessInfo).filter(
-                    ProcessInfo.timestamp == latest_timestamp
-                ).order_by(desc(ProcessInfo.memory_percent)).limit(10).all() if latest_timestamp else []
-                
-                # 将ProcessInfo对象转换为字典，避免Session关闭后访问对象属性的问题
-                top_processes_data = [
-                    {
-                        'id': process.id,
-                        'pid': process.pid,
-                        'name': process.name,
-                        'status': process.status,
-                        'cpu_percent': process.cpu_percent,
-                        'memory_percent': process.memory_percent,
-                        'create_time': process.create_time
-                    }
-                    for process in top_processes
-                ]
-                
-                # 计算变化趋势（与上周相比）
-                last_week_cpu_avg = session.query(func.avg(SystemInfo.cpu_percent)).filter(
-                    SystemInfo.timestamp >= two_weeks_ago,
-                    SystemInfo.timestamp < week_ago
-                ).scalar() or 0
-                
-                last_week_memory_avg = session.query(func.avg(SystemInfo.memory_percent)).filter(
-                    SystemInfo.timestamp >= two_weeks_ago,
-                    SystemInfo.timestamp < week_ago
-                ).scalar() or 0
-                
-                last_week_disk_max = session.query(func.max(DiskInfo.percent)).filter(
-                    DiskInfo.timestamp >= two_weeks_ago,
-                    DiskInfo.timestamp < week_ago
-                ).scalar() or 0
-                
-                # 计算变化值
-                cpu_change = round(cpu_avg - last_week_cpu_avg, 2)
-                memory_change = round(memory_avg - last_week_memory_avg, 2)
-                disk_change = round(disk_max - last_week_disk_max, 2)
-                
-                weekly_data = {
-                    'report_date': datetime.now().strftime('%Y年%m月%d日'),
-                    'server_info': server_info,
-                    'server_ip': server_ip,
-                    'disk_info': primary_disk_info,
-                    'cpu_avg': round(cpu_avg, 2),
-                    'memory_avg': round(memory_avg, 2),
-                    'disk_max': round(disk_max, 2),
-                    'cpu_change': cpu_change,
-                    'memory_change': memory_change,
-                    'disk_change': disk_change,
-                    'alerts': alerts_data,
-                    'top_processes': top_processes_data
-                }
+            storage = self.db_manager.storage
+            # 获取系统信息统计数据（一周范围由存储引擎从汇总数据统计，不扫描原始数据）
+            summary = storage.aggregate('system', self.SUMMARY_FIELDS, week_ago, now)
+            cpu_avg = summary['cpu_percent_avg'] or 0
+            memory_avg = summary['memory_percent_avg'] or 0
+            load_avg = summary['load_avg_1_avg'] or 0
+            load_max = summary['load_avg_1_max'] or 0
+            
+            # 获取磁盘使用率最高值
+            max_disk_record = storage.peak('disk', 'percent', week_ago, now)
+            disk_max = max_disk_record['value'] if max_disk_record else 0
+            
+            # 根据本周内存和磁盘使用情况生成真实的预警信息
+            alerts_data = []
+            
+            # 检查内存使用情况
+            if memory_avg > Config.MEMORY_THRESHOLD:
+                alerts_data.append({
+                    'timestamp': datetime.now(),
+                    'alert_type': 'memory',
+                    'message': f'本周平均内存使用率 {memory_avg:.2f}% 超过阈值 {Config.MEMORY_THRESHOLD}%',
+                    'is_sent': 1
+                })
+            
+            # 检查磁盘使用情况
+            if max_disk_record and disk_max > Config.DISK_THRESHOLD:
+                alerts_data.append({
+                    'timestamp': max_disk_record['timestamp'],
+                    'alert_type': 'disk',
+                    'message': f'本周磁盘 {max_disk_record["key"]} 最高使用率 {disk_max:.2f}% 超过阈值 {Config.DISK_THRESHOLD}%',
+                    'is_sent': 1
+                })
+            
+            # 获取高负载进程（按内存使用率排序，取前10）：重建本周最近一次采集的进程排行
+            collection_time, top_processes_data = storage.latest(storage.PROCESS, now)
+            if collection_time is None or collection_time < week_ago:
+                top_processes_data = []
+            top_processes_data = top_processes_data[:10]
+            
+            # 计算变化趋势（与上周相比）
+            last_week_summary = storage.aggregate('system', self.SUMMARY_FIELDS, two_weeks_ago, week_ago)
+            last_week_cpu_avg = last_week_summary['cpu_percent_avg'] or 0
+            last_week_memory_avg = last_week_summary['memory_percent_avg'] or 0
+            last_week_load_avg = last_week_summary['load_avg_1_avg'] or 0
+            
+            last_week_disk_peak = storage.peak('disk', 'percent', two_weeks_ago, week_ago)
+            last_week_disk_max = last_week_disk_peak['value'] if last_week_disk_peak else 0
+            
+            # 计算变化值
+            cpu_change = round(cpu_avg - last_week_cpu_avg, 2)
+            memory_change = round(memory_avg - last_week_memory_avg, 2)
+            load_change = round(load_avg - last_week_load_avg, 2)
+            disk_change = round(disk_max - last_week_disk_max, 2)
+            
+            weekly_data = {
+                'report_date': now.strftime('%Y年%m月%d日'),
+                'server_info': server_info,
+                'server_ip': server_ip,
+                'disk_info': primary_disk_info,
+                'cpu_avg': round(cpu_avg, 2),
+                'memory_avg': round(memory_avg, 2),
+                'disk_max': round(disk_max, 2),
+                'load_avg': round(load_avg, 2),
+                'load_max': round(load_max, 2),
+                'cpu_change': cpu_change,
+                'memory_change': memory_change,
+                'disk_change': disk_change,
+                'load_change': load_change,
+                'alerts': alerts_data,
+                'top_processes': top_processes_data
+            }
             
             # 2. 生成图表
             # 使用新的图表工具类
             chart_generator = ChartGenerator()
             
-            # 获取一周的历史数据
-            with self.db_manager.get_session() as session:
-                history_data = session.query(
-                    SystemInfo.timestamp,
-                    SystemInfo.cpu_percent,
-                    SystemInfo.memory_percent
-                ).filter(
-                    SystemInfo.timestamp >= week_ago
-                ).order_by(SystemInfo.timestamp).all()
+            # 获取一周的历史数据（存储引擎按时间范围选择数据粒度，降采样为NumPy数组）
+            history = self.db_manager.storage.range(
+                'system', ('cpu_percent', 'memory_percent', 'load_avg_1', 'load_avg_5', 'load_avg_15'),
+                week_ago, now, Config.TREND_MAX_POINTS
+            )
             
             # 生成资源使用趋势图
-            if not history_data:
+            if not len(history['timestamp']):
                 # 如果没有数据，创建一个空图表
                 chart_path = chart_generator.create_empty_chart(
                     message="暂无数据",
@@ -171,15 +138,10 @@ class ReportHandler:
                     filename="weekly_trend_chart.png"
                 )
             else:
-                # 提取数据
-                timestamps = [record.timestamp for record in history_data]
-                cpu_percents = [record.cpu_percent for record in history_data]
-                memory_percents = [record.memory_percent for record in history_data]
-                
                 # 创建折线图
                 chart_path = chart_generator.create_line_chart(
-                    x_data=timestamps,
-                    y_data=[cpu_percents, memory_percents],
+                    x_data=history['timestamp'],
+                    y_data=[history['cpu_percent'], history['memory_percent']],
                     labels=['CPU使用率', '内存使用率'],
                     title='资源使用趋势 (过去7天)',
                     x_label='时间',
@@ -187,6 +149,24 @@ class ReportHandler:
                     filename='weekly_trend_chart.png'
                 )
             
+            # 生成平均负载趋势图（负载没有上限，不与使用率画在同一个坐标轴上）
+            if not len(history['timestamp']):
+                load_chart_path = chart_generator.create_empty_chart(
+                    message="暂无数据",
+                    title="平均负载趋势 (过去7天)",
+                    filename="weekly_load_chart.png"
+                )
+            else:
+                load_chart_path = chart_generator.create_line_chart(
+                    x_data=history['timestamp'],
+                    y_data=[history['load_avg_1'], history['load_avg_5'], history['load_avg_15']],
+                    labels=['1分钟', '5分钟', '15分钟'],
+                    title='平均负载趋势 (过去7天)',
+                    x_label='时间',
+                    y_label='平均负载',
+                    filename='weekly_load_chart.png'
+                )
+            
             # 3. 发送邮件
             # 使用新的邮件工具类
             email_sender = EmailSender()
@@ -211,6 +191,8 @@ class ReportHandler:
             images = []
             if chart_path and os.path.exists(chart_path):
                 images.append((chart_path, 'resource_trend_chart'))
+            if load_chart_path and os.path.exists(load_chart_path):
+                images.append((load_chart_path, 'load_trend_chart'))
             
             # 发送邮件
             success = email_sender.send_email(
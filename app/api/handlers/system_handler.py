@@ -1,122 +1,169 @@
 # app/api/handlers/system_handler.py
 from flask import jsonify
-from sqlalchemy import desc
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Any
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Any
 from loguru import logger
 
 from app.database.database_manager import DatabaseManager
-from app.database.models import SystemInfo, DiskInfo, ProcessInfo
 from app.monitoring.collector import SystemCollector
+from app.monitoring.latest_snapshot import latest_snapshot
+from app.monitoring.ring_buffer import recent_metrics
 from app.config.config import Config
-from app.utils.helpers import get_current_local_time
+from app.utils.helpers import arrays_to_points, get_current_local_time, trend_window
 
 class SystemHandler:
     """系统信息处理器"""
     
+    # 历史趋势接口默认和最长的时间范围（小时）
+    HISTORY_DEFAULT_HOURS = 24 * 7
+    HISTORY_MAX_HOURS = 24 * 730
+    # 平均负载趋势接口最长的时间范围（小时）
+    LOAD_MAX_HOURS = 24 * 30
+    LOAD_FIELDS = ('load_avg_1', 'load_avg_5', 'load_avg_15')
+    
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
         self.logger = logger
     
+    @staticmethod
+    def _load_average(system_info: Dict) -> Tuple[float, float, float]:
+        """系统信息记录中的1、5、15分钟平均负载（没有数据时为0）"""
+        return (system_info['load_avg_1'] or 0, system_info['load_avg_5'] or 0, system_info['load_avg_15'] or 0)
+    
     def get_system_info(self) -> Tuple[Dict, int]:
-        """获取系统信息API（从数据库获取最新数据）"""
+        """获取系统信息API（返回采集后预先序列化的最新数据，尚未采集时从存储引擎获取）"""
+        cached = latest_snapshot.response('system_info')
+        if cached is not None:
+            return cached, 200
         try:
-            with self.db_manager.get_session() as session:
-                # 获取最新的系统信息
-                latest_system_info = session.query(SystemInfo).order_by(desc(SystemInfo.timestamp)).first()
-                
-                # 获取最新的磁盘信息
-                latest_disk_info = session.query(DiskInfo).order_by(desc(DiskInfo.timestamp)).all()
+            storage = self.db_manager.storage
+            # 获取最新的系统信息
+            _, system_rows = storage.latest('system')
+            
+            # 获取最近一次采集的磁盘信息
+            _, latest_disk_info = storage.latest('disk')
+            
+            # 获取应用程序版本信息（这部分仍需要实时获取）
+            app_versions = SystemCollector.get_application_versions()
+            
+            if system_rows:
+                latest_system_info = system_rows[0]
+                # 转换磁盘信息为列表格式
+                disk_list = []
+                for disk in latest_disk_info:
+                    disk_list.append({
+                        'device': disk['device'],
+                        'mountpoint': disk['mountpoint'],
+                        'total': disk['total'],
+                        'used': disk['used'],
+                        'free': disk['free'],
+                        'percent': disk['percent']
+                    })
                 
-                # 获取应用程序版本信息（这部分仍需要实时获取）
-                app_versions = SystemCollector.get_application_versions()
+                response_data = {
+                    'system': {
+                        'cpu_percent': latest_system_info['cpu_percent'],
+                        'memory_percent': latest_system_info['memory_percent'],
+                        'boot_time': latest_system_info['uptime'],
+                        'load_average': self._load_average(latest_system_info)
+                    },
+                    'disks': disk_list,
+                    'applications': app_versions
+                }
                 
-                if latest_system_info:
-                    # 转换磁盘信息为列表格式
-                    disk_list = []
-                    for disk in latest_disk_info:
-                        disk_list.append({
-                            'device': disk.device,
-                            'mountpoint': disk.mountpoint,
-                            'total': disk.total,
-                            'used': disk.used,
-                            'free': disk.free,
-                            'percent': disk.percent
-                        })
-                    
-                    response_data = {
-                        'system': {
-                            'cpu_percent': latest_system_info.cpu_percent,
-                            'memory_percent': latest_system_info.memory_percent,
-                            'boot_time': latest_system_info.uptime,
-                            'load_average': eval(latest_system_info.load_average) if latest_system_info.load_average else (0, 0, 0)
-                        },
-                        'disks': disk_list,
-                        'applications': app_versions
-                    }
-                    
-                    return jsonify(response_data), 200
-                else:
-                    # 如果没有数据，返回空数据
-                    return jsonify({
-                        'system': {
-                            'cpu_percent': 0,
-                            'memory_percent': 0,
-                            'boot_time': 0,
-                            'load_average': (0, 0, 0)
-                        },
-                        'disks': [],
-                        'applications': app_versions
-                    }), 200
+                return jsonify(response_data), 200
+            else:
+                # 如果没有数据，返回空数据
+                return jsonify({
+                    'system': {
+                        'cpu_percent': 0,
+                        'memory_percent': 0,
+                        'boot_time': 0,
+                        'load_average': (0, 0, 0)
+                    },
+                    'disks': [],
+                    'applications': app_versions
+                }), 200
         except Exception as e:
             self.logger.error(f"获取系统信息时出错: {e}")
             return jsonify({'error': str(e)}), 500
     
     def get_cpu_info(self) -> Tuple[Dict, int]:
-        """获取CPU信息API（从数据库获取最新数据和历史数据）"""
+        """获取CPU信息API（从存储引擎获取最新数据和历史数据）"""
         try:
-            with self.db_manager.get_session() as session:
-                # 获取最新的系统信息
-                latest_system_info = session.query(SystemInfo).order_by(desc(SystemInfo.timestamp)).first()
-                
-                # 获取最近一段时间的历史数据（例如最近1小时的数据）
-                one_hour_ago = datetime.now() - timedelta(hours=1)
-                history_data = session.query(SystemInfo.timestamp, SystemInfo.cpu_percent)\
-                    .filter(SystemInfo.timestamp >= one_hour_ago)\
-                    .order_by(SystemInfo.timestamp)\
-                    .all()
-                
-                # 转换历史数据为列表格式
-                history_list = []
-                for record in history_data:
-                    history_list.append({
-                        'timestamp': record.timestamp.isoformat(),
-                        'cpu_percent': record.cpu_percent
-                    })
-                
-                if latest_system_info:
-                    response_data = {
-                        'cpu_percent': latest_system_info.cpu_percent,
-                        'load_average': eval(latest_system_info.load_average) if latest_system_info.load_average else (0, 0, 0),
-                        'history': history_list
-                    }
-                    return jsonify(response_data), 200
-                else:
-                    # 如果没有数据，返回空数据
-                    return jsonify({
-                        'cpu_percent': 0,
-                        'load_average': (0, 0, 0),
-                        'history': []
-                    }), 200
+            storage = self.db_manager.storage
+            # 获取最新的系统信息
+            _, system_rows = storage.latest('system')
+            
+            # 获取最近1小时的历史数据（按时间范围自动选择原始数据或汇总数据）
+            start, end, points = trend_window(None, None, 1, Config.TREND_MAX_POINTS)
+            history_list = recent_metrics.system_series(('cpu_percent',), start, end, points)
+            if history_list is None:
+                history_list = arrays_to_points(
+                    storage.range('system', ('cpu_percent',), start, end, points), ('cpu_percent',)
+                )
+            
+            if system_rows:
+                response_data = {
+                    'cpu_percent': system_rows[0]['cpu_percent'],
+                    'load_average': self._load_average(system_rows[0]),
+                    'history': history_list
+                }
+                return jsonify(response_data), 200
+            else:
+                # 如果没有数据，返回空数据
+                return jsonify({
+                    'cpu_percent': 0,
+                    'load_average': (0, 0, 0),
+                    'history': []
+                }), 200
         except Exception as e:
             self.logger.error(f"获取CPU信息时出错: {e}")
             return jsonify({'error': str(e)}), 500
     
+    def get_trend_load(self, hours: Optional[float] = None, points: Optional[int] = None) -> Tuple[Dict, int]:
+        """获取1、5、15分钟平均负载趋势数据API（最近的时间范围读取内存环形缓冲区，否则按时间范围选择原始数据或汇总数据）"""
+        start, end, points = trend_window(hours, points, self.LOAD_MAX_HOURS, Config.TREND_MAX_POINTS)
+        try:
+            # 最近的时间范围直接读取内存中的环形缓冲区
+            history_list = recent_metrics.system_series(self.LOAD_FIELDS, start, end, points)
+            if history_list is None:
+                history_list = arrays_to_points(
+                    self.db_manager.storage.range('system', self.LOAD_FIELDS, start, end, points), self.LOAD_FIELDS
+                )
+            
+            return jsonify({'history': history_list}), 200
+        except Exception as e:
+            self.logger.error(f"获取平均负载趋势数据时出错: {e}")
+            return jsonify({'error': str(e)}), 500
+    
     def get_detailed_system_info(self) -> Tuple[Dict, int]:
-        """获取详细系统信息API（实时采集）"""
+        """获取详细系统信息API（静态信息来自缓存，动态信息来自最近一次调度采集）"""
         try:
             detailed_info = SystemCollector.get_detailed_system_info()
             return jsonify(detailed_info), 200
         except Exception as e:
             self.logger.error(f"获取详细系统信息时出错: {e}")
-            return jsonify({'error': str(e)}), 500
\ No newline at end of file
+            return jsonify({'error': str(e)}), 500
+    
+    def get_trend_history(
+        self,
+        days: Optional[float] = None,
+        points: Optional[int] = None,
+        device: Optional[str] = None
+    ) -> Tuple[Dict, int]:
+        """获取长时间范围的CPU、内存、平均负载和磁盘使用率历史API（存储引擎按时间范围选择数据粒度）"""
+        hours = days * 24 if days and days > 0 else self.HISTORY_DEFAULT_HOURS
+        start, end, points = trend_window(hours, points, self.HISTORY_MAX_HOURS, Config.TREND_MAX_POINTS)
+        try:
+            storage = self.db_manager.storage
+            fields = ('cpu_percent', 'memory_percent') + self.LOAD_FIELDS
+            system = storage.range('system', fields, start, end, points)
+            disks = storage.range('disk', ('percent',), start, end, points, key=device or None)
+            return jsonify({
+                'system': arrays_to_points(system, fields),
+                'disk': {name: arrays_to_points(series, ('percent',)) for name, series in disks.items()}
+            }), 200
+        except Exception as e:
+            self.logger.error(f"获取历史趋势数据时出错: {e}")
+            return jsonify({'error': str(e)}), 500
@@ -1,10 +1,9 @@
 # app/api/routes.py
-from flask import Blueprint, jsonify, render_template, send_from_directory
+from flask import Blueprint, jsonify, render_template, request, send_from_directory
 import os
 from app.database.database_manager import DatabaseManager
 from app.config.config import Config
 import json
-import socket
 from loguru import logger
 from app.utils.helpers import format_local_time
 
@@ -14,7 +13,10 @@ from app.api.handlers.process_handler import ProcessHandler
 from app.api.handlers.disk_handler import DiskHandler
 from app.api.handlers.memory_handler import MemoryHandler
 from app.api.handlers.report_handler import ReportHandler
+from app.api.handlers.network_handler import NetworkHandler
+from app.api.handlers.monitor_handler import MonitorHandler
 from app.monitoring.collector import SystemCollector  # 添加导入
+from app.monitoring.server_identity import server_identity
 
 main_bp = Blueprint('main', __name__)
 db_manager = DatabaseManager(Config.SQLALCHEMY_DATABASE_URI)
@@ -25,6 +27,8 @@ process_handler = ProcessHandler(db_manager)
 disk_handler = DiskHandler(db_manager)
 memory_handler = MemoryHandler(db_manager)
 report_handler = ReportHandler(db_manager)
+network_handler = NetworkHandler(db_manager)
+monitor_handler = MonitorHandler(db_manager)
 
 
 @main_bp.route('/favicon.ico')
@@ -44,23 +48,8 @@ def favicon():
 
 
 def get_server_ip():
-    """获取服务器主网卡IP地址"""
-    try:
-        # 方法1: 通过连接外部地址获取本地IP
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-            # 连接到一个外部地址（不需要真实存在）
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-        return ip
-    except Exception:
-        try:
-            # 方法2: 获取主机名对应的IP
-            hostname = socket.gethostname()
-            ip = socket.gethostbyname(hostname)
-            return ip
-        except Exception:
-            # 方法3: 返回localhost
-            return "127.0.0.1"
+    """获取服务器主网卡IP地址（读取缓存，不进行网络I/O）"""
+    return server_identity.get_ip()
 
 
 @main_bp.route('/')
@@ -104,7 +93,7 @@ def api_server_ip():
 # 系统信息相关路由
 @main_bp.route('/api/system-info')
 def api_system_info():
-    """获取系统信息API（从数据库获取最新数据）"""
+    """获取系统信息API（采集后预先序列化的最新数据）"""
     return system_handler.get_system_info()
 
 
@@ -116,20 +105,24 @@ def api_cpu_info():
 
 @main_bp.route('/api/system/details')
 def api_system_details():
-    """获取详细系统信息API（实时采集）"""
+    """获取详细系统信息API（静态信息来自缓存，动态信息来自最近一次调度采集）"""
     return system_handler.get_detailed_system_info()
 
 
 # 进程信息相关路由
 @main_bp.route('/api/processes')
 def api_processes():
-    """获取进程信息API（从数据库获取最新数据）"""
-    return process_handler.get_processes()
+    """获取进程信息API（支持 sort=、limit= 参数，at= 参数按ISO时间重建历史排行）"""
+    return process_handler.get_processes(
+        sort=request.args.get('sort'),
+        limit=request.args.get('limit', type=int),
+        at=request.args.get('at')
+    )
 
 
 @main_bp.route('/api/system/processes')
 def api_system_processes():
-    """获取进程信息API（从数据库获取最新数据）"""
+    """获取进程信息API（采集后预先序列化的最新排行）"""
     return process_handler.get_processes()
 
 
@@ -142,14 +135,24 @@ def api_disk_info():
 
 @main_bp.route('/api/system/disk')
 def api_system_disk():
-    """获取磁盘信息API（从数据库获取最新数据）"""
+    """获取磁盘信息API（采集后预先序列化的最新数据）"""
     return disk_handler.get_system_disk()
 
 
 @main_bp.route('/api/trend/disk')
 def api_trend_disk():
-    """获取磁盘使用趋势数据API（从数据库获取历史数据）"""
-    return disk_handler.get_trend_disk()
+    """获取磁盘使用趋势数据API（支持 device=、hours= 和 points= 参数）"""
+    return disk_handler.get_trend_disk(
+        device=request.args.get('device'),
+        hours=request.args.get('hours', type=float),
+        points=request.args.get('points', type=int)
+    )
+
+
+@main_bp.route('/api/trend/diskio')
+def api_trend_diskio():
+    """获取磁盘I/O趋势数据API（支持 device= 参数）"""
+    return disk_handler.get_trend_diskio(device=request.args.get('device'))
 
 
 # 内存信息相关路由
@@ -161,14 +164,66 @@ def api_memory_info():
 
 @main_bp.route('/api/system/memory')
 def api_system_memory():
-    """获取内存信息API（从数据库获取最新数据）"""
+    """获取内存信息API（采集后预先序列化的最新数据）"""
     return memory_handler.get_system_memory()
 
 
 @main_bp.route('/api/trend/memory')
 def api_trend_memory():
-    """获取内存使用趋势数据API（从数据库获取历史数据）"""
-    return memory_handler.get_trend_memory()
+    """获取内存使用趋势数据API（支持 hours= 和 points= 参数）"""
+    return memory_handler.get_trend_memory(
+        hours=request.args.get('hours', type=float),
+        points=request.args.get('points', type=int)
+    )
+
+
+@main_bp.route('/api/trend/load')
+def api_trend_load():
+    """获取1、5、15分钟平均负载趋势数据API（支持 hours= 和 points= 参数）"""
+    return system_handler.get_trend_load(
+        hours=request.args.get('hours', type=float),
+        points=request.args.get('points', type=int)
+    )
+
+
+# 网络信息相关路由
+@main_bp.route('/api/trend/network')
+def api_trend_network():
+    """获取网络流量趋势数据API（支持 interface=、hours= 和 points= 参数）"""
+    return network_handler.get_trend_network(
+        interface=request.args.get('interface'),
+        hours=request.args.get('hours', type=float),
+        points=request.args.get('points', type=int)
+    )
+
+
+@main_bp.route('/api/trend/history')
+def api_trend_history():
+    """获取长时间范围的CPU、内存、平均负载和磁盘使用率历史API（支持 days=、points= 和 device= 参数）"""
+    return system_handler.get_trend_history(
+        days=request.args.get('days', type=float),
+        points=request.args.get('points', type=int),
+        device=request.args.get('device')
+    )
+
+
+# 监控系统自身状态相关路由
+@main_bp.route('/api/monitor/collection-stats')
+def api_collection_stats():
+    """获取采集任务统计API（计划与实际开始时间、耗时、跳过次数）"""
+    return monitor_handler.get_collection_stats()
+
+
+@main_bp.route('/api/monitor/retention')
+def api_retention_report():
+    """获取过期数据清理报告API（保留策略、最近一次删除的行数和耗时）"""
+    return monitor_handler.get_retention_report()
+
+
+@main_bp.route('/api/monitor/write-buffer')
+def api_write_buffer_stats():
+    """获取快照写入缓冲统计API（队列深度、写入耗时、溢出和重放次数）"""
+    return monitor_handler.get_write_buffer_stats()
 
 
 # 报告相关路由
@@ -1,12 +1,27 @@
 # app/config/config.py
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 import tzlocal
 from dotenv import load_dotenv
 
 # 加载.env文件
 load_dotenv()
 
+
+def _split_env(name: str, default: str = '') -> List[str]:
+    """读取逗号分隔的环境变量，返回去除空白后的列表"""
+    return [item.strip() for item in os.environ.get(name, default).split(',') if item.strip()]
+
+
+def _split_env_mapping(name: str, default: str = '') -> Dict[str, float]:
+    """读取 名称=数值 形式、逗号分隔的环境变量，返回字典；环境变量只需列出要覆盖的名称，其余使用默认值"""
+    mapping = {}
+    for item in [item.strip() for item in default.split(',') if item.strip()] + _split_env(name):
+        key, _, value = item.partition('=')
+        mapping[key.strip()] = float(value)
+    return mapping
+
+
 class Config:
     """应用配置类"""
     
@@ -36,6 +51,9 @@ class Config:
     MAIL_PASSWORD: Optional[str] = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER: Optional[str] = os.environ.get('MAIL_DEFAULT_SENDER')
     
+    # 服务器IP地址，为空时根据本机网卡地址自动解析
+    SERVER_IP: Optional[str] = os.environ.get('SERVER_IP')
+    
     # 钉钉配置
     DINGTALK_WEBHOOK: Optional[str] = os.environ.get('DINGTALK_WEBHOOK')
     
@@ -43,10 +61,96 @@ class Config:
     MEMORY_THRESHOLD: float = float(os.environ.get('MEMORY_THRESHOLD') or 80.0)
     DISK_THRESHOLD: float = float(os.environ.get('DISK_THRESHOLD') or 80.0)
     
+    # 采集器配置
+    # Linux下是否使用/proc快速读取路径，其他平台自动回退到psutil
+    USE_PROC_FAST_PATH: bool = os.environ.get('USE_PROC_FAST_PATH', 'True').lower() in ['true', '1', 'yes']
+    PROC_ROOT: str = os.environ.get('PROC_ROOT') or '/proc'
+    
+    # 磁盘分区过滤配置
+    # 文件系统类型白名单，为空时只采集物理文件系统
+    DISK_INCLUDE_FSTYPES: List[str] = _split_env('DISK_INCLUDE_FSTYPES')
+    DISK_EXCLUDE_FSTYPES: List[str] = _split_env('DISK_EXCLUDE_FSTYPES', 'tmpfs,devtmpfs,overlay,squashfs,iso9660')
+    # 挂载点白名单/黑名单，支持通配符，白名单为空时不限制
+    DISK_INCLUDE_MOUNTPOINTS: List[str] = _split_env('DISK_INCLUDE_MOUNTPOINTS')
+    DISK_EXCLUDE_MOUNTPOINTS: List[str] = _split_env(
+        'DISK_EXCLUDE_MOUNTPOINTS',
+        '/proc/*,/sys/*,/dev/*,/run/*,/snap/*,/var/lib/docker/*,/var/lib/kubelet/*,/var/lib/containers/*'
+    )
+    # 无法监听挂载表变化的平台上，挂载表缓存的重建间隔（秒）
+    MOUNT_TABLE_TTL: int = int(os.environ.get('MOUNT_TABLE_TTL') or 300)
+    
+    # 磁盘I/O采集时排除的设备（通配符）
+    DISK_IO_EXCLUDE_DEVICES: List[str] = _split_env('DISK_IO_EXCLUDE_DEVICES', 'loop*,ram*,zram*,sr*,fd*')
+    
+    # 网络流量采集时排除的网卡（通配符），默认排除回环和容器veth网卡
+    NET_EXCLUDE_INTERFACES: List[str] = _split_env('NET_EXCLUDE_INTERFACES', 'lo,lo0,Loopback*,veth*')
+    
+    # 趋势接口默认返回的最大数据点数
+    TREND_MAX_POINTS: int = int(os.environ.get('TREND_MAX_POINTS') or 360)
+    # 统计平均值/最大值时至少使用的汇总时间桶数（决定统计使用的汇总粒度）
+    ROLLUP_SUMMARY_MIN_BUCKETS: int = int(os.environ.get('ROLLUP_SUMMARY_MIN_BUCKETS') or 100)
+    # 内存中环形缓冲区保存最近多少秒的系统和磁盘数据，范围内的趋势查询不访问数据库
+    RECENT_BUFFER_SECONDS: int = int(os.environ.get('RECENT_BUFFER_SECONDS') or 3600)
+    
+    # 应用程序版本探测配置
+    # 内置工具: java,docker,node,nginx,mysql,redis,git；也可以使用 名称=命令 的形式自定义
+    VERSION_PROBE_TOOLS: List[str] = _split_env('VERSION_PROBE_TOOLS', 'java,docker')
+    VERSION_PROBE_TTL: int = int(os.environ.get('VERSION_PROBE_TTL') or 3600)
+    VERSION_PROBE_TIMEOUT: int = int(os.environ.get('VERSION_PROBE_TIMEOUT') or 5)
+    
+    # 进程排行配置
+    PROCESS_TOP_N: int = int(os.environ.get('PROCESS_TOP_N') or 20)
+    PROCESS_RANK_KEYS: List[str] = _split_env('PROCESS_RANK_KEYS', 'memory_percent,cpu_percent,rss,num_threads,num_fds')
+    # 进程排行的增量存储：CPU/内存占用率变化超过多少百分点时写入记录，以及关键帧（完整排行）的间隔（秒）
+    PROCESS_DELTA_CPU: float = float(os.environ.get('PROCESS_DELTA_CPU') or 2.0)
+    PROCESS_DELTA_MEMORY: float = float(os.environ.get('PROCESS_DELTA_MEMORY') or 0.5)
+    PROCESS_KEYFRAME_INTERVAL: int = int(os.environ.get('PROCESS_KEYFRAME_INTERVAL') or 600)
+    
     # 定时任务频率配置（秒）
     COLLECT_SYSTEM_DATA_INTERVAL: int = int(os.environ.get('COLLECT_SYSTEM_DATA_INTERVAL') or 10)
+    # 采集阶段并发执行的线程数和单次采集等待各阶段的超时时间（秒）
+    COLLECT_STAGE_WORKERS: int = int(os.environ.get('COLLECT_STAGE_WORKERS') or 8)
+    COLLECT_STAGE_TIMEOUT: float = float(os.environ.get('COLLECT_STAGE_TIMEOUT') or 5)
     CHECK_THRESHOLDS_INTERVAL: int = int(os.environ.get('CHECK_THRESHOLDS_INTERVAL') or 3600)
     
+    # 数据保留策略：各表（原始数据和汇总数据）的保留天数，0表示永久保留
+    RETENTION_DAYS: Dict[str, float] = _split_env_mapping(
+        'RETENTION_DAYS',
+        'process_info=2,system_info=14,disk_info=14,disk_io_info=14,network_info=14,collection=14,alert_record=365,'
+        'system_rollup_1m=30,system_rollup_5m=180,system_rollup_1h=730,'
+        'disk_rollup_1m=30,disk_rollup_5m=180,disk_rollup_1h=730'
+    )
+    # 过期数据清理任务的执行间隔（秒）、每批删除的行数和批次之间的停顿（秒）
+    RETENTION_INTERVAL: int = int(os.environ.get('RETENTION_INTERVAL') or 3600)
+    RETENTION_BATCH_SIZE: int = int(os.environ.get('RETENTION_BATCH_SIZE') or 2000)
+    RETENTION_BATCH_PAUSE: float = float(os.environ.get('RETENTION_BATCH_PAUSE') or 0.05)
+    # SQLite每次增量回收的空闲页数
+    RETENTION_VACUUM_PAGES: int = int(os.environ.get('RETENTION_VACUUM_PAGES') or 1000)
+    
+    # 快照写入缓冲：队列最多缓存的快照数、每个事务最多写入的快照数、写入线程的等待时间（秒）和写入失败后的重试间隔（秒）
+    WRITE_BUFFER_MAX_SIZE: int = int(os.environ.get('WRITE_BUFFER_MAX_SIZE') or 1000)
+    WRITE_BUFFER_BATCH_SIZE: int = int(os.environ.get('WRITE_BUFFER_BATCH_SIZE') or 50)
+    WRITE_BUFFER_FLUSH_INTERVAL: float = float(os.environ.get('WRITE_BUFFER_FLUSH_INTERVAL') or 1)
+    WRITE_BUFFER_RETRY_INTERVAL: float = float(os.environ.get('WRITE_BUFFER_RETRY_INTERVAL') or 30)
+    # 数据库不可用时保存快照的溢出文件
+    WRITE_BUFFER_SPILL_PATH: str = os.environ.get('WRITE_BUFFER_SPILL_PATH') or os.path.join(BASE_DIR, 'db', 'spill', 'snapshots.jsonl')
+    # 非连接类错误（如约束冲突、数据类型错误）导致写入失败的快照最多重试的次数，超过后移入隔离文件
+    WRITE_BUFFER_MAX_ATTEMPTS: int = int(os.environ.get('WRITE_BUFFER_MAX_ATTEMPTS') or 3)
+    WRITE_BUFFER_QUARANTINE_PATH: str = os.environ.get('WRITE_BUFFER_QUARANTINE_PATH') or os.path.join(BASE_DIR, 'db', 'spill', 'quarantine.jsonl')
+    
+    # 列式归档：归档目录、超过多少天的数据进行归档、归档分段的保留天数（0表示永久保留）和归档任务的执行间隔（秒）
+    ARCHIVE_DIR: str = os.environ.get('ARCHIVE_DIR') or os.path.join(BASE_DIR, 'db', 'archive')
+    ARCHIVE_AFTER_DAYS: int = int(os.environ.get('ARCHIVE_AFTER_DAYS') or 3)
+    ARCHIVE_RETENTION_DAYS: int = int(os.environ.get('ARCHIVE_RETENTION_DAYS') or 730)
+    ARCHIVE_INTERVAL: int = int(os.environ.get('ARCHIVE_INTERVAL') or 3600)
+    
+    # 采集数据的存储引擎：sql（数据库）或 segment（本地追加写入的分段文件，进程排行和告警记录仍保存在数据库中）
+    STORAGE_BACKEND: str = (os.environ.get('STORAGE_BACKEND') or 'sql').lower()
+    # 分段文件引擎：分段目录、原始样本和小时汇总的保留天数（0表示永久保留）
+    STORAGE_SEGMENT_DIR: str = os.environ.get('STORAGE_SEGMENT_DIR') or os.path.join(BASE_DIR, 'db', 'segments')
+    STORAGE_SEGMENT_RAW_DAYS: int = int(os.environ.get('STORAGE_SEGMENT_RAW_DAYS') or 30)
+    STORAGE_SEGMENT_HOURLY_DAYS: int = int(os.environ.get('STORAGE_SEGMENT_HOURLY_DAYS') or 730)
+    
     # 解析GENERATE_WEEKLY_REPORT_INTERVAL，支持表达式
     _generate_weekly_report_interval = os.environ.get('GENERATE_WEEKLY_REPORT_INTERVAL') or '300'
     try:
@@ -0,0 +1,364 @@
+# app/database/archive.py
+"""冷数据的列式归档（按天保存的NumPy数组文件，读取时内存映射）"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+from sqlalchemy import func, select
+
+from app.config.config import Config
+from app.database.database_manager import DatabaseManager
+from app.database.models import SystemInfo, DiskInfo
+from app.utils.helpers import get_current_local_time
+
+
+class ArchiveManager:
+    """列式归档管理器
+
+    把超过 ``ARCHIVE_AFTER_DAYS`` 天的系统信息和磁盘信息按天压缩为列式分段：每个分段是一个目录，
+    每列一个定长的 ``.npy`` 文件（时间戳为datetime64[us]，数值为float），磁盘分段按设备、时间排序，
+    各设备的行范围记录在 ``meta.json`` 中。分段写完后不再修改，读取时以内存映射方式打开，
+    按时间范围返回的数组切片不复制数据；跨天的查询使用NumPy的向量化运算，不创建ORM对象。
+    尚未归档的最近几天从数据库读取后与归档数据拼接。SQL存储引擎读取原始数据时使用这里的数组。
+    """
+
+    SYSTEM = 'system'
+    DISK = 'disk'
+
+    SYSTEM_COLUMNS = {
+        'cpu_percent': np.float32, 'memory_percent': np.float32, 'disk_percent': np.float32,
+        'load_avg_1': np.float32, 'load_avg_5': np.float32, 'load_avg_15': np.float32
+    }
+    DISK_COLUMNS = {'percent': np.float32, 'total': np.float64, 'used': np.float64, 'free': np.float64}
+
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        directory: Optional[str] = None,
+        after_days: Optional[int] = None,
+        retention_days: Optional[int] = None
+    ):
+        """
+        初始化归档管理器
+
+        Args:
+            db_manager: 数据库管理器
+            directory: 归档目录
+            after_days: 超过多少天的数据进行归档
+            retention_days: 归档分段的保留天数，0表示永久保留
+        """
+        self.db_manager = db_manager
+        self.directory = directory or Config.ARCHIVE_DIR
+        self.after_days = Config.ARCHIVE_AFTER_DAYS if after_days is None else after_days
+        self.retention_days = Config.ARCHIVE_RETENTION_DAYS if retention_days is None else retention_days
+        self.last_report: Optional[Dict] = None
+        # 已打开的分段 {(类型, 日期): (列数组, 元数据)}，分段写完后不再修改，可以一直缓存
+        self._segments: Dict[Tuple[str, date], Tuple[Dict[str, np.ndarray], Dict]] = {}
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+
+    # ---------- 归档 ----------
+
+    def compact(self) -> Optional[Dict]:
+        """
+        把已满 ``after_days`` 天且尚未归档的日期写成分段，并删除超过保留期限的分段
+
+        Returns:
+            Optional[Dict]: 归档报告；上一次归档尚未结束时返回None
+        """
+        if not self._run_lock.acquire(blocking=False):
+            logger.warning("上一次数据归档尚未完成，跳过本次归档")
+            return None
+        try:
+            started = time.monotonic()
+            today = get_current_local_time().date()
+            last_day = today - timedelta(days=self.after_days)
+            report = {'archived': {}, 'pruned': self._prune(today)}
+            for kind, model, writer in (
+                (self.SYSTEM, SystemInfo, self._write_system_segment),
+                (self.DISK, DiskInfo, self._write_disk_segment),
+            ):
+                with self.db_manager.engine.connect() as connection:
+                    first = connection.execute(select(func.min(model.timestamp))).scalar()
+                if first is None:
+                    continue
+                day = first.date()
+                if self.retention_days > 0:
+                    day = max(day, today - timedelta(days=self.retention_days))
+                while day < last_day:
+                    if not os.path.exists(self._segment_path(kind, day)):
+                        rows = writer(day)
+                        if rows:
+                            report['archived'][f'{kind}/{day.isoformat()}'] = rows
+                    day += timedelta(days=1)
+            report['duration_seconds'] = round(time.monotonic() - started, 3)
+            self.last_report = report
+            if report['archived']:
+                logger.info(f"数据归档完成，新增 {len(report['archived'])} 个分段，耗时 {report['duration_seconds']} 秒")
+            return report
+        finally:
+            self._run_lock.release()
+
+    def _write_system_segment(self, day: date) -> int:
+        """把一天的系统信息写成分段，返回行数"""
+        columns = list(self.SYSTEM_COLUMNS)
+        rows = self._fetch(SystemInfo, columns, *self._day_range(day))
+        if not rows:
+            return 0
+        arrays = self._to_arrays(rows, columns, self.SYSTEM_COLUMNS)
+        self._write_segment(self.SYSTEM, day, arrays, {'rows': len(rows)})
+        return len(rows)
+
+    def _write_disk_segment(self, day: date) -> int:
+        """把一天的磁盘信息按设备、时间排序后写成分段，返回行数"""
+        columns = ['device'] + list(self.DISK_COLUMNS)
+        start, end = self._day_range(day)
+        with self.db_manager.engine.connect() as connection:
+            rows = connection.execute(
+                select(DiskInfo.timestamp, *[getattr(DiskInfo, column) for column in columns])
+                .where(DiskInfo.timestamp >= start, DiskInfo.timestamp < end)
+                .order_by(DiskInfo.device, DiskInfo.timestamp)
+            ).all()
+        if not rows:
+            return 0
+
+        devices = {}
+        for index, row in enumerate(rows):
+            device = row.device or ''
+            if device not in devices:
+                devices[device] = [index, index]
+            devices[device][1] = index + 1
+        arrays = self._to_arrays(rows, list(self.DISK_COLUMNS), self.DISK_COLUMNS)
+        self._write_segment(self.DISK, day, arrays, {'rows': len(rows), 'devices': devices})
+        return len(rows)
+
+    def _write_segment(self, kind: str, day: date, arrays: Dict[str, np.ndarray], meta: Dict) -> None:
+        """先写入临时目录再整体改名，读取方不会看到写了一半的分段"""
+        path = self._segment_path(kind, day)
+        temp_path = f'{path}.tmp-{os.getpid()}'
+        shutil.rmtree(temp_path, ignore_errors=True)
+        os.makedirs(temp_path)
+        for name, array in arrays.items():
+            np.save(os.path.join(temp_path, f'{name}.npy'), array)
+        with open(os.path.join(temp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(dict(meta, columns=list(arrays)), f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def _prune(self, today: date) -> List[str]:
+        """删除超过保留期限的分段"""
+        if self.retention_days <= 0:
+            return []
+        cutoff = today - timedelta(days=self.retention_days)
+        pruned = []
+        for kind in (self.SYSTEM, self.DISK):
+            for day in self.archived_days(kind):
+                if day >= cutoff:
+                    break
+                with self._lock:
+                    self._segments.pop((kind, day), None)
+                shutil.rmtree(self._segment_path(kind, day), ignore_errors=True)
+                pruned.append(f'{kind}/{day.isoformat()}')
+        return pruned
+
+    # ---------- 读取 ----------
+
+    def archived_days(self, kind: str) -> List[date]:
+        """已归档的日期（升序）"""
+        directory = os.path.join(self.directory, kind)
+        if not os.path.isdir(directory):
+            return []
+        days = []
+        for name in os.listdir(directory):
+            try:
+                days.append(datetime.strptime(name, '%Y%m%d').date())
+            except ValueError:
+                # 写入中的临时目录
+                continue
+        return sorted(days)
+
+    def system_segments(
+        self,
+        start: datetime,
+        end: datetime,
+        fields: Sequence[str] = ('cpu_percent', 'memory_percent')
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        按天返回时间范围 [start, end) 内已归档的系统信息
+
+        Yields:
+            Dict[str, np.ndarray]: timestamp和各字段的数组，是内存映射文件的切片（不复制数据）
+        """
+        for day in self._days_between(self.SYSTEM, start, end):
+            arrays, _ = self._open(self.SYSTEM, day)
+            lo, hi = self._bounds(arrays['timestamp'], start, end)
+            if hi > lo:
+                # 增加列之前写入的分段没有该列，按空值（NaN）返回
+                yield {
+                    name: arrays[name][lo:hi] if name in arrays else np.full(hi - lo, np.nan, dtype=np.float32)
+                    for name in ('timestamp',) + tuple(fields)
+                }
+
+    def disk_segments(
+        self,
+        start: datetime,
+        end: datetime,
+        device: Optional[str] = None
+    ) -> Iterator[Tuple[str, Dict[str, np.ndarray]]]:
+        """
+        按天返回时间范围 [start, end) 内已归档的各磁盘数据
+
+        Yields:
+            Tuple[str, Dict[str, np.ndarray]]: 设备名和timestamp、percent等列的数组切片（不复制数据）
+        """
+        for day in self._days_between(self.DISK, start, end):
+            arrays, meta = self._open(self.DISK, day)
+            for name, (first, last) in meta['devices'].items():
+                if device is not None and name != device:
+                    continue
+                lo, hi = self._bounds(arrays['timestamp'][first:last], start, end)
+                if hi > lo:
+                    yield name, {column: array[first + lo:first + hi] for column, array in arrays.items()}
+
+    def system_arrays(
+        self,
+        start: datetime,
+        end: datetime,
+        fields: Sequence[str] = ('cpu_percent', 'memory_percent')
+    ) -> Dict[str, np.ndarray]:
+        """
+        时间范围 [start, end) 内的系统信息数组（归档数据加上尚未归档的数据库数据）
+
+        Returns:
+            Dict[str, np.ndarray]: timestamp（datetime64[us]）和各字段的数组，按时间升序
+        """
+        parts = list(self.system_segments(start, end, fields))
+        for raw_start, raw_end in self._unarchived_ranges(self.SYSTEM, start, end):
+            rows = self._fetch(SystemInfo, fields, raw_start, raw_end)
+            if rows:
+                parts.append(self._to_arrays(rows, fields, self.SYSTEM_COLUMNS))
+        return self._concat(parts, ('timestamp',) + tuple(fields))
+
+    def disk_arrays(
+        self,
+        start: datetime,
+        end: datetime,
+        device: Optional[str] = None,
+        fields: Sequence[str] = ('percent',)
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        时间范围 [start, end) 内各磁盘的使用率等数组（归档数据加上尚未归档的数据库数据）
+
+        Returns:
+            Dict[str, Dict[str, np.ndarray]]: 设备名到timestamp和各字段数组的映射
+        """
+        parts: Dict[str, List[Dict[str, np.ndarray]]] = {}
+        for name, arrays in self.disk_segments(start, end, device):
+            parts.setdefault(name, []).append(arrays)
+        for raw_start, raw_end in self._unarchived_ranges(self.DISK, start, end):
+            query = select(DiskInfo.timestamp, DiskInfo.device, *[getattr(DiskInfo, field) for field in fields])\
+                .where(DiskInfo.timestamp >= raw_start, DiskInfo.timestamp < raw_end)
+            if device is not None:
+                query = query.where(DiskInfo.device == device)
+            with self.db_manager.engine.connect() as connection:
+                rows = connection.execute(query.order_by(DiskInfo.device, DiskInfo.timestamp)).all()
+            by_device: Dict[str, list] = {}
+            for row in rows:
+                by_device.setdefault(row.device, []).append(row)
+            for name, device_rows in by_device.items():
+                parts.setdefault(name, []).append(self._to_arrays(device_rows, fields, self.DISK_COLUMNS))
+        names = ('timestamp',) + tuple(fields)
+        return {name: self._concat(device_parts, names) for name, device_parts in parts.items()}
+
+    # ---------- 内部方法 ----------
+
+    def _segment_path(self, kind: str, day: date) -> str:
+        """分段目录"""
+        return os.path.join(self.directory, kind, day.strftime('%Y%m%d'))
+
+    def _open(self, kind: str, day: date) -> Tuple[Dict[str, np.ndarray], Dict]:
+        """以内存映射方式打开分段"""
+        key = (kind, day)
+        with self._lock:
+            segment = self._segments.get(key)
+            if segment is None:
+                path = self._segment_path(kind, day)
+                with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+                    meta = json.load(f)
+                arrays = {
+                    name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+                    for name in meta['columns']
+                }
+                segment = self._segments[key] = (arrays, meta)
+            return segment
+
+    def _days_between(self, kind: str, start: datetime, end: datetime) -> List[date]:
+        """时间范围内已归档的日期"""
+        return [day for day in self.archived_days(kind) if start.date() <= day <= end.date()]
+
+    def _unarchived_ranges(self, kind: str, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """时间范围中尚未归档、需要从数据库读取的部分"""
+        archived = set(self._days_between(kind, start, end))
+        ranges = []
+        cursor = start
+        while cursor < end:
+            day_end = min(datetime.combine(cursor.date() + timedelta(days=1), datetime.min.time()), end)
+            if cursor.date() not in archived:
+                if ranges and ranges[-1][1] == cursor:
+                    ranges[-1] = (ranges[-1][0], day_end)
+                else:
+                    ranges.append((cursor, day_end))
+            cursor = day_end
+        return ranges
+
+    def _fetch(self, model, columns: Sequence[str], start: datetime, end: datetime) -> List:
+        """从数据库读取时间范围内的时间戳和指定列（Core查询，不创建ORM对象）"""
+        with self.db_manager.engine.connect() as connection:
+            return connection.execute(
+                select(model.timestamp, *[getattr(model, column) for column in columns])
+                .where(model.timestamp >= start, model.timestamp < end)
+                .order_by(model.timestamp)
+            ).all()
+
+    @staticmethod
+    def _day_range(day: date) -> Tuple[datetime, datetime]:
+        """一天的起止时间"""
+        start = datetime.combine(day, datetime.min.time())
+        return start, start + timedelta(days=1)
+
+    @staticmethod
+    def _to_arrays(rows: List, columns: Sequence[str], dtypes: Dict) -> Dict[str, np.ndarray]:
+        """把查询结果转换为列数组，空值记为NaN"""
+        arrays = {'timestamp': np.array([row.timestamp for row in rows], dtype='datetime64[us]')}
+        for column in columns:
+            arrays[column] = np.array(
+                [getattr(row, column) for row in rows], dtype=np.float64
+            ).astype(dtypes.get(column, np.float64))
+        return arrays
+
+    @staticmethod
+    def _bounds(timestamps: np.ndarray, start: datetime, end: datetime) -> Tuple[int, int]:
+        """有序时间戳数组中 [start, end) 的下标范围"""
+        return (
+            int(np.searchsorted(timestamps, np.datetime64(start, 'us'), side='left')),
+            int(np.searchsorted(timestamps, np.datetime64(end, 'us'), side='left'))
+        )
+
+    @staticmethod
+    def _concat(parts: List[Dict[str, np.ndarray]], names: Sequence[str]) -> Dict[str, np.ndarray]:
+        """按时间顺序拼接多个分段，只有一个分段时直接返回（不复制）"""
+        if len(parts) == 1:
+            return {name: parts[0][name] for name in names}
+        if not parts:
+            return {
+                name: np.array([], dtype='datetime64[us]' if name == 'timestamp' else np.float32)
+                for name in names
+            }
+        parts.sort(key=lambda part: part['timestamp'][0])
+        return {name: np.concatenate([part[name] for part in parts]) for name in names}
@@ -3,13 +3,13 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.ext.declarative import declarative_base
 from contextlib import contextmanager
-from typing import Generator, Optional, Dict, List
+from typing import Generator, List
 import os
 from loguru import logger
 
-from app.database.models import Base, SystemInfo, ProcessInfo, DiskInfo, AlertRecord
+from app.database.models import Base, AlertRecord
 from app.config.config import Config
-from app.utils.helpers import get_current_local_time
+from app.monitoring.snapshot import CollectionSnapshot
 
 
 class DatabaseManager:
@@ -23,6 +23,15 @@ class DatabaseManager:
         self.engine = create_engine(database_url, echo=False)
         self.session_factory = scoped_session(sessionmaker(bind=self.engine))
         self.logger = logger
+        self._storage = None
+    
+    @property
+    def storage(self):
+        """按 ``STORAGE_BACKEND`` 选择的存储引擎（同一数据库的实例共享，见create_storage_engine）"""
+        if self._storage is None:
+            from app.database.storage import create_storage_engine
+            self._storage = create_storage_engine(self)
+        return self._storage
     
     @contextmanager
     def get_session(self) -> Generator:
@@ -37,57 +46,17 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def save_system_info(self, system_info: Dict) -> None:
-        """保存系统信息"""
-        try:
-            with self.get_session() as session:
-                system_record = SystemInfo(
-                    cpu_percent=system_info.get('cpu_percent'),
-                    memory_percent=system_info.get('memory_percent'),
-                    disk_percent=system_info.get('disk_percent', 0),
-                    uptime=system_info.get('boot_time'),
-                    load_average=str(system_info.get('load_average'))
-                )
-                session.add(system_record)
-            self.logger.info("系统信息保存成功")
-        except Exception as e:
-            self.logger.error(f"保存系统信息时出错: {e}")
-    
-    def save_process_info(self, processes: List[Dict]) -> None:
-        """保存进程信息"""
+    def save_snapshot(self, snapshot: CollectionSnapshot) -> None:
+        """保存一次采集的快照（出错时记录日志，不抛出异常）"""
         try:
-            with self.get_session() as session:
-                for proc in processes:
-                    process_record = ProcessInfo(
-                        pid=proc.get('pid'),
-                        name=proc.get('name'),
-                        status=proc.get('status'),
-                        cpu_percent=proc.get('cpu_percent'),
-                        memory_percent=proc.get('memory_percent'),
-                        create_time=proc.get('create_time')
-                    )
-                    session.add(process_record)
-            self.logger.info(f"进程信息保存成功，共保存 {len(processes)} 个进程")
+            self.save_snapshots([snapshot])
         except Exception as e:
-            self.logger.error(f"保存进程信息时出错: {e}")
+            self.logger.error(f"保存采集快照时出错: {e}")
     
-    def save_disk_info(self, disks: List[Dict]) -> None:
-        """保存磁盘信息"""
-        try:
-            with self.get_session() as session:
-                for disk in disks:
-                    disk_record = DiskInfo(
-                        device=disk.get('device'),
-                        mountpoint=disk.get('mountpoint'),
-                        total=disk.get('total'),
-                        used=disk.get('used'),
-                        free=disk.get('free'),
-                        percent=disk.get('percent')
-                    )
-                    session.add(disk_record)
-            self.logger.info(f"磁盘信息保存成功，共保存 {len(disks)} 个磁盘分区")
-        except Exception as e:
-            self.logger.error(f"保存磁盘信息时出错: {e}")
+    def save_snapshots(self, snapshots: List[CollectionSnapshot]) -> None:
+        """保存一批采集的快照（见StorageEngine.write_snapshots），出错时抛出异常"""
+        written = self.storage.write_snapshots(snapshots)
+        self.logger.info(f"采集快照保存成功，共 {len(snapshots)} 次采集，{written} 条记录")
     
     def save_alert_record(self, alert_type: str, message: str, is_sent: int = 0) -> None:
         """保存预警记录"""
@@ -43,6 +43,10 @@ def init_database() -> None:
             
             # 如果没有当前版本，说明数据库是新的，需要运行所有迁移
             if current_rev is None:
+                if engine.dialect.name == 'sqlite' and not inspect(connection).get_table_names():
+                    # 新建的SQLite数据库启用增量回收，过期数据清理后可以逐步归还空闲页
+                    connection.exec_driver_sql('PRAGMA auto_vacuum = INCREMENTAL')
+                    connection.exec_driver_sql('VACUUM')
                 logger.info("数据库未初始化，正在创建表结构...")
                 command.upgrade(alembic_cfg, "head")
                 logger.info("数据库初始化完成")
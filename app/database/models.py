@@ -1,6 +1,6 @@
 # app/database/models.py
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index, ForeignKey, Boolean, false, text
+from sqlalchemy.ext.declarative import declarative_base, declared_attr
 from datetime import datetime
 from typing import Optional
 from app.utils.helpers import get_current_local_time
@@ -8,9 +8,24 @@ from app.utils.helpers import get_current_local_time
 Base = declarative_base()
 
 
+class Collection(Base):
+    """采集批次模型（每次采集一条记录）"""
+    __tablename__ = 'collection'
+    
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, default=get_current_local_time, index=True)
+    
+    def __repr__(self) -> str:
+        return f"<Collection(id={self.id}, timestamp={self.timestamp})>"
+
+
 class SystemInfo(Base):
     """系统信息模型"""
     __tablename__ = 'system_info'
+    __table_args__ = (
+        # 覆盖最新记录查询、按时间范围的CPU/内存趋势和周报平均值查询
+        Index('ix_system_info_timestamp_cpu_memory', 'timestamp', 'cpu_percent', 'memory_percent'),
+    )
     
     id = Column(Integer, primary_key=True)
     timestamp = Column(DateTime, default=get_current_local_time)
@@ -18,35 +33,77 @@ class SystemInfo(Base):
     memory_percent = Column(Float)
     disk_percent = Column(Float)
     uptime = Column(Float)  # 系统运行时间
-    load_average = Column(String(100))  # 系统负载
+    load_avg_1 = Column(Float)  # 1分钟平均负载
+    load_avg_5 = Column(Float)  # 5分钟平均负载
+    load_avg_15 = Column(Float)  # 15分钟平均负载
     
     def __repr__(self) -> str:
         return f"<SystemInfo(id={self.id}, timestamp={self.timestamp}, memory={self.memory_percent}%"
 
 
+class ProcessName(Base):
+    """进程名称字典（进程记录只保存名称ID）"""
+    __tablename__ = 'process_name'
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), unique=True, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<ProcessName(id={self.id}, name={self.name})>"
+
+
+class ProcessStatus(Base):
+    """进程状态字典（进程记录只保存状态ID）"""
+    __tablename__ = 'process_status'
+    
+    id = Column(Integer, primary_key=True)
+    status = Column(String(50), unique=True, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<ProcessStatus(id={self.id}, status={self.status})>"
+
+
 class ProcessInfo(Base):
-    """进程信息模型"""
+    """进程信息模型
+    
+    关键帧记录该次采集的全部排行进程；两个关键帧之间只记录指标变化超过阈值、名称或状态变化、新进入排行、
+    以及离开排行的进程（departed为真），由 ``ProcessStore`` 重建任意时刻的完整排行。
+    """
     __tablename__ = 'process_info'
+    __table_args__ = (
+        # 查找某一时刻之前最近的关键帧（部分索引，只包含关键帧记录）
+        Index(
+            'ix_process_info_keyframe_timestamp', 'timestamp',
+            sqlite_where=text('is_keyframe = 1'), postgresql_where=text('is_keyframe')
+        ),
+    )
     
     id = Column(Integer, primary_key=True)
-    timestamp = Column(DateTime, default=get_current_local_time)
+    collection_id = Column(Integer, ForeignKey('collection.id'), index=True)  # 所属采集批次
+    timestamp = Column(DateTime, default=get_current_local_time, index=True)
     pid = Column(Integer)
-    name = Column(String(100))
-    status = Column(String(50))
+    name_id = Column(Integer, ForeignKey('process_name.id'))
+    status_id = Column(Integer, ForeignKey('process_status.id'))
     cpu_percent = Column(Float)
     memory_percent = Column(Float)
     create_time = Column(Float)  # 进程创建时间
+    departed = Column(Boolean, default=False, server_default=false(), nullable=False)  # 是否为离开排行的标记记录
+    is_keyframe = Column(Boolean, default=False, server_default=false(), nullable=False)
     
     def __repr__(self) -> str:
-        return f"<ProcessInfo(id={self.id}, pid={self.pid}, name={self.name})"
+        return f"<ProcessInfo(id={self.id}, pid={self.pid}, name_id={self.name_id})"
 
 
 class DiskInfo(Base):
     """磁盘信息模型"""
     __tablename__ = 'disk_info'
+    __table_args__ = (
+        Index('ix_disk_info_device_timestamp', 'device', 'timestamp'),
+    )
     
     id = Column(Integer, primary_key=True)
-    timestamp = Column(DateTime, default=get_current_local_time)
+    collection_id = Column(Integer, ForeignKey('collection.id'), index=True)  # 所属采集批次
+    timestamp = Column(DateTime, default=get_current_local_time, index=True)
     device = Column(String(100))  # 设备名
     mountpoint = Column(String(200))  # 挂载点
     total = Column(Float)  # 总空间
@@ -58,12 +115,148 @@ class DiskInfo(Base):
         return f"<DiskInfo(id={self.id}, device={self.device}, percent={self.percent}%"
 
 
+class DiskIOInfo(Base):
+    """磁盘I/O信息模型（每个设备每次采集的速率）"""
+    __tablename__ = 'disk_io_info'
+    __table_args__ = (
+        Index('ix_disk_io_info_device_timestamp', 'device', 'timestamp'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, default=get_current_local_time, index=True)
+    device = Column(String(100))  # 设备名
+    read_bytes_per_sec = Column(Float)  # 读取速率（字节/秒）
+    write_bytes_per_sec = Column(Float)  # 写入速率（字节/秒）
+    read_iops = Column(Float)  # 每秒读取次数
+    write_iops = Column(Float)  # 每秒写入次数
+    await_ms = Column(Float)  # 平均I/O等待时间（毫秒）
+    util_percent = Column(Float)  # 设备繁忙时间占比
+    
+    def __repr__(self) -> str:
+        return f"<DiskIOInfo(id={self.id}, device={self.device}, util={self.util_percent}%)>"
+
+
+class NetworkInfo(Base):
+    """网络流量信息模型（每个网卡每次采集的速率）"""
+    __tablename__ = 'network_info'
+    __table_args__ = (
+        Index('ix_network_info_interface_timestamp', 'interface', 'timestamp'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, default=get_current_local_time, index=True)
+    interface = Column(String(100))  # 网卡名
+    bytes_sent_per_sec = Column(Float)  # 发送速率（字节/秒）
+    bytes_recv_per_sec = Column(Float)  # 接收速率（字节/秒）
+    packets_sent_per_sec = Column(Float)  # 每秒发送包数
+    packets_recv_per_sec = Column(Float)  # 每秒接收包数
+    errin_per_sec = Column(Float)  # 每秒接收错误数
+    errout_per_sec = Column(Float)  # 每秒发送错误数
+    dropin_per_sec = Column(Float)  # 每秒接收丢包数
+    dropout_per_sec = Column(Float)  # 每秒发送丢包数
+    
+    def __repr__(self) -> str:
+        return f"<NetworkInfo(id={self.id}, interface={self.interface}, recv={self.bytes_recv_per_sec}B/s)>"
+
+
+class SystemRollupMixin:
+    """系统信息汇总数据（每个时间桶一条记录，平均值 = 合计 / 该字段的样本数）
+
+    缺失的值不参与汇总，各字段分别记录有值的样本数；时间桶内某字段没有任何值时，
+    该字段的最小值、最大值和合计为空。
+    """
+    
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, nullable=False, unique=True, index=True)  # 时间桶起点
+    count = Column(Integer, nullable=False)  # 样本数
+    cpu_percent_min = Column(Float)
+    cpu_percent_max = Column(Float)
+    cpu_percent_sum = Column(Float)
+    cpu_percent_count = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    memory_percent_min = Column(Float)
+    memory_percent_max = Column(Float)
+    memory_percent_sum = Column(Float)
+    memory_percent_count = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    # 平均负载；迁移前已删除原始数据的时间桶为空
+    load_avg_1_min = Column(Float)
+    load_avg_1_max = Column(Float)
+    load_avg_1_sum = Column(Float)
+    load_avg_1_count = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    load_avg_5_min = Column(Float)
+    load_avg_5_max = Column(Float)
+    load_avg_5_sum = Column(Float)
+    load_avg_5_count = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    load_avg_15_min = Column(Float)
+    load_avg_15_max = Column(Float)
+    load_avg_15_sum = Column(Float)
+    load_avg_15_count = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}(timestamp={self.timestamp}, count={self.count})>"
+
+
+class SystemRollup1m(SystemRollupMixin, Base):
+    """系统信息1分钟汇总"""
+    __tablename__ = 'system_rollup_1m'
+    RESOLUTION = 60
+
+
+class SystemRollup5m(SystemRollupMixin, Base):
+    """系统信息5分钟汇总"""
+    __tablename__ = 'system_rollup_5m'
+    RESOLUTION = 300
+
+
+class SystemRollup1h(SystemRollupMixin, Base):
+    """系统信息1小时汇总"""
+    __tablename__ = 'system_rollup_1h'
+    RESOLUTION = 3600
+
+
+class DiskRollupMixin:
+    """磁盘使用率汇总数据（每个设备每个时间桶一条记录）"""
+    
+    @declared_attr
+    def __table_args__(cls):
+        return (Index(f'ix_{cls.__tablename__}_device_timestamp', 'device', 'timestamp', unique=True),)
+    
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, nullable=False, index=True)  # 时间桶起点
+    device = Column(String(100), nullable=False)  # 设备名
+    count = Column(Integer, nullable=False)  # 样本数
+    percent_min = Column(Float)
+    percent_max = Column(Float)
+    percent_sum = Column(Float)
+    percent_count = Column(Integer, nullable=False, default=0, server_default=text('0'))  # 有使用率的样本数
+    
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}(device={self.device}, timestamp={self.timestamp}, count={self.count})>"
+
+
+class DiskRollup1m(DiskRollupMixin, Base):
+    """磁盘使用率1分钟汇总"""
+    __tablename__ = 'disk_rollup_1m'
+    RESOLUTION = 60
+
+
+class DiskRollup5m(DiskRollupMixin, Base):
+    """磁盘使用率5分钟汇总"""
+    __tablename__ = 'disk_rollup_5m'
+    RESOLUTION = 300
+
+
+class DiskRollup1h(DiskRollupMixin, Base):
+    """磁盘使用率1小时汇总"""
+    __tablename__ = 'disk_rollup_1h'
+    RESOLUTION = 3600
+
+
 class AlertRecord(Base):
     """预警记录模型"""
     __tablename__ = 'alert_record'
     
     id = Column(Integer, primary_key=True)
-    timestamp = Column(DateTime, default=get_current_local_time)
+    timestamp = Column(DateTime, default=get_current_local_time, index=True)
     alert_type = Column(String(50))  # 预警类型
     message = Column(Text)  # 预警信息
     is_sent = Column(Integer, default=0)  # 是否已发送
@@ -0,0 +1,245 @@
+# app/database/process_store.py
+"""进程排行的增量存储（名称和状态字典编码，关键帧加变化记录）"""
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import desc, insert, select
+
+from app.config.config import Config
+from app.database.models import Collection, ProcessInfo, ProcessName, ProcessStatus
+
+
+class ProcessStore:
+    """进程排行存储
+
+    写入时进程名称和状态转换为字典表中的整数ID。每隔 ``PROCESS_KEYFRAME_INTERVAL`` 秒写一次关键帧
+    （本次采集的全部排行进程），其余采集只写入相对上一次写入的记录发生变化的进程：
+    CPU或内存占用率的变化超过 ``PROCESS_DELTA_CPU`` / ``PROCESS_DELTA_MEMORY``、名称或状态变化、
+    新进入排行，以及离开排行（departed为真）。排名不保存，读取时按占用率重新排序；
+    变化未超过阈值的进程保留的旧值与本次的名次先后不一致时（如两个占用率接近的进程交换名次），
+    这些进程也写入记录，保证按保存的值重新排序得到的就是本次的排行。
+    其他进程进出排行引起的名次变化不影响先后顺序，不产生记录。读取时从不晚于指定时刻的最近关键帧开始依次应用变化记录，
+    重建该时刻的完整排行。
+
+    编码状态保存在内存中并在同一进程内共享；写入事务失败时调用 ``reset``，下一次写入重新生成关键帧。
+    """
+
+    def __init__(
+        self,
+        cpu_delta: Optional[float] = None,
+        memory_delta: Optional[float] = None,
+        keyframe_interval: Optional[float] = None
+    ):
+        """
+        初始化进程排行存储
+
+        Args:
+            cpu_delta: CPU占用率变化超过该值（百分点）时写入记录
+            memory_delta: 内存占用率变化超过该值（百分点）时写入记录
+            keyframe_interval: 关键帧的间隔（秒）
+        """
+        self.cpu_delta = Config.PROCESS_DELTA_CPU if cpu_delta is None else cpu_delta
+        self.memory_delta = Config.PROCESS_DELTA_MEMORY if memory_delta is None else memory_delta
+        self.keyframe_interval = Config.PROCESS_KEYFRAME_INTERVAL if keyframe_interval is None else keyframe_interval
+        self._lock = threading.Lock()
+        self._names: Dict[str, int] = {}
+        self._statuses: Dict[str, int] = {}
+        # 上一次写入的各进程记录 {(pid, create_time): 记录}
+        self._last: Dict[Tuple, Dict] = {}
+        self._last_keyframe: Optional[datetime] = None
+
+    def reset(self) -> None:
+        """丢弃编码状态（写入事务回滚后调用），下一次写入生成关键帧"""
+        with self._lock:
+            self._names.clear()
+            self._statuses.clear()
+            self._last.clear()
+            self._last_keyframe = None
+
+    def encode(self, connection, collection_id: int, timestamp: datetime, processes: List[Dict]) -> List[Dict]:
+        """
+        生成一次采集需要写入的进程记录（在调用方的事务中登记新的名称和状态）
+
+        Args:
+            connection: 数据库连接（处于事务中）
+            collection_id: 采集批次ID
+            timestamp: 采集时间
+            processes: 按内存占用率降序排列的排行进程
+
+        Returns:
+            List[Dict]: 需要插入process_info表的记录
+        """
+        with self._lock:
+            name_ids = self._intern(connection, ProcessName.__table__, 'name', self._names,
+                                    {proc.get('name') or '' for proc in processes})
+            status_ids = self._intern(connection, ProcessStatus.__table__, 'status', self._statuses,
+                                      {proc.get('status') or '' for proc in processes})
+
+            keyframe = (
+                self._last_keyframe is None
+                or (timestamp - self._last_keyframe).total_seconds() >= self.keyframe_interval
+                or timestamp < self._last_keyframe
+            )
+            current = {}
+            changed = set()
+            ranked = []
+            for proc in processes:
+                row = {
+                    'collection_id': collection_id,
+                    'timestamp': timestamp,
+                    'pid': proc.get('pid'),
+                    'name_id': name_ids[proc.get('name') or ''],
+                    'status_id': status_ids[proc.get('status') or ''],
+                    'cpu_percent': proc.get('cpu_percent'),
+                    'memory_percent': proc.get('memory_percent'),
+                    'create_time': proc.get('create_time'),
+                    'departed': False,
+                    'is_keyframe': keyframe
+                }
+                key = (row['pid'], row['create_time'])
+                ranked.append((key, row))
+                previous = self._last.get(key)
+                if keyframe or previous is None or self._changed(previous, row):
+                    changed.add(key)
+                    current[key] = row
+                else:
+                    current[key] = previous
+
+            self._write_swapped(ranked, current, changed)
+            rows = [row for key, row in ranked if key in changed]
+
+            if not keyframe:
+                # 离开排行的进程写一条标记记录
+                for key, previous in self._last.items():
+                    if key not in current:
+                        rows.append(dict(
+                            previous, collection_id=collection_id, timestamp=timestamp,
+                            departed=True, is_keyframe=False
+                        ))
+
+            self._last = current
+            if keyframe:
+                self._last_keyframe = timestamp
+            return rows
+
+    @staticmethod
+    def _write_swapped(ranked: List[Tuple[Tuple, Dict]], current: Dict[Tuple, Dict], changed: set) -> None:
+        """
+        保存的值与本次名次先后不一致的相邻进程改为写入本次的记录
+
+        已写入的记录使用本次的值，彼此的先后总是正确的，每一轮至少新增一个写入的进程，最多进行len(ranked)轮。
+
+        Args:
+            ranked: 按本次名次排列的 (进程标识, 本次的记录)
+            current: 进程标识到保存的记录（本次写入的记录或之前写入的记录）的映射，原地更新
+            changed: 本次写入记录的进程标识，原地更新
+        """
+        while True:
+            swapped = set()
+            for (upper, upper_row), (lower, lower_row) in zip(ranked, ranked[1:]):
+                stored_upper = current[upper]['memory_percent'] or 0
+                stored_lower = current[lower]['memory_percent'] or 0
+                if stored_upper < stored_lower or (
+                    stored_upper == stored_lower and (upper_row['memory_percent'] or 0) > (lower_row['memory_percent'] or 0)
+                ):
+                    swapped.update(key for key in (upper, lower) if key not in changed)
+            if not swapped:
+                return
+            for key, row in ranked:
+                if key in swapped:
+                    changed.add(key)
+                    current[key] = row
+
+    def _changed(self, previous: Dict, row: Dict) -> bool:
+        """相对上一次写入的记录是否需要重新写入"""
+        return (
+            previous['status_id'] != row['status_id']
+            or previous['name_id'] != row['name_id']
+            or abs((row['cpu_percent'] or 0) - (previous['cpu_percent'] or 0)) >= self.cpu_delta
+            or abs((row['memory_percent'] or 0) - (previous['memory_percent'] or 0)) >= self.memory_delta
+        )
+
+    @staticmethod
+    def _intern(connection, table, column: str, cache: Dict[str, int], values: set) -> Dict[str, int]:
+        """把字符串转换为字典表中的ID，没有的值插入字典表"""
+        missing = [value for value in values if value not in cache]
+        if missing:
+            existing = connection.execute(
+                select(table.c.id, table.c[column]).where(table.c[column].in_(missing))
+            ).all()
+            cache.update({value: id_ for id_, value in existing})
+            new_values = [value for value in missing if value not in cache]
+            if new_values:
+                connection.execute(insert(table), [{column: value} for value in new_values])
+                inserted = connection.execute(
+                    select(table.c.id, table.c[column]).where(table.c[column].in_(new_values))
+                ).all()
+                cache.update({value: id_ for id_, value in inserted})
+        return cache
+
+    def snapshot_at(
+        self,
+        session,
+        at: Optional[datetime] = None,
+        sort_key: str = 'memory_percent',
+        limit: Optional[int] = None
+    ) -> Tuple[Optional[datetime], List[Dict]]:
+        """
+        重建某一时刻的进程排行
+
+        Args:
+            session: 数据库会话
+            at: 时刻，为空时为最新
+            sort_key: 排序字段（memory_percent、cpu_percent）
+            limit: 返回的进程数量，为空时返回全部
+
+        Returns:
+            Tuple[Optional[datetime], List[Dict]]: 排行对应的采集时间和按sort_key降序的进程列表
+        """
+        keyframe_query = session.query(ProcessInfo.timestamp).filter(ProcessInfo.is_keyframe)
+        if at is not None:
+            keyframe_query = keyframe_query.filter(ProcessInfo.timestamp <= at)
+        keyframe = keyframe_query.order_by(desc(ProcessInfo.timestamp)).first()
+        if keyframe is None:
+            return None, []
+
+        query = session.query(
+            ProcessInfo.id, ProcessInfo.timestamp, ProcessInfo.pid, ProcessName.name, ProcessStatus.status,
+            ProcessInfo.cpu_percent, ProcessInfo.memory_percent, ProcessInfo.create_time,
+            ProcessInfo.departed
+        ).outerjoin(ProcessName, ProcessInfo.name_id == ProcessName.id)\
+            .outerjoin(ProcessStatus, ProcessInfo.status_id == ProcessStatus.id)\
+            .filter(ProcessInfo.timestamp >= keyframe.timestamp)
+        if at is not None:
+            query = query.filter(ProcessInfo.timestamp <= at)
+
+        processes: Dict[Tuple, Dict] = {}
+        for record in query.order_by(ProcessInfo.timestamp, ProcessInfo.id):
+            key = (record.pid, record.create_time)
+            if record.departed:
+                processes.pop(key, None)
+                continue
+            processes[key] = {
+                'id': record.id,
+                'pid': record.pid,
+                'name': record.name,
+                'status': record.status,
+                'cpu_percent': record.cpu_percent,
+                'memory_percent': record.memory_percent,
+                'create_time': record.create_time
+            }
+
+        # 排行对应的采集时间：不晚于该时刻的最近一次采集
+        collection_query = session.query(Collection.timestamp)
+        if at is not None:
+            collection_query = collection_query.filter(Collection.timestamp <= at)
+        collection = collection_query.order_by(desc(Collection.timestamp)).first()
+
+        result = sorted(processes.values(), key=lambda proc: proc.get(sort_key) or 0, reverse=True)
+        return (collection.timestamp if collection else keyframe.timestamp), result[:limit] if limit else result
+
+
+# 全局进程排行存储实例
+process_store = ProcessStore()
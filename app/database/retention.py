@@ -0,0 +1,182 @@
+# app/database/retention.py
+"""过期数据清理（按表的保留策略分批删除）"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import Table, delete, exists, func, select
+
+from app.config.config import Config
+from app.database.database_manager import DatabaseManager
+from app.database.models import Base
+from app.utils.helpers import get_current_local_time
+
+
+class RetentionManager:
+    """过期数据清理器
+
+    按 ``RETENTION_DAYS`` 中各表的保留天数删除过期数据。每批只删除 ``RETENTION_BATCH_SIZE`` 行，
+    每批单独提交并在批次之间停顿，避免长时间占用SQLite的写锁而阻塞采集任务；
+    采集批次表只删除不再被磁盘和进程记录引用的行。按关键帧和增量保存的表（进程排行）
+    把截止时间向前对齐到不晚于它的最近一个关键帧，保留的增量记录总能找到其关键帧。
+    删除完成后对SQLite执行增量回收。
+    """
+
+    # 被其他表通过collection_id引用的表，最后清理
+    REFERENCED_TABLES = ('collection',)
+
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        policies: Optional[Dict[str, float]] = None,
+        batch_size: Optional[int] = None,
+        batch_pause: Optional[float] = None
+    ):
+        """
+        初始化清理器
+
+        Args:
+            db_manager: 数据库管理器
+            policies: 表名到保留天数的映射，0表示永久保留
+            batch_size: 每批删除的行数
+            batch_pause: 批次之间的停顿时间（秒）
+        """
+        self.db_manager = db_manager
+        self.policies = Config.RETENTION_DAYS if policies is None else policies
+        self.batch_size = batch_size or Config.RETENTION_BATCH_SIZE
+        self.batch_pause = Config.RETENTION_BATCH_PAUSE if batch_pause is None else batch_pause
+        self.last_report: Optional[Dict] = None
+        self._run_lock = threading.Lock()
+
+    def run(self) -> Optional[Dict]:
+        """
+        执行一次清理
+
+        Returns:
+            Optional[Dict]: 清理报告；上一次清理尚未结束时返回None
+        """
+        if not self._run_lock.acquire(blocking=False):
+            logger.warning("上一次过期数据清理尚未完成，跳过本次清理")
+            return None
+        try:
+            started = time.monotonic()
+            now = get_current_local_time()
+            tables = {}
+            ordered = sorted(self.policies, key=lambda name: name in self.REFERENCED_TABLES)
+            for name in ordered:
+                days = self.policies[name]
+                table = Base.metadata.tables.get(name)
+                if table is None:
+                    logger.warning(f"数据保留策略中的表不存在: {name}")
+                    continue
+                if days <= 0:
+                    continue
+                tables[name] = self._prune_table(table, now - timedelta(days=days), days)
+
+            report = {
+                'started_at': now.isoformat(),
+                'duration_seconds': 0.0,
+                'deleted': sum(item['deleted'] for item in tables.values()),
+                'tables': tables,
+                'vacuum': self._incremental_vacuum()
+            }
+            report['duration_seconds'] = round(time.monotonic() - started, 3)
+            self.last_report = report
+            logger.info(f"过期数据清理完成，共删除 {report['deleted']} 行，耗时 {report['duration_seconds']} 秒")
+            return report
+        finally:
+            self._run_lock.release()
+
+    def _prune_table(self, table: Table, cutoff: datetime, days: float) -> Dict:
+        """分批删除一张表中早于cutoff的数据"""
+        started = time.monotonic()
+        if 'is_keyframe' in table.c:
+            cutoff = self._keyframe_cutoff(table, cutoff)
+        condition = table.c.timestamp < cutoff
+        if table.name in self.REFERENCED_TABLES:
+            for column in self._referencing_columns(table):
+                condition = condition & ~exists().where(column == table.c.id)
+
+        deleted = 0
+        batches = 0
+        while True:
+            with self.db_manager.engine.begin() as connection:
+                ids = connection.execute(
+                    select(table.c.id).where(condition).order_by(table.c.id).limit(self.batch_size)
+                ).scalars().all()
+                if ids:
+                    connection.execute(delete(table).where(table.c.id.in_(ids)))
+            if not ids:
+                break
+            deleted += len(ids)
+            batches += 1
+            if len(ids) < self.batch_size:
+                break
+            # 释放写锁后停顿，让采集任务写入
+            time.sleep(self.batch_pause)
+
+        return {
+            'days': days,
+            'cutoff': cutoff.isoformat(),
+            'deleted': deleted,
+            'batches': batches,
+            'duration_seconds': round(time.monotonic() - started, 3)
+        }
+
+    def _keyframe_cutoff(self, table: Table, cutoff: datetime) -> datetime:
+        """
+        截止时间对齐到不晚于它的最近一个关键帧
+
+        截止时间之前没有关键帧时，之前的记录都是没有关键帧的增量，无法用于重建，按原截止时间删除。
+        """
+        with self.db_manager.engine.connect() as connection:
+            keyframe = connection.execute(
+                select(func.max(table.c.timestamp)).where(table.c.is_keyframe, table.c.timestamp <= cutoff)
+            ).scalar()
+        return keyframe or cutoff
+
+    @staticmethod
+    def _referencing_columns(table: Table) -> List:
+        """通过外键引用该表的列"""
+        return [
+            column
+            for other in Base.metadata.tables.values()
+            for column in other.columns
+            if any(fk.column.table is table for fk in column.foreign_keys)
+        ]
+
+    def _incremental_vacuum(self) -> Dict:
+        """SQLite数据库启用了增量回收时，分批把空闲页归还给文件系统"""
+        if self.db_manager.engine.dialect.name != 'sqlite':
+            return {'mode': 'unsupported'}
+
+        freed = 0
+        connection = self.db_manager.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            mode = cursor.execute('PRAGMA auto_vacuum').fetchone()[0]
+            free_pages = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+            if mode != 2:
+                # 未启用增量回收（数据库创建于启用之前），空闲页会被后续写入复用
+                return {'mode': 'none', 'free_pages': free_pages}
+
+            while free_pages > 0:
+                # execute只执行一步（回收一页），executescript会把语句执行完
+                cursor.executescript(f'PRAGMA incremental_vacuum({Config.RETENTION_VACUUM_PAGES});')
+                remaining = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+                if remaining >= free_pages:
+                    break
+                freed += free_pages - remaining
+                free_pages = remaining
+                time.sleep(self.batch_pause)
+        finally:
+            connection.close()
+
+        return {'mode': 'incremental', 'freed_pages': freed, 'free_pages': free_pages}
+
+
+# 全局过期数据清理实例
+retention_manager = RetentionManager(DatabaseManager(Config.SQLALCHEMY_DATABASE_URI))
@@ -0,0 +1,281 @@
+# app/database/rollup.py
+"""多粒度汇总数据（1分钟、5分钟、1小时）的写入与查询"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, desc, func, literal, select, text
+
+from app.config.config import Config
+from app.database.models import (
+    SystemRollup1m, SystemRollup5m, SystemRollup1h,
+    DiskRollup1m, DiskRollup5m, DiskRollup1h
+)
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class RollupManager:
+    """汇总数据管理器
+
+    每次保存采集快照时，在同一个事务中把系统信息和磁盘使用率累加到各粒度的时间桶中
+    （样本数、最小值、最大值、合计）。缺失的值不参与汇总，各字段单独记录有值的样本数，
+    没有任何值的字段保持为空，不会被当作0。查询时按时间范围和需要的数据点数选择最粗的、
+    仍然能提供足够数据点的粒度；时间范围太短时由SQL存储引擎直接读取原始数据。
+    """
+
+    # 粒度（秒）到汇总表的映射
+    SYSTEM_ROLLUPS = {60: SystemRollup1m, 300: SystemRollup5m, 3600: SystemRollup1h}
+    DISK_ROLLUPS = {60: DiskRollup1m, 300: DiskRollup5m, 3600: DiskRollup1h}
+
+    SYSTEM_FIELDS = ('cpu_percent', 'memory_percent', 'load_avg_1', 'load_avg_5', 'load_avg_15')
+    DISK_FIELDS = ('percent',)
+
+    # 有汇总数据的序列 {序列名: (各粒度的汇总表, 汇总的字段)}
+    SERIES = {'system': (SYSTEM_ROLLUPS, SYSTEM_FIELDS), 'disk': (DISK_ROLLUPS, DISK_FIELDS)}
+
+    # 0表示原始数据
+    RAW = 0
+
+    def __init__(self, summary_min_buckets: Optional[int] = None):
+        """
+        初始化汇总数据管理器
+
+        Args:
+            summary_min_buckets: 统计整个时间范围时至少使用的时间桶数，
+                时间范围边缘不完整的时间桶带来的误差不超过 1/summary_min_buckets
+        """
+        self.summary_min_buckets = summary_min_buckets or Config.ROLLUP_SUMMARY_MIN_BUCKETS
+        # (数据库方言, 表名) 到插入或累加语句的缓存
+        self._upsert_statements: Dict[Tuple[str, str], object] = {}
+
+    @staticmethod
+    def bucket_start(timestamp: datetime, resolution: int) -> datetime:
+        """时间所在时间桶的起点"""
+        seconds = int((timestamp - EPOCH).total_seconds())
+        return EPOCH + timedelta(seconds=seconds - seconds % resolution)
+
+    def choose_resolution(self, start: datetime, end: datetime, points: int) -> int:
+        """
+        选择查询使用的粒度
+
+        Args:
+            start: 时间范围起点
+            end: 时间范围终点
+            points: 需要的数据点数
+
+        Returns:
+            int: 能提供至少points个时间桶的最粗粒度（秒），都不满足时返回RAW
+        """
+        span = (end - start).total_seconds()
+        for resolution in sorted(self.SYSTEM_ROLLUPS, reverse=True):
+            if span / resolution >= points:
+                return resolution
+        return self.RAW
+
+    def apply(self, connection, samples: Sequence[Tuple[datetime, Optional[Dict], Optional[List[Dict]]]]) -> None:
+        """
+        把一批采集的数据累加到各粒度的汇总表（在调用方的事务中执行）
+
+        同一时间桶的样本先在内存中合并，每张汇总表只执行一条批量的插入或累加语句。
+
+        Args:
+            connection: 数据库连接（处于事务中）
+            samples: (采集时间, 系统信息记录, 磁盘信息) 列表，缺失的阶段为None
+        """
+        for resolution in self.SYSTEM_ROLLUPS:
+            system_rows: Dict = {}
+            disk_rows: Dict = {}
+            for timestamp, system_info, disk_info in samples:
+                bucket = self.bucket_start(timestamp, resolution)
+                if system_info is not None:
+                    self._merge_sample(system_rows, (bucket,), system_info, self.SYSTEM_FIELDS, timestamp=bucket)
+                for disk in disk_info or ():
+                    device = disk.get('device')
+                    self._merge_sample(disk_rows, (device, bucket), disk, self.DISK_FIELDS, timestamp=bucket, device=device)
+            if system_rows:
+                self._upsert(connection, self.SYSTEM_ROLLUPS[resolution].__table__, list(system_rows.values()),
+                             ['timestamp'], self.SYSTEM_FIELDS)
+            if disk_rows:
+                self._upsert(connection, self.DISK_ROLLUPS[resolution].__table__, list(disk_rows.values()),
+                             ['device', 'timestamp'], self.DISK_FIELDS)
+
+    @staticmethod
+    def _merge_sample(rows: Dict, key: Tuple, sample: Dict, fields: Sequence[str], **keys) -> None:
+        """把单个样本合并到对应时间桶的汇总记录，缺失的值跳过"""
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = dict(keys, count=0)
+            for field in fields:
+                row[f'{field}_min'] = row[f'{field}_max'] = row[f'{field}_sum'] = None
+                row[f'{field}_count'] = 0
+        row['count'] += 1
+        for field in fields:
+            value = sample.get(field)
+            if value is None:
+                continue
+            if row[f'{field}_count'] == 0:
+                row[f'{field}_min'] = row[f'{field}_max'] = row[f'{field}_sum'] = value
+            else:
+                row[f'{field}_min'] = min(row[f'{field}_min'], value)
+                row[f'{field}_max'] = max(row[f'{field}_max'], value)
+                row[f'{field}_sum'] += value
+            row[f'{field}_count'] += 1
+
+    def _upsert(self, connection, table, rows: List[Dict], key_columns: List[str], fields: Sequence[str]) -> None:
+        """插入汇总记录，时间桶已存在时累加"""
+        cache_key = (connection.dialect.name, table.name)
+        statement = self._upsert_statements.get(cache_key)
+        if statement is None:
+            # ON CONFLICT / ON DUPLICATE KEY 语句没有SQLAlchemy的缓存键，每次执行都会重新编译；
+            # 这里只编译一次，保存为带类型的文本语句（参数仍经过各列类型的转换）
+            upsert = self._build_upsert(connection.dialect.name, table, key_columns, fields)
+            columns = list(rows[0])
+            named_dialect = type(connection.dialect)(paramstyle='named')
+            statement = text(str(upsert.compile(dialect=named_dialect, column_keys=columns))).bindparams(
+                *[bindparam(column, type_=table.c[column].type) for column in columns]
+            )
+            self._upsert_statements[cache_key] = statement
+        connection.execute(statement, rows)
+
+    @staticmethod
+    def _build_upsert(dialect: str, table, key_columns: List[str], fields: Sequence[str]):
+        """构造插入或累加的语句"""
+        if dialect == 'mysql':
+            from sqlalchemy.dialects.mysql import insert
+            statement = insert(table)
+            incoming = statement.inserted
+            least, greatest = func.least, func.greatest
+        else:
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert
+                least, greatest = func.least, func.greatest
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+                # SQLite的多参数min/max是标量函数
+                least, greatest = func.min, func.max
+            statement = insert(table)
+            incoming = statement.excluded
+
+        updates = {'count': table.c.count + incoming.count}
+        for field in fields:
+            # 任一方为空时取另一方，两方都为空时保持为空
+            current_min, new_min = table.c[f'{field}_min'], incoming[f'{field}_min']
+            current_max, new_max = table.c[f'{field}_max'], incoming[f'{field}_max']
+            current_sum, new_sum = table.c[f'{field}_sum'], incoming[f'{field}_sum']
+            updates[f'{field}_min'] = least(func.coalesce(current_min, new_min), func.coalesce(new_min, current_min))
+            updates[f'{field}_max'] = greatest(func.coalesce(current_max, new_max), func.coalesce(new_max, current_max))
+            updates[f'{field}_sum'] = func.coalesce(current_sum + new_sum, current_sum, new_sum)
+            updates[f'{field}_count'] = table.c[f'{field}_count'] + incoming[f'{field}_count']
+
+        if dialect == 'mysql':
+            return statement.on_duplicate_key_update(updates)
+        return statement.on_conflict_do_update(index_elements=key_columns, set_=updates)
+
+    def supports(self, series: str, fields: Sequence[str]) -> bool:
+        """序列的这些字段是否有汇总数据"""
+        return series in self.SERIES and set(fields) <= set(self.SERIES[series][1])
+
+    def series_rows(
+        self,
+        connection,
+        series: str,
+        fields: Sequence[str],
+        start: datetime,
+        end: datetime,
+        resolution: int,
+        key: Optional[str] = None
+    ) -> List:
+        """
+        汇总表中时间范围 [start, end] 内各时间桶的平均值
+
+        Args:
+            connection: 数据库连接
+            series: 序列名（system、disk）
+            fields: 需要的字段
+            start: 时间范围起点
+            end: 时间范围终点
+            resolution: 汇总粒度（秒）
+            key: 只查询该设备（仅disk）
+
+        Returns:
+            List: 按时间升序的记录（timestamp、device（仅disk）和各字段的平均值）
+        """
+        model = self.SERIES[series][0][resolution]
+        key_columns = [model.device] if series == 'disk' else []
+        query = select(model.timestamp, *key_columns, *self._average_columns(model, fields))\
+            .where(model.timestamp >= self.bucket_start(start, resolution), model.timestamp <= end)
+        if key is not None and key_columns:
+            query = query.where(model.device == key)
+        return connection.execute(query.order_by(model.timestamp)).all()
+
+    def summary(
+        self,
+        connection,
+        series: str,
+        fields: Sequence[str],
+        start: datetime,
+        end: datetime,
+        resolution: int
+    ) -> Dict[str, Optional[float]]:
+        """
+        汇总表中时间范围 [start, end) 内各字段的平均值和最大值
+
+        Returns:
+            Dict[str, Optional[float]]: 各字段的平均值（{field}_avg）和最大值（{field}_max），没有数据时为None
+        """
+        model = self.SERIES[series][0][resolution]
+        columns = []
+        for field in fields:
+            # 只统计有该字段数据的样本数（缺失的值和迁移前没有平均负载的时间桶不计入）
+            columns += [
+                func.sum(getattr(model, f'{field}_sum')) / func.nullif(func.sum(getattr(model, f'{field}_count')), 0),
+                func.max(getattr(model, f'{field}_max'))
+            ]
+        row = connection.execute(
+            select(*columns).where(model.timestamp >= self.bucket_start(start, resolution), model.timestamp < end)
+        ).one()
+        summary = {}
+        for index, field in enumerate(fields):
+            summary[f'{field}_avg'] = row[index * 2]
+            summary[f'{field}_max'] = row[index * 2 + 1]
+        return summary
+
+    def peak(
+        self,
+        connection,
+        series: str,
+        field: str,
+        start: datetime,
+        end: datetime,
+        resolution: int
+    ) -> Optional[Dict]:
+        """
+        汇总表中时间范围 [start, end) 内字段的最高值
+
+        Returns:
+            Optional[Dict]: key（设备名，system为None）、value和timestamp（所在时间桶的起点），没有数据时返回None
+        """
+        model = self.SERIES[series][0][resolution]
+        column = getattr(model, f'{field}_max')
+        key_column = model.device if series == 'disk' else literal(None)
+        record = connection.execute(
+            select(key_column.label('key'), column.label('value'), model.timestamp)
+            .where(model.timestamp >= self.bucket_start(start, resolution), model.timestamp < end, column.isnot(None))
+            .order_by(desc(column)).limit(1)
+        ).first()
+        if record is None:
+            return None
+        return {'key': record.key, 'value': record.value, 'timestamp': record.timestamp}
+
+    @staticmethod
+    def _average_columns(model, fields: Sequence[str]) -> List:
+        """各字段的平均值列（合计 / 该字段的样本数，没有数据时为空），列名与原始数据的字段名一致"""
+        return [
+            (getattr(model, f'{field}_sum') / func.nullif(getattr(model, f'{field}_count'), 0)).label(field)
+            for field in fields
+        ]
+
+
+# 全局汇总数据管理器实例
+rollup_manager = RollupManager()
@@ -0,0 +1,461 @@
+# app/database/segment_store.py
+"""追加写入的分段文件存储引擎（按天分段的定长二进制记录）"""
+
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.config.config import Config
+from app.database.storage import SQLStorageEngine, StorageEngine
+from app.monitoring.snapshot import CollectionSnapshot
+from app.utils.helpers import downsample_arrays, get_current_local_time
+
+# 小时分段中时间桶的长度（微秒）和组合键中键ID的位数
+HOUR_US = 3600 * 10 ** 6
+KEY_BITS = 16
+
+
+class SegmentStorageEngine(StorageEngine):
+    """分段文件存储引擎
+
+    为按时间顺序写入的数值序列设计：每个序列每天一个分段文件 ``{目录}/{序列}/{YYYYMMDD}.seg``，
+    每条记录是定长的二进制结构（时间戳datetime64[us]、键ID uint16、各数值字段float64，空值为NaN），
+    设备名、网卡名和挂载点保存在 ``keys.json`` 中。一批快照的记录在每个文件末尾只追加一次，
+    不更新已写入的数据、不维护索引，也没有数据库的日志和页面重写。读取时按文件长度内存映射，
+    在有序的时间戳上二分查找；重放的旧快照使文件无序时，读取时排序一次。
+    写入失败时各文件截回写入前的长度，进程退出时写到一半的尾部记录在下次追加前截掉。
+
+    开始写入新的一天时，之前的日期汇总为小时分段 ``{序列}/hourly/{YYYYMMDD}.seg``（样本数、平均值、最大值），
+    能提供足够数据点的长时间范围读取小时分段；原始分段和小时分段按各自的保留天数整个文件删除。
+
+    进程排行不是数值序列，仍由SQL存储引擎保存在数据库中。
+    """
+
+    name = 'segment'
+
+    HOURLY = 3600
+    HOURLY_DIR = 'hourly'
+    KEYS_FILE = 'keys.json'
+    SUFFIX = '.seg'
+
+    def __init__(
+        self,
+        db_manager,
+        directory: Optional[str] = None,
+        raw_days: Optional[int] = None,
+        hourly_days: Optional[int] = None
+    ):
+        """
+        初始化分段文件存储引擎
+
+        Args:
+            db_manager: 数据库管理器（只用于进程排行）
+            directory: 分段目录
+            raw_days: 原始分段的保留天数，0表示永久保留
+            hourly_days: 小时分段的保留天数，0表示永久保留
+        """
+        self.db_manager = db_manager
+        self.directory = directory or Config.STORAGE_SEGMENT_DIR
+        self.raw_days = Config.STORAGE_SEGMENT_RAW_DAYS if raw_days is None else raw_days
+        self.hourly_days = Config.STORAGE_SEGMENT_HOURLY_DAYS if hourly_days is None else hourly_days
+        self._processes = SQLStorageEngine(db_manager)
+        self._lock = threading.RLock()
+        self._dtypes = {}
+        self._hourly_dtypes = {}
+        for series, (_, fields) in self.SERIES.items():
+            base = [('timestamp', 'M8[us]'), ('key', '<u2')]
+            self._dtypes[series] = np.dtype(base + [(field, '<f8') for field in fields])
+            self._hourly_dtypes[series] = np.dtype(
+                base + [('count', '<u4')] + [(field, '<f8') for field in fields]
+                + [(f'{field}_max', '<f8') for field in fields]
+            )
+            os.makedirs(os.path.join(self.directory, series, self.HOURLY_DIR), exist_ok=True)
+        # 键的编码 {序列: {名称: {'id': 键ID, 'labels': {列名: 值}}}} 和反查表 {序列: {键ID: 名称}}
+        self._keys: Dict[str, Dict[str, Dict]] = self._load_keys()
+        self._names: Dict[str, Dict[int, str]] = {
+            series: {entry['id']: name for name, entry in keys.items()} for series, keys in self._keys.items()
+        }
+        # 已映射的分段 {路径: (文件长度, 按时间排序的记录)}
+        self._segments: Dict[str, Tuple[int, np.ndarray]] = {}
+        # 本进程中已检查过尾部的分段文件
+        self._checked = set()
+        # 最近写入的日期，写入更晚的日期时汇总之前的日期
+        self._last_day: Optional[date] = None
+        self.compact()
+
+    # ---------- 写入 ----------
+
+    def write_snapshots(self, snapshots: List[CollectionSnapshot]) -> int:
+        """
+        把一批快照的数值序列追加到各分段文件，进程排行写入数据库
+
+        所有分段文件追加成功后才在数据库事务中写入进程排行；追加或写入进程排行出错时
+        各文件截回写入前的长度并抛出异常，整批快照由写入缓冲重放时数值序列和进程排行都不会重复。
+
+        Returns:
+            int: 写入的记录数
+        """
+        process_snapshots = []
+        for snapshot in snapshots:
+            if snapshot.process_info:
+                process_snapshot = CollectionSnapshot(snapshot.timestamp)
+                process_snapshot.process_info = snapshot.process_info
+                process_snapshots.append(process_snapshot)
+
+        with self._lock:
+            batches: Dict[Tuple[str, date], List[Tuple]] = {}
+            keys_changed = False
+            for snapshot in snapshots:
+                for series, rows in snapshot.series_rows().items():
+                    key_column = self.key_column(series)
+                    fields = self.SERIES[series][1]
+                    for row in rows:
+                        key_id, changed = self._key_id(series, row.get(key_column) if key_column else None, row)
+                        keys_changed = keys_changed or changed
+                        values = tuple(np.nan if row.get(field) is None else row.get(field) for field in fields)
+                        batches.setdefault((series, row['timestamp'].date()), []).append(
+                            (np.datetime64(row['timestamp'], 'us'), key_id) + values
+                        )
+            if keys_changed:
+                self._save_keys()
+
+            sizes: Dict[str, int] = {}
+            try:
+                for (series, day), records in batches.items():
+                    self._append(self._path(series, day), np.array(records, dtype=self._dtypes[series]), sizes)
+                written = self._processes.write_snapshots(process_snapshots) if process_snapshots else 0
+            except Exception:
+                # 截回写入前的长度，整批重放时不会重复
+                for path, size in sizes.items():
+                    with open(path, 'r+b') as f:
+                        f.truncate(size)
+                raise
+
+            stale = False
+            for series, day in batches:
+                hourly_path = self._path(series, day, hourly=True)
+                if os.path.exists(hourly_path):
+                    # 重放的旧快照写入了已汇总的日期，重新汇总
+                    os.remove(hourly_path)
+                    stale = True
+            if batches:
+                newest = max(day for _, day in batches)
+                if self._last_day is None or newest > self._last_day or stale:
+                    self._last_day = max(newest, self._last_day or newest)
+                    self.compact()
+        return written + sum(len(records) for records in batches.values())
+
+    def _append(self, path: str, records: np.ndarray, sizes: Dict[str, int]) -> None:
+        """在分段文件末尾追加记录并同步到磁盘，记录追加前的文件长度"""
+        with open(path, 'ab') as f:
+            size = f.tell()
+            if path not in self._checked:
+                # 进程退出时写到一半的尾部记录
+                remainder = size % records.dtype.itemsize
+                if remainder:
+                    logger.warning(f"分段文件尾部有不完整的记录，截掉 {remainder} 字节: {path}")
+                    size -= remainder
+                    f.truncate(size)
+                self._checked.add(path)
+            sizes.setdefault(path, size)
+            f.write(records.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _key_id(self, series: str, name: Optional[str], row: Dict) -> Tuple[int, bool]:
+        """键的ID（没有键的序列为0），新的键或标签变化时返回True"""
+        if name is None:
+            return 0, False
+        keys = self._keys.setdefault(series, {})
+        labels = {column: row.get(column) for column in self.LABELS.get(series, ())}
+        entry = keys.get(name)
+        if entry is None:
+            if len(keys) >= 1 << KEY_BITS:
+                raise ValueError(f"{series} 序列的键超过 {1 << KEY_BITS} 个")
+            entry = keys[name] = {'id': len(keys), 'labels': labels}
+            self._names.setdefault(series, {})[entry['id']] = name
+            return entry['id'], True
+        if entry['labels'] != labels:
+            entry['labels'] = labels
+            return entry['id'], True
+        return entry['id'], False
+
+    def _load_keys(self) -> Dict[str, Dict[str, Dict]]:
+        """读取键的编码"""
+        path = os.path.join(self.directory, self.KEYS_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_keys(self) -> None:
+        """先写临时文件再改名，保存键的编码（在追加引用新键的记录之前）"""
+        path = os.path.join(self.directory, self.KEYS_FILE)
+        temp_path = f'{path}.tmp-{os.getpid()}'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._keys, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    # ---------- 汇总和清理 ----------
+
+    def compact(self, today: Optional[date] = None) -> None:
+        """把今天之前尚未汇总的日期写成小时分段，并删除超过保留期限的分段"""
+        today = today or get_current_local_time().date()
+        with self._lock:
+            for series in self.SERIES:
+                for day in self._days(series):
+                    if day < today and not os.path.exists(self._path(series, day, hourly=True)):
+                        self._write_hourly(series, day)
+                self._prune(series, today)
+
+    def _write_hourly(self, series: str, day: date) -> None:
+        """把一天的原始记录按 (小时, 键) 汇总为小时分段"""
+        records = self._records(series, day)
+        if records is None:
+            return
+        fields = self.SERIES[series][1]
+        groups = (records['timestamp'].astype(np.int64) // HOUR_US << KEY_BITS) + records['key']
+        order = np.argsort(groups, kind='stable')
+        groups = groups[order]
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+
+        hourly = np.zeros(len(starts), dtype=self._hourly_dtypes[series])
+        hourly['timestamp'] = ((groups[starts] >> KEY_BITS) * HOUR_US).astype('M8[us]')
+        hourly['key'] = groups[starts] & ((1 << KEY_BITS) - 1)
+        hourly['count'] = np.diff(np.r_[starts, len(groups)])
+        for field in fields:
+            values = records[field][order]
+            valid = ~np.isnan(values)
+            sums = np.add.reduceat(np.where(valid, values, 0.0), starts)
+            counts = np.add.reduceat(valid.astype(np.int64), starts)
+            hourly[field] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+            # fmax忽略NaN，全部为空的时间桶仍为NaN
+            hourly[f'{field}_max'] = np.fmax.reduceat(values, starts)
+
+        path = self._path(series, day, hourly=True)
+        temp_path = f'{path}.tmp-{os.getpid()}'
+        hourly.tofile(temp_path)
+        os.replace(temp_path, path)
+
+    def _prune(self, series: str, today: date) -> None:
+        """删除超过保留期限的原始分段和小时分段"""
+        for hourly, keep_days in ((False, self.raw_days), (True, self.hourly_days)):
+            if keep_days <= 0:
+                continue
+            cutoff = today - timedelta(days=keep_days)
+            for day in self._days(series, hourly):
+                if day >= cutoff:
+                    break
+                path = self._path(series, day, hourly)
+                self._segments.pop(path, None)
+                self._checked.discard(path)
+                os.remove(path)
+                logger.info(f"删除过期的分段文件: {path}")
+
+    # ---------- 读取 ----------
+
+    def latest(self, series: str, at: Optional[datetime] = None) -> Tuple[Optional[datetime], List[Dict]]:
+        """不晚于某一时刻的最近一次采集的记录（见StorageEngine.latest）"""
+        if series == self.PROCESS:
+            return self._processes.latest(series, at)
+
+        self.key_column(series)
+        for day in reversed(self._days(series)):
+            if at is not None and day > at.date():
+                continue
+            records = self._records(series, day)
+            if records is None:
+                continue
+            timestamps = records['timestamp']
+            hi = len(records) if at is None else int(np.searchsorted(timestamps, np.datetime64(at, 'us'), side='right'))
+            if hi == 0:
+                continue
+            lo = int(np.searchsorted(timestamps, timestamps[hi - 1], side='left'))
+            rows = [self._row(series, record) for record in records[lo:hi]]
+            return rows[0]['timestamp'], rows
+        return None, []
+
+    def range(
+        self,
+        series: str,
+        fields: Sequence[str],
+        start: datetime,
+        end: datetime,
+        points: int,
+        key: Optional[str] = None
+    ):
+        """时间范围内的序列（见StorageEngine.range）：能提供足够数据点时读取小时分段"""
+        key_column = self.key_column(series)
+        hourly = points > 0 and (end - start).total_seconds() / self.HOURLY >= points
+        columns = self._window(series, tuple(fields), start, end, hourly, include_end=True, key=key)
+
+        series_by_key = {}
+        for key_id in np.unique(columns['key']):
+            mask = columns['key'] == key_id
+            arrays = {name: columns[name][mask] for name in ('timestamp',) + tuple(fields)}
+            name = self._names.get(series, {}).get(int(key_id)) if key_column else None
+            series_by_key[name] = downsample_arrays(arrays, fields, start, end, points)
+        if key_column is None:
+            return series_by_key.get(None) or self.empty_arrays(fields)
+        return series_by_key
+
+    def aggregate(self, series: str, fields: Sequence[str], start: datetime, end: datetime) -> Dict[str, Optional[float]]:
+        """时间范围内的平均值和最大值（见StorageEngine.aggregate）：长时间范围读取小时分段"""
+        self.key_column(series)
+        hourly = (end - start).total_seconds() / self.HOURLY >= Config.ROLLUP_SUMMARY_MIN_BUCKETS
+        names = ('count',) + tuple(fields) + tuple(f'{field}_max' for field in fields)
+        columns = self._window(series, names, start, end, hourly, include_end=False)
+        summary = {}
+        for field in fields:
+            values = columns[field]
+            valid = ~np.isnan(values)
+            weights = columns['count'][valid]
+            summary[f'{field}_avg'] = float(np.dot(values[valid], weights) / weights.sum()) if valid.any() else None
+            maximums = columns[f'{field}_max']
+            summary[f'{field}_max'] = float(np.nanmax(maximums)) if (~np.isnan(maximums)).any() else None
+        return summary
+
+    def peak(self, series: str, field: str, start: datetime, end: datetime) -> Optional[Dict]:
+        """时间范围内的最高值（见StorageEngine.peak）：长时间范围读取小时分段，时间为所在小时的起点"""
+        key_column = self.key_column(series)
+        hourly = (end - start).total_seconds() / self.HOURLY >= Config.ROLLUP_SUMMARY_MIN_BUCKETS
+        columns = self._window(series, (f'{field}_max',), start, end, hourly, include_end=False)
+        maximums = columns[f'{field}_max']
+        if not (~np.isnan(maximums)).any():
+            return None
+        index = int(np.nanargmax(maximums))
+        return {
+            'key': self._names.get(series, {}).get(int(columns['key'][index])) if key_column else None,
+            'value': float(maximums[index]),
+            'timestamp': columns['timestamp'][index].astype(datetime)
+        }
+
+    def _window(
+        self,
+        series: str,
+        names: Sequence[str],
+        start: datetime,
+        end: datetime,
+        hourly: bool,
+        include_end: bool,
+        key: Optional[str] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        按天读取时间范围内的记录并拼接为列数组
+
+        hourly为True时已汇总的日期读取小时分段（从start所在小时的起点开始），其余日期读取原始分段；
+        原始记录的count为1，{field}_max等于字段值。
+
+        Returns:
+            Dict[str, np.ndarray]: timestamp、key和names中各列的数组，按时间升序
+        """
+        key_id = None
+        if key is not None:
+            entry = self._keys.get(series, {}).get(key)
+            if entry is None:
+                names = tuple(names)
+                return {
+                    'timestamp': np.array([], dtype='M8[us]'), 'key': np.array([], dtype='<u2'),
+                    **{name: np.array([], dtype=np.float64) for name in names}
+                }
+            key_id = entry['id']
+
+        upper = np.datetime64(end, 'us')
+        side = 'right' if include_end else 'left'
+        parts = []
+        day = start.date()
+        while day <= end.date():
+            records = self._records(series, day, hourly=True) if hourly else None
+            is_hourly = records is not None
+            if records is None:
+                records = self._records(series, day)
+            day += timedelta(days=1)
+            if records is None:
+                continue
+            lower = start.replace(minute=0, second=0, microsecond=0) if is_hourly else start
+            timestamps = records['timestamp']
+            lo = int(np.searchsorted(timestamps, np.datetime64(lower, 'us'), side='left'))
+            hi = int(np.searchsorted(timestamps, upper, side=side))
+            chunk = records[lo:hi]
+            if key_id is not None:
+                chunk = chunk[chunk['key'] == key_id]
+            if not len(chunk):
+                continue
+            part = {'timestamp': chunk['timestamp'], 'key': chunk['key']}
+            for name in names:
+                if name == 'count':
+                    part[name] = chunk['count'] if is_hourly else np.ones(len(chunk), dtype='<u4')
+                elif not is_hourly and name.endswith('_max') and name not in chunk.dtype.names:
+                    part[name] = chunk[name[:-len('_max')]]
+                else:
+                    part[name] = chunk[name]
+            parts.append(part)
+
+        if not parts:
+            return {
+                'timestamp': np.array([], dtype='M8[us]'), 'key': np.array([], dtype='<u2'),
+                **{name: np.array([], dtype=np.float64) for name in names}
+            }
+        return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+    def _records(self, series: str, day: date, hourly: bool = False) -> Optional[np.ndarray]:
+        """以内存映射方式打开分段（文件变长时重新映射），没有数据时返回None"""
+        path = self._path(series, day, hourly)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._segments.get(path)
+            if cached is not None and cached[0] == size:
+                return cached[1]
+            dtype = self._hourly_dtypes[series] if hourly else self._dtypes[series]
+            count = size // dtype.itemsize
+            if not count:
+                return None
+            records = np.memmap(path, dtype=dtype, mode='r', shape=(count,))
+            timestamps = records['timestamp']
+            if count > 1 and (timestamps[1:] < timestamps[:-1]).any():
+                records = records[np.argsort(timestamps, kind='stable')]
+            self._segments[path] = (size, records)
+            return records
+
+    def _row(self, series: str, record) -> Dict:
+        """把一条原始记录转换为与数据库记录相同形式的字典"""
+        row = {'timestamp': record['timestamp'].astype(datetime)}
+        key_column = self.key_column(series)
+        if key_column:
+            name = self._names.get(series, {}).get(int(record['key']))
+            row[key_column] = name
+            row.update(self._keys[series][name]['labels'])
+        for field in self.SERIES[series][1]:
+            value = float(record[field])
+            row[field] = None if np.isnan(value) else value
+        return row
+
+    def _days(self, series: str, hourly: bool = False) -> List[date]:
+        """有分段文件的日期（升序）"""
+        directory = os.path.join(self.directory, series, self.HOURLY_DIR) if hourly else os.path.join(self.directory, series)
+        days = []
+        for name in os.listdir(directory):
+            if not name.endswith(self.SUFFIX):
+                continue
+            try:
+                days.append(datetime.strptime(name[:-len(self.SUFFIX)], '%Y%m%d').date())
+            except ValueError:
+                continue
+        return sorted(days)
+
+    def _path(self, series: str, day: date, hourly: bool = False) -> str:
+        """分段文件路径"""
+        name = day.strftime('%Y%m%d') + self.SUFFIX
+        if hourly:
+            return os.path.join(self.directory, series, self.HOURLY_DIR, name)
+        return os.path.join(self.directory, series, name)
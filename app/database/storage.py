@@ -0,0 +1,423 @@
+# app/database/storage.py
+"""采集数据的存储引擎接口和SQL实现"""
+
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+from sqlalchemy import desc, func, insert, select
+
+from app.config.config import Config
+from app.database.archive import ArchiveManager
+from app.database.models import Collection, SystemInfo, DiskInfo, DiskIOInfo, NetworkInfo, ProcessInfo
+from app.database.process_store import process_store
+from app.database.rollup import rollup_manager
+from app.monitoring.snapshot import CollectionSnapshot
+from app.utils.helpers import downsample_arrays
+
+# 按 (存储引擎, 数据库地址) 共享的存储引擎实例
+_engines: Dict[Tuple[str, str], 'StorageEngine'] = {}
+_engines_lock = threading.Lock()
+
+
+class StorageEngine(ABC):
+    """存储引擎接口
+
+    处理器和周报只通过这几个操作读写采集数据，不直接构造数据库查询：
+
+    - ``write_snapshots``: 保存一批采集快照
+    - ``latest``: 某一时刻（默认为最新）最近一次采集的记录
+    - ``range``: 时间范围内的序列，按需要的数据点数选择数据粒度并降采样
+    - ``aggregate`` / ``peak``: 时间范围内的平均值、最大值和最高值出现的位置
+    - ``compact``: 定时执行的整理（归档、汇总和清理过期数据）
+
+    数值序列为 system、disk（按device）、disk_io（按device）和 network（按interface）；
+    process 为进程排行，只支持 ``latest``。
+    """
+
+    # 数值序列 {序列名: (键列, 数值字段)}，键列为None的序列每次采集只有一条记录
+    SERIES = {
+        'system': (None, (
+            'cpu_percent', 'memory_percent', 'disk_percent', 'uptime', 'load_avg_1', 'load_avg_5', 'load_avg_15'
+        )),
+        'disk': ('device', ('total', 'used', 'free', 'percent')),
+        'disk_io': ('device', (
+            'read_bytes_per_sec', 'write_bytes_per_sec', 'read_iops', 'write_iops', 'await_ms', 'util_percent'
+        )),
+        'network': ('interface', (
+            'bytes_sent_per_sec', 'bytes_recv_per_sec', 'packets_sent_per_sec', 'packets_recv_per_sec',
+            'errin_per_sec', 'errout_per_sec', 'dropin_per_sec', 'dropout_per_sec'
+        )),
+    }
+    # 随记录保存的非数值列（最新记录中返回）
+    LABELS = {'disk': ('mountpoint',)}
+    PROCESS = 'process'
+    # 进程排行中保存的、可用于排序的字段
+    PROCESS_FIELDS = ('memory_percent', 'cpu_percent')
+
+    name = ''
+
+    @abstractmethod
+    def write_snapshots(self, snapshots: List[CollectionSnapshot]) -> int:
+        """
+        保存一批采集快照，出错时抛出异常（不部分写入）
+
+        Returns:
+            int: 写入的记录数
+        """
+
+    @abstractmethod
+    def latest(self, series: str, at: Optional[datetime] = None) -> Tuple[Optional[datetime], List[Dict]]:
+        """
+        不晚于某一时刻的最近一次采集的记录
+
+        Args:
+            series: 序列名（system、disk、disk_io、network、process）
+            at: 时刻，为空时为最新
+
+        Returns:
+            Tuple[Optional[datetime], List[Dict]]: 采集时间和该次采集的记录（timestamp、键列、数值字段和LABELS中的列；
+                process为按内存占用率降序的完整排行），没有数据时为 (None, [])
+        """
+
+    @abstractmethod
+    def range(
+        self,
+        series: str,
+        fields: Sequence[str],
+        start: datetime,
+        end: datetime,
+        points: int,
+        key: Optional[str] = None
+    ):
+        """
+        时间范围 [start, end] 内的序列，降采样为不超过points个点
+
+        按时间范围和points选择能提供足够数据点的最粗粒度；points为0时返回原始样本。
+
+        Args:
+            series: 序列名
+            fields: 需要的数值字段
+            start: 时间范围起点
+            end: 时间范围终点
+            points: 最大数据点数
+            key: 只返回该设备或网卡
+
+        Returns:
+            system为 Dict[str, np.ndarray]（timestamp为datetime64[us]，各字段为float），
+            其他序列为键到这种数组字典的映射
+        """
+
+    @abstractmethod
+    def aggregate(self, series: str, fields: Sequence[str], start: datetime, end: datetime) -> Dict[str, Optional[float]]:
+        """
+        时间范围 [start, end) 内各字段的平均值和最大值（所有键合并统计）
+
+        Returns:
+            Dict[str, Optional[float]]: {field}_avg 和 {field}_max，没有数据时为None
+        """
+
+    @abstractmethod
+    def peak(self, series: str, field: str, start: datetime, end: datetime) -> Optional[Dict]:
+        """
+        时间范围 [start, end) 内字段的最高值
+
+        Returns:
+            Optional[Dict]: key（设备名或网卡名，system为None）、value和timestamp，没有数据时返回None
+        """
+
+    @abstractmethod
+    def compact(self) -> None:
+        """整理已写入的数据（由调度器按 ``ARCHIVE_INTERVAL`` 定时调用）"""
+
+    @classmethod
+    def key_column(cls, series: str) -> Optional[str]:
+        """序列的键列"""
+        if series not in cls.SERIES:
+            raise ValueError(f"未知的序列: {series}")
+        return cls.SERIES[series][0]
+
+    @staticmethod
+    def empty_arrays(fields: Sequence[str]) -> Dict[str, np.ndarray]:
+        """没有数据时的数组字典"""
+        arrays = {'timestamp': np.array([], dtype='datetime64[us]')}
+        arrays.update({field: np.array([], dtype=np.float64) for field in fields})
+        return arrays
+
+    @staticmethod
+    def rows_to_arrays(rows: List, fields: Sequence[str]) -> Dict[str, np.ndarray]:
+        """把按时间排序的查询结果转换为列数组，空值记为NaN"""
+        arrays = {'timestamp': np.array([row.timestamp for row in rows], dtype='datetime64[us]')}
+        for field in fields:
+            arrays[field] = np.array([getattr(row, field) for row in rows], dtype=np.float64)
+        return arrays
+
+
+class SQLStorageEngine(StorageEngine):
+    """SQL存储引擎
+
+    使用SQLAlchemy把每次采集写入各原始数据表，并在同一个事务中累加汇总表（见RollupManager）、
+    写入进程排行的增量记录（见ProcessStore）。范围查询和统计按时间范围选择汇总表或原始数据；
+    原始数据从列式归档和数据库中读取（见ArchiveManager）。
+    """
+
+    name = 'sql'
+
+    MODELS = {'system': SystemInfo, 'disk': DiskInfo, 'disk_io': DiskIOInfo, 'network': NetworkInfo}
+
+    def __init__(self, db_manager, archive: Optional[ArchiveManager] = None):
+        """
+        初始化SQL存储引擎
+
+        Args:
+            db_manager: 数据库管理器
+            archive: 列式归档，为空时使用 ``ARCHIVE_DIR``
+        """
+        self.db_manager = db_manager
+        self.archive = archive or ArchiveManager(db_manager)
+        # 各表最近一次写入的采集批次 {表名: (采集批次ID, 采集时间)}
+        self._latest_collections: Dict[str, Tuple[int, datetime]] = {}
+
+    # ---------- 写入 ----------
+
+    def write_snapshots(self, snapshots: List[CollectionSnapshot]) -> int:
+        """
+        在一个事务中保存多次采集的快照，出错时回滚并抛出异常
+
+        系统、磁盘、进程、磁盘I/O和网络数据每张表使用一条批量INSERT语句（executemany），不创建ORM对象；
+        每个快照的记录使用该快照的采集时间作为时间戳，磁盘和进程记录关联到各自的采集批次，缺失的阶段跳过；
+        进程只写入相对上一次发生变化的记录（见ProcessStore）；系统和磁盘数据同时累加到各粒度的汇总表。
+        """
+        try:
+            latest, rows_by_model = self._write_snapshots(snapshots)
+        except Exception:
+            # 事务已回滚，进程的编码状态不再与数据库一致
+            process_store.reset()
+            raise
+        for tablename, collection in latest.items():
+            # 重放的旧快照不覆盖更新的采集批次
+            current = self._latest_collections.get(tablename)
+            if current is None or current[1] <= collection[1]:
+                self._latest_collections[tablename] = collection
+        return sum(len(rows) for rows in rows_by_model.values())
+
+    def _write_snapshots(self, snapshots: List[CollectionSnapshot]) -> Tuple[Dict, Dict]:
+        """在一个事务中写入快照，返回各表最新的采集批次和写入的记录"""
+        latest = {}
+        rows_by_model: Dict = {}
+        rollup_samples = []
+        with self.db_manager.engine.begin() as connection:
+            for snapshot in snapshots:
+                timestamp = snapshot.timestamp
+                collection_id = connection.execute(
+                    insert(Collection.__table__).values(timestamp=timestamp)
+                ).inserted_primary_key[0]
+                series_rows = snapshot.series_rows()
+                for series, rows in series_rows.items():
+                    model = self.MODELS[series]
+                    if 'collection_id' in model.__table__.c:
+                        for row in rows:
+                            row['collection_id'] = collection_id
+                        if model.__tablename__ not in latest or latest[model.__tablename__][1] <= timestamp:
+                            latest[model.__tablename__] = (collection_id, timestamp)
+                    rows_by_model.setdefault(model, []).extend(rows)
+                if snapshot.process_info:
+                    rows_by_model.setdefault(ProcessInfo, []).extend(
+                        process_store.encode(connection, collection_id, timestamp, snapshot.process_info)
+                    )
+                rollup_samples.append((timestamp, series_rows.get('system', [None])[0], snapshot.disk_info))
+            for model, rows in rows_by_model.items():
+                if not rows:
+                    continue
+                connection.execute(insert(model.__table__), rows)
+            # 累加到各粒度的汇总数据
+            rollup_manager.apply(connection, rollup_samples)
+        return latest, rows_by_model
+
+    # ---------- 读取 ----------
+
+    def latest(self, series: str, at: Optional[datetime] = None) -> Tuple[Optional[datetime], List[Dict]]:
+        """不晚于某一时刻的最近一次采集的记录（见StorageEngine.latest）"""
+        if series == self.PROCESS:
+            with self.db_manager.get_session() as session:
+                return process_store.snapshot_at(session, at)
+
+        model = self.MODELS[series]
+        key_column = self.key_column(series)
+        columns = [model.timestamp] + [
+            getattr(model, column) for column in (key_column,) + self.LABELS.get(series, ()) if column
+        ] + [getattr(model, field) for field in self.SERIES[series][1]]
+        with self.db_manager.engine.connect() as connection:
+            if key_column is None:
+                query = select(*columns)
+                if at is not None:
+                    query = query.where(model.timestamp <= at)
+                rows = connection.execute(query.order_by(desc(model.timestamp)).limit(1)).all()
+            else:
+                collection = self._latest_collection(connection, model) if at is None else None
+                if collection is not None:
+                    # 最近一次采集批次的记录（内存中的指针，不扫描时间索引）
+                    condition = model.collection_id == collection[0]
+                else:
+                    newest = select(func.max(model.timestamp))
+                    if at is not None:
+                        newest = newest.where(model.timestamp <= at)
+                    condition = model.timestamp == newest.scalar_subquery()
+                rows = connection.execute(select(*columns).where(condition)).all()
+        if not rows:
+            return None, []
+        return rows[0].timestamp, [dict(row._mapping) for row in rows]
+
+    def _latest_collection(self, connection, model) -> Optional[Tuple[int, datetime]]:
+        """
+        某张表最近一次写入的采集批次
+
+        优先读取内存中的指针；进程重启后首次读取时通过collection_id索引查询一次。
+        没有collection_id列的表返回None。
+        """
+        if 'collection_id' not in model.__table__.c:
+            return None
+        latest = self._latest_collections.get(model.__tablename__)
+        if latest is not None:
+            return latest
+
+        row = connection.execute(
+            select(Collection.id, Collection.timestamp).where(
+                Collection.id == select(func.max(model.collection_id)).scalar_subquery()
+            )
+        ).first()
+        if row is None:
+            return None
+        latest = (row.id, row.timestamp)
+        self._latest_collections.setdefault(model.__tablename__, latest)
+        return latest
+
+    def range(
+        self,
+        series: str,
+        fields: Sequence[str],
+        start: datetime,
+        end: datetime,
+        points: int,
+        key: Optional[str] = None
+    ):
+        """时间范围内的序列（见StorageEngine.range）：优先使用汇总表，否则读取原始数据"""
+        key_column = self.key_column(series)
+        resolution = self._resolution(series, fields, start, end, points)
+        if resolution != rollup_manager.RAW:
+            with self.db_manager.engine.connect() as connection:
+                rows = rollup_manager.series_rows(connection, series, fields, start, end, resolution, key)
+            arrays_by_key = self._group(rows, key_column, fields)
+        elif series == 'system':
+            arrays_by_key = {None: self.archive.system_arrays(start, end, fields)}
+        elif series == 'disk':
+            arrays_by_key = self.archive.disk_arrays(start, end, key, fields)
+        else:
+            model = self.MODELS[series]
+            query = select(model.timestamp, getattr(model, key_column), *[getattr(model, field) for field in fields])\
+                .where(model.timestamp >= start, model.timestamp <= end)
+            if key is not None:
+                query = query.where(getattr(model, key_column) == key)
+            with self.db_manager.engine.connect() as connection:
+                rows = connection.execute(query.order_by(model.timestamp)).all()
+            arrays_by_key = self._group(rows, key_column, fields)
+
+        series_by_key = {
+            name: downsample_arrays(arrays, fields, start, end, points)
+            for name, arrays in arrays_by_key.items()
+            if len(arrays['timestamp'])
+        }
+        if key_column is None:
+            return series_by_key.get(None) or self.empty_arrays(fields)
+        return series_by_key
+
+    def aggregate(self, series: str, fields: Sequence[str], start: datetime, end: datetime) -> Dict[str, Optional[float]]:
+        """时间范围内的平均值和最大值（见StorageEngine.aggregate）：优先使用汇总表"""
+        resolution = self._resolution(series, fields, start, end, rollup_manager.summary_min_buckets)
+        with self.db_manager.engine.connect() as connection:
+            if resolution != rollup_manager.RAW:
+                return rollup_manager.summary(connection, series, fields, start, end, resolution)
+            model = self.MODELS[series]
+            columns = []
+            for field in fields:
+                column = getattr(model, field)
+                columns += [func.avg(column), func.max(column)]
+            row = connection.execute(
+                select(*columns).where(model.timestamp >= start, model.timestamp < end)
+            ).one()
+        summary = {}
+        for index, field in enumerate(fields):
+            summary[f'{field}_avg'] = row[index * 2]
+            summary[f'{field}_max'] = row[index * 2 + 1]
+        return summary
+
+    def peak(self, series: str, field: str, start: datetime, end: datetime) -> Optional[Dict]:
+        """时间范围内的最高值（见StorageEngine.peak）：优先使用汇总表，时间为所在时间桶的起点"""
+        resolution = self._resolution(series, (field,), start, end, rollup_manager.summary_min_buckets)
+        with self.db_manager.engine.connect() as connection:
+            if resolution != rollup_manager.RAW:
+                return rollup_manager.peak(connection, series, field, start, end, resolution)
+            model = self.MODELS[series]
+            key_column = self.key_column(series)
+            column = getattr(model, field)
+            record = connection.execute(
+                select(model.timestamp, column.label('value'), *([getattr(model, key_column)] if key_column else []))
+                .where(model.timestamp >= start, model.timestamp < end, column.isnot(None))
+                .order_by(desc(column)).limit(1)
+            ).first()
+        if record is None:
+            return None
+        return {
+            'key': getattr(record, key_column) if key_column else None,
+            'value': record.value,
+            'timestamp': record.timestamp
+        }
+
+    def compact(self) -> None:
+        """把较早的系统和磁盘数据压缩为列式归档（见ArchiveManager.compact）"""
+        self.archive.compact()
+
+    @staticmethod
+    def _resolution(series: str, fields: Sequence[str], start: datetime, end: datetime, points: int) -> int:
+        """查询使用的汇总粒度，没有汇总数据或需要原始样本时返回RAW"""
+        if points <= 0 or not rollup_manager.supports(series, fields):
+            return rollup_manager.RAW
+        return rollup_manager.choose_resolution(start, end, points)
+
+    def _group(self, rows: List, key_column: Optional[str], fields: Sequence[str]) -> Dict[Optional[str], Dict[str, np.ndarray]]:
+        """把按时间排序的查询结果按键分组并转换为列数组"""
+        rows_by_key: Dict[Optional[str], List] = {}
+        for row in rows:
+            rows_by_key.setdefault(getattr(row, key_column) if key_column else None, []).append(row)
+        return {name: self.rows_to_arrays(key_rows, fields) for name, key_rows in rows_by_key.items()}
+
+
+def create_storage_engine(db_manager, backend: Optional[str] = None) -> StorageEngine:
+    """
+    按配置创建存储引擎，同一数据库的同一种存储引擎在进程内共享一个实例
+
+    Args:
+        db_manager: 数据库管理器
+        backend: sql 或 segment，为空时使用 ``STORAGE_BACKEND``
+
+    Returns:
+        StorageEngine: 存储引擎
+    """
+    backend = (backend or Config.STORAGE_BACKEND).lower()
+    cache_key = (backend, str(db_manager.engine.url))
+    with _engines_lock:
+        engine = _engines.get(cache_key)
+        if engine is None:
+            if backend == 'sql':
+                engine = SQLStorageEngine(db_manager)
+            elif backend == 'segment':
+                from app.database.segment_store import SegmentStorageEngine
+                engine = SegmentStorageEngine(db_manager)
+            else:
+                raise ValueError(f"不支持的存储引擎: {backend}（可选 sql、segment）")
+            logger.info(f"使用存储引擎: {backend}")
+            _engines[cache_key] = engine
+        return engine
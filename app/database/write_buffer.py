@@ -0,0 +1,409 @@
+# app/database/write_buffer.py
+"""采集快照的异步写入缓冲（数据库不可用时落盘，恢复后重放）"""
+
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy.exc import DisconnectionError, OperationalError, TimeoutError as PoolTimeoutError
+
+from app.config.config import Config
+from app.database.database_manager import DatabaseManager
+from app.monitoring.snapshot import CollectionSnapshot
+
+
+class WriteBuffer:
+    """快照写入缓冲
+
+    采集任务只把快照放入有界队列，由单独的写入线程按批次在一个事务中写入数据库，
+    采集耗时不受数据库锁或磁盘速度影响。写入失败或队列已满时，快照追加到本地的溢出文件（每行一个JSON），
+    之后每隔 ``WRITE_BUFFER_RETRY_INTERVAL`` 秒重试数据库，恢复后先重放溢出文件再继续写入新的快照。
+    重放在提交后才删除文件，进程在两者之间退出时可能重复写入少量快照，但不会丢失。
+
+    只有连接类错误（数据库不可用、被锁、连接池超时）才会暂停写入并等待重试。其他错误（约束冲突、数据类型错误等）
+    说明数据本身有问题，这时逐个写入该批快照，写入失败的快照记录失败次数后放回溢出文件，
+    失败 ``WRITE_BUFFER_MAX_ATTEMPTS`` 次后移入隔离文件，不会阻塞之后的快照。
+    """
+
+    # 数据库暂时不可用的错误，等待重试即可恢复
+    TRANSIENT_ERRORS = (OperationalError, DisconnectionError, PoolTimeoutError, OSError)
+
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        max_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        retry_interval: Optional[float] = None,
+        spill_path: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        quarantine_path: Optional[str] = None
+    ):
+        """
+        初始化写入缓冲
+
+        Args:
+            db_manager: 数据库管理器
+            max_size: 队列最多缓存的快照数
+            batch_size: 每个事务最多写入的快照数
+            flush_interval: 写入线程等待新快照的最长时间（秒）
+            retry_interval: 写入失败后重试数据库的间隔（秒）
+            spill_path: 溢出文件路径
+            max_attempts: 因数据问题写入失败的快照最多重试的次数
+            quarantine_path: 隔离文件路径
+        """
+        self.db_manager = db_manager
+        self.max_size = max_size or Config.WRITE_BUFFER_MAX_SIZE
+        self.batch_size = batch_size or Config.WRITE_BUFFER_BATCH_SIZE
+        self.flush_interval = flush_interval or Config.WRITE_BUFFER_FLUSH_INTERVAL
+        self.retry_interval = Config.WRITE_BUFFER_RETRY_INTERVAL if retry_interval is None else retry_interval
+        self.spill_path = spill_path or Config.WRITE_BUFFER_SPILL_PATH
+        self.max_attempts = max_attempts or Config.WRITE_BUFFER_MAX_ATTEMPTS
+        self.quarantine_path = quarantine_path or Config.WRITE_BUFFER_QUARANTINE_PATH
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_size)
+        self._spill_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._retry_at = 0.0
+        self.logger = logger
+
+        self.submitted = 0
+        self.written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.quarantined = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.total_flush_latency = 0.0
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        """启动写入线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='snapshot-writer', daemon=True)
+        self._thread.start()
+        self.logger.info("快照写入线程已启动")
+
+    def stop(self, timeout: float = 10) -> None:
+        """停止写入线程，写入队列中剩余的全部快照（数据库不可用时落盘）"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                break
+            self._flush(batch)
+        self.logger.info("快照写入线程已停止")
+
+    def submit(self, snapshot: CollectionSnapshot) -> bool:
+        """
+        提交一次采集的快照，不等待写入
+
+        Returns:
+            bool: 是否放入了队列；队列已满时直接写入溢出文件并返回False
+        """
+        with self._stats_lock:
+            self.submitted += 1
+        try:
+            self._queue.put_nowait(snapshot)
+            return True
+        except queue.Full:
+            self.logger.warning("快照写入队列已满，写入溢出文件")
+            self._spill([snapshot])
+            return False
+
+    def _run(self) -> None:
+        """写入线程：按批次取出快照并写入数据库"""
+        self._replay()
+        while not self._stop.is_set():
+            batch = self._drain(block=True)
+            if batch:
+                self._flush(batch)
+            elif self._spill_pending() and time.monotonic() >= self._retry_at:
+                self._replay()
+
+    def _drain(self, block: bool) -> List[CollectionSnapshot]:
+        """取出最多batch_size个快照；block为True时最多等待flush_interval秒"""
+        batch = []
+        try:
+            if block:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _flush(self, batch: List[CollectionSnapshot]) -> None:
+        """写入一批快照，数据库不可用时落盘，因数据问题写入失败时逐个写入并隔离无法写入的快照"""
+        if not batch:
+            return
+        if time.monotonic() < self._retry_at:
+            # 最近一次写入失败，重试之前直接落盘，不再等待数据库
+            self._spill(batch)
+            return
+        if self._spill_pending():
+            # 先重放溢出文件，保持写入顺序
+            self._replay()
+            if time.monotonic() < self._retry_at:
+                self._spill(batch)
+                return
+        error = self._write(batch)
+        if error is None:
+            with self._stats_lock:
+                self.written += len(batch)
+        elif self._is_transient(error):
+            self._spill(batch)
+        else:
+            written, pending = self._isolate([(snapshot, 0) for snapshot in batch])
+            with self._stats_lock:
+                self.written += written
+            self._spill_lines(pending)
+
+    def _is_transient(self, error: Exception) -> bool:
+        """是否是数据库暂时不可用的错误"""
+        return isinstance(error, self.TRANSIENT_ERRORS)
+
+    def _write(self, batch: List[CollectionSnapshot]) -> Optional[Exception]:
+        """
+        在一个事务中写入一批快照并记录耗时
+
+        Returns:
+            Optional[Exception]: 写入失败时的异常；数据库暂时不可用时同时设置重试时间
+        """
+        started = time.monotonic()
+        try:
+            self.db_manager.save_snapshots(batch)
+        except Exception as e:
+            with self._stats_lock:
+                self.failed_flushes += 1
+                self.last_error = str(e)
+            if self._is_transient(e):
+                self._retry_at = time.monotonic() + self.retry_interval
+                self.logger.error(f"写入采集快照失败，{self.retry_interval} 秒后重试: {e}")
+            else:
+                self.logger.error(f"写入采集快照失败（{type(e).__name__}）: {e}")
+            return e
+        latency = time.monotonic() - started
+        with self._stats_lock:
+            self.flushes += 1
+            self.last_flush_latency = latency
+            self.max_flush_latency = max(self.max_flush_latency, latency)
+            self.total_flush_latency += latency
+            self.last_error = None
+        return None
+
+    def _isolate(self, entries: List[Tuple[CollectionSnapshot, int]]) -> Tuple[int, List[str]]:
+        """
+        逐个写入一批快照，找出因数据问题无法写入的快照
+
+        Args:
+            entries: 快照和此前已失败的次数
+
+        Returns:
+            Tuple[int, List[str]]: 写入成功的快照数，以及需要放回溢出文件的记录
+            （失败次数未达到上限的快照和数据库不可用后尚未写入的快照）
+        """
+        written = 0
+        pending = []
+        for index, (snapshot, attempts) in enumerate(entries):
+            error = self._write([snapshot])
+            if error is None:
+                written += 1
+                continue
+            if self._is_transient(error):
+                pending.extend(self._encode(item, item_attempts) for item, item_attempts in entries[index:])
+                break
+            attempts += 1
+            if attempts >= self.max_attempts:
+                self._quarantine(snapshot, attempts, error)
+            else:
+                pending.append(self._encode(snapshot, attempts))
+        return written, pending
+
+    @staticmethod
+    def _encode(snapshot: CollectionSnapshot, attempts: int = 0) -> str:
+        """把快照编码为溢出文件中的一行，attempts为因数据问题写入失败的次数"""
+        data = snapshot.to_dict()
+        if attempts:
+            data['attempts'] = attempts
+        return json.dumps(data, ensure_ascii=False) + '\n'
+
+    def _spill(self, batch: List[CollectionSnapshot]) -> None:
+        """把快照追加到溢出文件"""
+        self._spill_lines([self._encode(snapshot) for snapshot in batch])
+
+    def _spill_lines(self, lines: List[str]) -> None:
+        """把已编码的快照追加到溢出文件"""
+        if not lines:
+            return
+        try:
+            with self._spill_lock:
+                self._append(self.spill_path, lines)
+            with self._stats_lock:
+                self.spilled += len(lines)
+        except OSError as e:
+            with self._stats_lock:
+                self.dropped += len(lines)
+            self.logger.error(f"写入溢出文件失败，丢弃 {len(lines)} 次采集的数据: {e}")
+
+    def _quarantine(self, snapshot: CollectionSnapshot, attempts: int, error: Exception) -> None:
+        """
+        把多次写入失败的快照移入隔离文件
+
+        隔离文件的每一行仍是一次采集的快照，附带失败次数和最后一次的错误信息，
+        排查并修复问题后可以把它追加到溢出文件中重新写入。
+        """
+        data = snapshot.to_dict()
+        data['attempts'] = attempts
+        data['error'] = f"{type(error).__name__}: {error}"
+        try:
+            with self._spill_lock:
+                self._append(self.quarantine_path, [json.dumps(data, ensure_ascii=False) + '\n'])
+            with self._stats_lock:
+                self.quarantined += 1
+            self.logger.error(
+                f"{snapshot.timestamp.isoformat()} 的采集快照已失败 {attempts} 次，移入隔离文件 "
+                f"{self.quarantine_path}: {data['error']}"
+            )
+        except OSError as e:
+            with self._stats_lock:
+                self.dropped += 1
+            self.logger.error(f"写入隔离文件失败，丢弃 {snapshot.timestamp.isoformat()} 的采集快照: {e}")
+
+    @staticmethod
+    def _append(path: str, lines: List[str]) -> None:
+        """把若干行追加到文件并落盘"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(''.join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _replaying_path(self) -> str:
+        """重放中的溢出文件路径"""
+        return self.spill_path + '.replaying'
+
+    def _spill_pending(self) -> bool:
+        """是否有尚未重放的溢出文件"""
+        return os.path.exists(self.spill_path) or os.path.exists(self._replaying_path())
+
+    def _replay(self) -> None:
+        """
+        把溢出文件中的快照按批次写回数据库
+
+        数据库不可用时把剩余部分放回溢出文件；某一批因数据问题写入失败时逐个写入，
+        失败次数未达到上限的快照在重放结束后放回溢出文件，下次重放时再试。
+        """
+        replaying = self._replaying_path()
+        with self._spill_lock:
+            # 上一次重放未完成（进程退出）时先处理遗留的文件，否则把溢出文件整体移走，新的溢出写入新文件
+            if not os.path.exists(replaying):
+                if not os.path.exists(self.spill_path):
+                    return
+                os.replace(self.spill_path, replaying)
+
+        with open(replaying, encoding='utf-8') as f:
+            lines = [line for line in f if line.strip()]
+        self.logger.info(f"开始重放溢出文件，共 {len(lines)} 次采集")
+
+        deferred: List[str] = []
+        for offset in range(0, len(lines), self.batch_size):
+            chunk = lines[offset:offset + self.batch_size]
+            entries = []
+            for line in chunk:
+                try:
+                    data = json.loads(line)
+                    entries.append((CollectionSnapshot.from_dict(data), int(data.get('attempts') or 0)))
+                except (ValueError, KeyError) as e:
+                    self.logger.warning(f"跳过溢出文件中无法解析的记录: {e}")
+            if not entries:
+                continue
+            error = self._write([snapshot for snapshot, _ in entries])
+            if error is None:
+                with self._stats_lock:
+                    self.written += len(entries)
+                    self.replayed += len(entries)
+                continue
+            if self._is_transient(error):
+                # 剩余部分放回溢出文件的开头，保持顺序
+                self._restore(replaying, deferred + lines[offset:])
+                return
+
+            written, pending = self._isolate(entries)
+            with self._stats_lock:
+                self.written += written
+                self.replayed += written
+            if time.monotonic() < self._retry_at:
+                # 逐个写入时数据库变得不可用
+                self._restore(replaying, deferred + pending + lines[offset + len(chunk):])
+                return
+            deferred.extend(pending)
+
+        if deferred:
+            self._restore(replaying, deferred)
+            self.logger.warning(f"溢出文件重放完成，{len(deferred)} 次采集写入失败，下次重放时重试")
+        else:
+            os.remove(replaying)
+            self.logger.info(f"溢出文件重放完成，共写入 {len(lines)} 次采集")
+
+    def _restore(self, replaying: str, lines: List[str]) -> None:
+        """把未写入的记录放回溢出文件的开头，之后溢出的快照排在其后"""
+        with self._spill_lock:
+            if os.path.exists(self.spill_path):
+                with open(self.spill_path, encoding='utf-8') as f:
+                    lines = lines + f.readlines()
+            with open(replaying, 'w', encoding='utf-8') as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(replaying, self.spill_path)
+
+    def _spill_size(self) -> int:
+        """溢出文件的总字节数"""
+        return sum(
+            os.path.getsize(path)
+            for path in (self.spill_path, self._replaying_path())
+            if os.path.exists(path)
+        )
+
+    def to_dict(self) -> Dict:
+        """转换为字典"""
+        with self._stats_lock:
+            return {
+                'running': self._thread is not None and self._thread.is_alive(),
+                'queue_depth': self._queue.qsize(),
+                'max_size': self.max_size,
+                'batch_size': self.batch_size,
+                'submitted': self.submitted,
+                'written': self.written,
+                'flushes': self.flushes,
+                'failed_flushes': self.failed_flushes,
+                'last_flush_latency': round(self.last_flush_latency, 4),
+                'max_flush_latency': round(self.max_flush_latency, 4),
+                'avg_flush_latency': round(self.total_flush_latency / self.flushes, 4) if self.flushes else 0.0,
+                'spilled': self.spilled,
+                'replayed': self.replayed,
+                'dropped': self.dropped,
+                'quarantined': self.quarantined,
+                'spill_pending': self._spill_pending(),
+                'spill_bytes': self._spill_size(),
+                'database_available': time.monotonic() >= self._retry_at,
+                'last_error': self.last_error
+            }
+
+
+# 全局快照写入缓冲实例
+write_buffer = WriteBuffer(DatabaseManager(Config.SQLALCHEMY_DATABASE_URI))
@@ -0,0 +1,121 @@
+# app/monitoring/collection_stats.py
+"""采集任务的调度延迟与耗时统计"""
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.config.config import Config
+
+
+class CollectionStats:
+    """采集任务统计
+
+    记录每次采集的计划开始时间、实际开始时间、耗时以及被跳过的次数。
+    计划开始时间来自调度器的任务提交事件；被跳过的次数根据相邻两次提交的计划时间推算，
+    因此同时覆盖了因上一次采集未结束而被丢弃、被合并（coalesce）以及错过执行时间的周期。
+    """
+
+    def __init__(self, interval: float):
+        """
+        初始化统计
+
+        Args:
+            interval: 采集间隔（秒）
+        """
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._scheduled_at: Optional[datetime] = None
+        self._last_submitted: Optional[datetime] = None
+        self._started_at: Optional[datetime] = None
+        self.in_flight = False
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.overruns = 0
+        self.last_scheduled_at: Optional[datetime] = None
+        self.last_started_at: Optional[datetime] = None
+        self.last_start_lag = 0.0
+        self.max_start_lag = 0.0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.last_gaps: List[str] = []
+
+    def on_submitted(self, scheduled_run_times: List[datetime]) -> None:
+        """调度器提交任务时调用，记录计划开始时间并推算被跳过的周期"""
+        if not scheduled_run_times:
+            return
+        scheduled_at = scheduled_run_times[-1]
+        with self._lock:
+            if self._last_submitted is not None and self.interval > 0:
+                periods = round((scheduled_at - self._last_submitted).total_seconds() / self.interval)
+                self.skipped += max(0, periods - 1)
+            self._last_submitted = scheduled_at
+            self._scheduled_at = scheduled_at
+
+    def start(self) -> bool:
+        """
+        采集开始时调用
+
+        Returns:
+            bool: 是否成功开始；上一次采集仍在进行时返回False并计为跳过
+        """
+        with self._lock:
+            if self.in_flight:
+                self.skipped += 1
+                return False
+            self.in_flight = True
+            scheduled_at = self._scheduled_at
+            self._scheduled_at = None
+            now = datetime.now(scheduled_at.tzinfo) if scheduled_at is not None else datetime.now()
+            self._started_at = now
+            self.last_started_at = now
+            self.last_scheduled_at = scheduled_at
+            if scheduled_at is not None:
+                self.last_start_lag = max(0.0, (now - scheduled_at).total_seconds())
+                self.max_start_lag = max(self.max_start_lag, self.last_start_lag)
+            return True
+
+    def finish(self, success: bool, gaps: Optional[List[str]] = None) -> None:
+        """采集结束时调用"""
+        with self._lock:
+            if not self.in_flight:
+                return
+            self.in_flight = False
+            duration = (datetime.now(self._started_at.tzinfo) - self._started_at).total_seconds()
+            self.last_duration = duration
+            self.max_duration = max(self.max_duration, duration)
+            self.total_duration += duration
+            if duration > self.interval:
+                self.overruns += 1
+            if success:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.last_gaps = list(gaps or [])
+
+    def to_dict(self) -> Dict:
+        """转换为字典"""
+        with self._lock:
+            runs = self.completed + self.failed
+            return {
+                'interval': self.interval,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'failed': self.failed,
+                'skipped': self.skipped,
+                'overruns': self.overruns,
+                'last_scheduled_at': self.last_scheduled_at.isoformat() if self.last_scheduled_at else None,
+                'last_started_at': self.last_started_at.isoformat() if self.last_started_at else None,
+                'last_start_lag_seconds': round(self.last_start_lag, 3),
+                'max_start_lag_seconds': round(self.max_start_lag, 3),
+                'last_duration_seconds': round(self.last_duration, 3),
+                'max_duration_seconds': round(self.max_duration, 3),
+                'avg_duration_seconds': round(self.total_duration / runs, 3) if runs else 0.0,
+                'last_gaps': self.last_gaps
+            }
+
+
+# 全局采集统计实例
+collection_stats = CollectionStats(Config.COLLECT_SYSTEM_DATA_INTERVAL)
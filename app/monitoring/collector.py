@@ -3,108 +3,249 @@ import psutil
 import platform
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
-import subprocess
 import os
+import fnmatch
+import time
 from loguru import logger
 
+from app.monitoring.cpu_sampler import cpu_sampler
+from app.monitoring.process_table import process_table
+from app.monitoring.proc_reader import ProcReader
+from app.monitoring.mount_table import MountTable
+from app.monitoring.counters import CounterRateTracker
+from app.monitoring.version_registry import version_registry
+from app.monitoring.host_facts import host_facts
+from app.config.config import Config
+
+# Linux下的/proc快速读取器，其他平台或关闭时为None
+proc_reader = ProcReader(Config.PROC_ROOT) if Config.USE_PROC_FAST_PATH and ProcReader.is_supported(Config.PROC_ROOT) else None
+
+# 过滤后的挂载表缓存，只在挂载表变化时重建
+mount_table = MountTable(proc_reader)
+
+# 磁盘I/O计数器的上一次读数
+disk_io_tracker = CounterRateTracker()
+
+# 网卡流量计数器的上一次读数
+network_tracker = CounterRateTracker()
+
 class SystemCollector:
     """系统信息采集器"""
     
     @staticmethod
     def get_system_info() -> Dict:
         """获取系统基本信息"""
-        info = {}
-        
         try:
-            # CPU信息
-            info['cpu_percent'] = psutil.cpu_percent(interval=1)
-            
-            # 内存信息
-            memory = psutil.virtual_memory()
-            info['memory_total'] = memory.total
-            info['memory_available'] = memory.available
-            info['memory_percent'] = memory.percent
-            
-            # 系统启动时间
-            info['boot_time'] = psutil.boot_time()
-            
-            # 系统负载（仅在Unix系统上可用）
-            try:
-                info['load_average'] = os.getloadavg()
-            except AttributeError:
-                # Windows系统不支持
-                info['load_average'] = (0, 0, 0)
+            info = None
+            if proc_reader is not None:
+                try:
+                    info = proc_reader.get_system_info()
+                except OSError as e:
+                    logger.warning(f"通过/proc读取系统信息失败，回退到psutil: {e}")
+            if info is None:
+                info = SystemCollector.read_system_info_psutil()
                 
             logger.info("系统基本信息采集成功")
         except Exception as e:
             logger.error(f"采集系统基本信息时出错: {e}")
             # 返回默认值
-            info.update({
+            info = {
                 'cpu_percent': 0,
+                'cpu_per_core': [],
+                'cpu_modes': {},
                 'memory_total': 0,
                 'memory_available': 0,
                 'memory_percent': 0,
                 'boot_time': 0,
                 'load_average': (0, 0, 0)
-            })
+            }
+        
+        return info
+    
+    @staticmethod
+    def read_system_info_psutil() -> Dict:
+        """通过psutil读取系统基本信息"""
+        info = {}
+        
+        # CPU信息（基于计数器差值计算，不阻塞）
+        cpu_info = cpu_sampler.sample()
+        info['cpu_percent'] = cpu_info['cpu_percent']
+        info['cpu_per_core'] = cpu_info['cpu_per_core']
+        info['cpu_modes'] = cpu_info['cpu_modes']
+        
+        # 内存信息
+        memory = psutil.virtual_memory()
+        info['memory_total'] = memory.total
+        info['memory_available'] = memory.available
+        info['memory_percent'] = memory.percent
+        
+        # 系统启动时间
+        info['boot_time'] = psutil.boot_time()
+        
+        # 系统负载（仅在Unix系统上可用）
+        try:
+            info['load_average'] = os.getloadavg()
+        except AttributeError:
+            # Windows系统不支持
+            info['load_average'] = (0, 0, 0)
         
         return info
     
     @staticmethod
     def get_disk_info() -> List[Dict]:
         """获取磁盘信息"""
-        disks = []
-        
         try:
-            partitions = psutil.disk_partitions()
-            
-            for partition in partitions:
+            mounts = mount_table.get_mounts()
+            disks = None
+            if proc_reader is not None:
                 try:
-                    partition_usage = psutil.disk_usage(partition.mountpoint)
-                    disk_info = {
-                        'device': partition.device,
-                        'mountpoint': partition.mountpoint,
-                        'file_system': partition.fstype,
-                        'total': partition_usage.total,
-                        'used': partition_usage.used,
-                        'free': partition_usage.free,
-                        'percent': round(partition_usage.used / partition_usage.total * 100, 2)
-                    }
-                    disks.append(disk_info)
-                except PermissionError:
-                    # 忽略无法访问的分区
-                    continue
+                    disks = proc_reader.get_disk_info(mounts)
+                except OSError as e:
+                    logger.warning(f"通过/proc读取磁盘信息失败，回退到psutil: {e}")
+            if disks is None:
+                disks = SystemCollector.read_disk_info_psutil(mounts)
                     
             logger.info(f"磁盘信息采集成功，共采集 {len(disks)} 个分区")
         except Exception as e:
             logger.error(f"采集磁盘信息时出错: {e}")
+            disks = []
         
         return disks
     
+    @staticmethod
+    def read_disk_info_psutil(mounts: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        通过psutil读取磁盘信息
+        
+        Args:
+            mounts: 需要统计的挂载点列表，默认使用psutil.disk_partitions()的结果
+        """
+        if mounts is None:
+            mounts = [
+                {'device': p.device, 'mountpoint': p.mountpoint, 'fstype': p.fstype}
+                for p in psutil.disk_partitions()
+            ]
+        
+        disks = []
+        for mount in mounts:
+            try:
+                partition_usage = psutil.disk_usage(mount['mountpoint'])
+            except (PermissionError, FileNotFoundError):
+                # 忽略无法访问的分区
+                continue
+            if partition_usage.total == 0:
+                # 忽略容量为0的伪文件系统
+                continue
+            disks.append({
+                'device': mount['device'],
+                'mountpoint': mount['mountpoint'],
+                'file_system': mount['fstype'],
+                'total': partition_usage.total,
+                'used': partition_usage.used,
+                'free': partition_usage.free,
+                'percent': round(partition_usage.used / partition_usage.total * 100, 2)
+            })
+        
+        return disks
+    
+    @staticmethod
+    def get_disk_io_info() -> List[Dict]:
+        """获取各磁盘设备的I/O速率（根据与上一次采集的计数器差值计算，首次采集返回空列表）"""
+        disk_io = []
+        
+        try:
+            now = time.monotonic()
+            counters = psutil.disk_io_counters(perdisk=True) or {}
+            devices = [
+                device for device in counters
+                if not any(fnmatch.fnmatchcase(device, pattern) for pattern in Config.DISK_IO_EXCLUDE_DEVICES)
+            ]
+            disk_io_tracker.prune(devices)
+            
+            for device in devices:
+                io = counters[device]
+                result = disk_io_tracker.update(device, io._asdict(), now)
+                if result is None:
+                    continue
+                deltas, elapsed = result
+                
+                operations = deltas['read_count'] + deltas['write_count']
+                io_time = deltas['read_time'] + deltas['write_time']
+                # busy_time仅在Linux和FreeBSD上提供
+                busy_time = deltas.get('busy_time')
+                disk_io.append({
+                    'device': device,
+                    'read_bytes_per_sec': round(deltas['read_bytes'] / elapsed, 2),
+                    'write_bytes_per_sec': round(deltas['write_bytes'] / elapsed, 2),
+                    'read_iops': round(deltas['read_count'] / elapsed, 2),
+                    'write_iops': round(deltas['write_count'] / elapsed, 2),
+                    'await_ms': round(io_time / operations, 2) if operations else 0.0,
+                    'util_percent': round(min(busy_time / (elapsed * 1000) * 100, 100.0), 2) if busy_time is not None else 0.0
+                })
+            
+            logger.info(f"磁盘I/O信息采集成功，共采集 {len(disk_io)} 个设备")
+        except Exception as e:
+            logger.error(f"采集磁盘I/O信息时出错: {e}")
+        
+        return disk_io
+    
+    # 网卡计数器字段
+    NETWORK_COUNTER_FIELDS = (
+        'bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+        'errin', 'errout', 'dropin', 'dropout'
+    )
+    
+    @staticmethod
+    def get_network_info() -> List[Dict]:
+        """获取各网卡的流量速率（根据与上一次采集的计数器差值计算，首次采集返回空列表）"""
+        network = []
+        
+        try:
+            now = time.monotonic()
+            counters = psutil.net_io_counters(pernic=True) or {}
+            interfaces = [
+                interface for interface in counters
+                if not any(fnmatch.fnmatchcase(interface, pattern) for pattern in Config.NET_EXCLUDE_INTERFACES)
+            ]
+            network_tracker.prune(interfaces)
+            
+            for interface in interfaces:
+                result = network_tracker.update(interface, counters[interface]._asdict(), now)
+                if result is None:
+                    continue
+                deltas, elapsed = result
+                
+                nic_info = {'interface': interface}
+                for field in SystemCollector.NETWORK_COUNTER_FIELDS:
+                    nic_info[f'{field}_per_sec'] = round(deltas[field] / elapsed, 2)
+                network.append(nic_info)
+            
+            logger.info(f"网络流量信息采集成功，共采集 {len(network)} 个网卡")
+        except Exception as e:
+            logger.error(f"采集网络流量信息时出错: {e}")
+        
+        return network
+    
+    # 需要保存到数据库的排行字段（ProcessInfo表中有对应的列）
+    PERSISTED_RANK_KEYS = ('memory_percent', 'cpu_percent')
+    
     @staticmethod
     def get_process_info() -> List[Dict]:
-        """获取进程信息"""
+        """获取进程信息（用于保存到数据库的排行进程，按内存占用率降序）"""
         processes = []
         
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'status', 'cpu_percent', 'memory_percent', 'create_time']):
-                try:
-                    process_info = {
-                        'pid': proc.info['pid'],
-                        'name': proc.info['name'],
-                        'status': proc.info['status'],
-                        'cpu_percent': proc.info['cpu_percent'] or 0.0,
-                        'memory_percent': proc.info['memory_percent'] or 0.0,
-                        'create_time': proc.info['create_time']
-                    }
-                    processes.append(process_info)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    # 忽略无法访问的进程
-                    continue
+            # 复用进程表缓存中的句柄，单次遍历计算各字段的前N个进程
+            rankings = process_table.refresh()
             
-            # 按内存占用率排序，取前20个进程
+            # 合并需要保存的排行，同一进程只保留一条
+            seen = set()
+            for key in SystemCollector.PERSISTED_RANK_KEYS:
+                for proc in rankings.get(key, []):
+                    if proc['pid'] not in seen:
+                        seen.add(proc['pid'])
+                        processes.append(proc)
             processes.sort(key=lambda x: x['memory_percent'], reverse=True)
-            processes = processes[:20]
                     
             logger.info(f"进程信息采集成功，共采集 {len(processes)} 个进程")
         except Exception as e:
@@ -112,128 +253,23 @@ class SystemCollector:
         
         return processes
     
+    @staticmethod
+    def get_process_rankings() -> Tuple[Dict[str, List[Dict]], Optional[datetime]]:
+        """获取最近一次采集的进程排行（内存中的结果，不触发采集）"""
+        return process_table.get_rankings()
+    
     @staticmethod
     def get_application_versions() -> Dict[str, str]:
-        """获取应用程序版本信息"""
-        versions = {}
-        
-        # 获取Python版本
-        versions['python'] = platform.python_version()
-        
-        # 获取Java版本
-        try:
-            result = subprocess.run(['java', '-version'], capture_output=True, text=True, timeout=5)
-            if result.stderr:
-                versions['java'] = result.stderr.split('\n')[0]
-            else:
-                versions['java'] = "未安装"
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            versions['java'] = "未安装"
-        
-        # 获取Docker版本
-        try:
-            result = subprocess.run(['docker', '--version'], capture_output=True, text=True, timeout=5)
-            if result.stdout:
-                versions['docker'] = result.stdout.strip()
-            else:
-                versions['docker'] = "未安装"
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            versions['docker'] = "未安装"
-        
-        logger.info("应用程序版本信息采集成功")
-        return versions
+        """获取应用程序版本信息（读取版本注册表中后台探测的结果）"""
+        return version_registry.get_versions()
     
     @staticmethod
     def get_detailed_system_info() -> Dict:
-        """获取详细的系统信息"""
+        """获取详细的系统信息（静态信息来自缓存，动态信息来自最近一次调度采集）"""
         info = {}
         
         try:
-            # 操作系统信息
-            info['system'] = platform.system()
-            info['node'] = platform.node()
-            info['release'] = platform.release()
-            info['version'] = platform.version()
-            info['machine'] = platform.machine()
-            info['processor'] = platform.processor()
-            
-            # Python信息
-            info['python_version'] = platform.python_version()
-            info['python_compiler'] = platform.python_compiler()
-            info['python_build'] = platform.python_build()
-            
-            # CPU详细信息
-            info['cpu_count_logical'] = psutil.cpu_count(logical=True)
-            info['cpu_count_physical'] = psutil.cpu_count(logical=False)
-            info['cpu_freq'] = psutil.cpu_freq()._asdict() if psutil.cpu_freq() else {}
-            
-            # 内存详细信息
-            vm = psutil.virtual_memory()
-            info['memory'] = {
-                'total': vm.total,
-                'available': vm.available,
-                'percent': vm.percent,
-                'used': vm.used,
-                'free': vm.free,
-                'active': getattr(vm, 'active', 0),
-                'inactive': getattr(vm, 'inactive', 0),
-                'buffers': getattr(vm, 'buffers', 0),
-                'cached': getattr(vm, 'cached', 0),
-                'shared': getattr(vm, 'shared', 0)
-            }
-            
-            # 交换内存信息
-            sm = psutil.swap_memory()
-            info['swap_memory'] = {
-                'total': sm.total,
-                'used': sm.used,
-                'free': sm.free,
-                'percent': sm.percent,
-                'sin': getattr(sm, 'sin', 0),
-                'sout': getattr(sm, 'sout', 0)
-            }
-            
-            # 网络接口信息
-            info['network_interfaces'] = {}
-            net_if_addrs = psutil.net_if_addrs()
-            for interface, addresses in net_if_addrs.items():
-                info['network_interfaces'][interface] = []
-                for addr in addresses:
-                    info['network_interfaces'][interface].append({
-                        'family': str(addr.family),
-                        'address': addr.address,
-                        'netmask': addr.netmask,
-                        'broadcast': addr.broadcast
-                    })
-            
-            # 网络统计信息
-            net_io = psutil.net_io_counters()
-            info['network_io'] = {
-                'bytes_sent': net_io.bytes_sent,
-                'bytes_recv': net_io.bytes_recv,
-                'packets_sent': net_io.packets_sent,
-                'packets_recv': net_io.packets_recv,
-                'errin': net_io.errin,
-                'errout': net_io.errout,
-                'dropin': net_io.dropin,
-                'dropout': net_io.dropout
-            }
-            
-            # 启动时间
-            info['boot_time'] = psutil.boot_time()
-            
-            # 用户信息
-            users = psutil.users()
-            info['users'] = []
-            for user in users:
-                info['users'].append({
-                    'name': user.name,
-                    'terminal': user.terminal,
-                    'host': user.host,
-                    'started': user.started
-                })
-            
-            logger.info("详细系统信息采集成功")
+            info = host_facts.get_detailed_info()
         except Exception as e:
             logger.error(f"采集详细系统信息时出错: {e}")
             # 返回基本的系统信息
@@ -246,4 +282,4 @@ class SystemCollector:
                 'processor': platform.processor()
             })
         
-        return info
\ No newline at end of file
+        return info
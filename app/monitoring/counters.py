@@ -0,0 +1,78 @@
+# app/monitoring/counters.py
+"""累计计数器的差值与速率计算"""
+
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+# 32位计数器的回绕上限
+COUNTER_32BIT_MAX = 2 ** 32
+# 上一次读数距32位上限、本次读数距0都在此范围内时才按回绕处理
+COUNTER_32BIT_WRAP_MARGIN = 2 ** 30
+
+
+class CounterRateTracker:
+    """累计计数器速率跟踪器
+
+    按设备/网卡等对象保存上一次的计数器读数，根据本次读数计算各字段的增量和经过的时间。
+    计数器变小时视为被重置（设备重新挂载、驱动重新加载等），本次只更新基准值而不输出速率；
+    只有上一次读数接近32位上限、本次读数接近0时才按32位回绕处理。
+    """
+
+    def __init__(self):
+        """初始化跟踪器"""
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Tuple[float, Dict[str, int]]] = {}
+
+    def update(self, key: str, counters: Dict[str, int], now: Optional[float] = None) -> Optional[Tuple[Dict[str, int], float]]:
+        """
+        更新计数器读数
+
+        Args:
+            key: 对象标识（设备名、网卡名等）
+            counters: 本次的累计计数器读数
+            now: 读取时间（单调时钟），默认为当前时间
+
+        Returns:
+            Optional[Tuple[Dict[str, int], float]]: 各字段的增量和经过的秒数；
+            首次读取、计数器重置或时间未前进时返回None
+        """
+        if now is None:
+            now = time.monotonic()
+
+        with self._lock:
+            previous = self._samples.get(key)
+            self._samples[key] = (now, counters)
+
+        if previous is None:
+            return None
+
+        previous_time, previous_counters = previous
+        elapsed = now - previous_time
+        if elapsed <= 0:
+            return None
+
+        deltas = {}
+        for field, value in counters.items():
+            delta = self._delta(previous_counters.get(field, value), value)
+            if delta is None:
+                return None
+            deltas[field] = delta
+        return deltas, elapsed
+
+    def prune(self, active_keys: Iterable[str]) -> None:
+        """删除已经消失的对象（设备移除、网卡删除）的基准值"""
+        active = set(active_keys)
+        with self._lock:
+            for key in [key for key in self._samples if key not in active]:
+                del self._samples[key]
+
+    @staticmethod
+    def _delta(previous: int, current: int) -> Optional[int]:
+        """计算单个计数器的增量，计数器重置时返回None"""
+        if current >= previous:
+            return current - previous
+        if COUNTER_32BIT_MAX - COUNTER_32BIT_WRAP_MARGIN <= previous < COUNTER_32BIT_MAX \
+                and current < COUNTER_32BIT_WRAP_MARGIN:
+            return current + COUNTER_32BIT_MAX - previous
+        return None
@@ -0,0 +1,101 @@
+# app/monitoring/cpu_sampler.py
+"""基于CPU时间计数器差值的非阻塞CPU采样器"""
+
+import threading
+from typing import Dict, List, Optional
+
+import psutil
+
+
+class CpuSampler:
+    """CPU使用率采样器
+
+    保存上一次读取的CPU时间计数器，每次采样时根据两次计数器的差值
+    计算使用率，不需要像 ``psutil.cpu_percent(interval=1)`` 那样阻塞等待。
+    """
+
+    # 需要单独输出的CPU时间模式
+    MODES = ('user', 'system', 'iowait', 'steal')
+
+    # 视为空闲的时间模式
+    IDLE_MODES = ('idle', 'iowait')
+
+    # 已包含在user/nice中的时间模式（Linux），计算总时间时需要排除
+    EXCLUDED_MODES = ('guest', 'guest_nice')
+
+    def __init__(self):
+        """初始化采样器"""
+        self._lock = threading.Lock()
+        self._last_per_cpu: Optional[List[Dict[str, float]]] = None
+
+    def sample(self, per_cpu_times: Optional[List[Dict[str, float]]] = None) -> Dict:
+        """
+        采样CPU使用率
+
+        Args:
+            per_cpu_times: 每个逻辑核心的CPU时间计数器，默认通过psutil读取
+
+        Returns:
+            Dict: 包含总体使用率、每核使用率和各模式占比的字典
+        """
+        if per_cpu_times is None:
+            per_cpu_times = [times._asdict() for times in psutil.cpu_times(percpu=True)]
+
+        with self._lock:
+            previous = self._last_per_cpu
+            # 首次采样或核心数量变化时，以开机以来的累计值作为基准
+            if previous is None or len(previous) != len(per_cpu_times):
+                previous = [dict.fromkeys(times, 0.0) for times in per_cpu_times]
+            self._last_per_cpu = per_cpu_times
+
+        total_previous = self._sum_times(previous)
+        total_current = self._sum_times(per_cpu_times)
+        total_delta = self._total(total_current) - self._total(total_previous)
+
+        cpu_modes = {}
+        for mode in self.MODES:
+            cpu_modes[mode] = self._mode_percent(total_previous, total_current, mode, total_delta)
+
+        return {
+            'cpu_percent': self._busy_percent(total_previous, total_current),
+            'cpu_per_core': [
+                self._busy_percent(prev, curr) for prev, curr in zip(previous, per_cpu_times)
+            ],
+            'cpu_modes': cpu_modes
+        }
+
+    @staticmethod
+    def _sum_times(per_cpu_times: List[Dict[str, float]]) -> Dict[str, float]:
+        """汇总所有核心的CPU时间"""
+        summed: Dict[str, float] = {}
+        for times in per_cpu_times:
+            for mode, value in times.items():
+                summed[mode] = summed.get(mode, 0.0) + value
+        return summed
+
+    @classmethod
+    def _total(cls, times: Dict[str, float]) -> float:
+        """计算CPU总时间"""
+        return sum(value for mode, value in times.items() if mode not in cls.EXCLUDED_MODES)
+
+    @classmethod
+    def _busy_percent(cls, previous: Dict[str, float], current: Dict[str, float]) -> float:
+        """根据两次计数器计算非空闲时间占比"""
+        total_delta = cls._total(current) - cls._total(previous)
+        if total_delta <= 0:
+            return 0.0
+        idle_delta = sum(current.get(mode, 0.0) - previous.get(mode, 0.0) for mode in cls.IDLE_MODES)
+        busy_delta = max(total_delta - idle_delta, 0.0)
+        return round(min(busy_delta / total_delta * 100, 100.0), 1)
+
+    @staticmethod
+    def _mode_percent(previous: Dict[str, float], current: Dict[str, float], mode: str, total_delta: float) -> float:
+        """计算某一时间模式的占比，当前平台不支持的模式返回0"""
+        if total_delta <= 0 or mode not in current:
+            return 0.0
+        mode_delta = max(current[mode] - previous.get(mode, 0.0), 0.0)
+        return round(min(mode_delta / total_delta * 100, 100.0), 1)
+
+
+# 全局采样器实例，在采集任务与阈值检查之间共享计数器状态
+cpu_sampler = CpuSampler()
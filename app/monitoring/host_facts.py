@@ -0,0 +1,198 @@
+# app/monitoring/host_facts.py
+"""主机信息缓存（静态信息与动态信息分层）"""
+
+import platform
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import psutil
+from loguru import logger
+
+
+class HostFacts:
+    """主机信息缓存
+
+    进程运行期间不会变化的信息（操作系统、Python构建信息、CPU核心数、网卡地址、
+    启动时间等）只计算一次，网卡地址变化时失效重建；内存、交换分区、网络计数器、
+    登录用户等动态信息由调度器在每次采集时刷新，读取时直接使用最近一次的结果。
+    """
+
+    def __init__(self):
+        """初始化主机信息缓存"""
+        self._lock = threading.Lock()
+        self._static: Optional[Dict] = None
+        self._volatile: Optional[Dict] = None
+        self._nic_fingerprint: Optional[Tuple] = None
+        self._listeners: List[Callable[[Dict], None]] = []
+
+    def add_interface_listener(self, listener: Callable[[Dict], None]) -> None:
+        """
+        注册网卡地址变化的监听函数
+
+        Args:
+            listener: 回调函数，参数为 ``psutil.net_if_addrs()`` 的结果
+        """
+        self._listeners.append(listener)
+
+    def get_static(self) -> Dict:
+        """获取静态主机信息，首次调用时计算"""
+        with self._lock:
+            if self._static is None:
+                self._static = self._collect_static(psutil.net_if_addrs())
+            return self._static
+
+    def invalidate(self) -> None:
+        """使静态信息失效，下次读取时重新计算"""
+        with self._lock:
+            self._static = None
+
+    def refresh(self) -> None:
+        """刷新动态信息并检查网卡地址是否变化（由调度器在每次采集时调用）"""
+        net_if_addrs = psutil.net_if_addrs()
+        fingerprint = self._fingerprint(net_if_addrs)
+        changed = self._nic_fingerprint is not None and fingerprint != self._nic_fingerprint
+        self._nic_fingerprint = fingerprint
+
+        volatile = self._collect_volatile()
+        with self._lock:
+            if changed or self._static is None:
+                self._static = self._collect_static(net_if_addrs)
+            self._volatile = volatile
+
+        if changed:
+            logger.info("检测到网卡地址变化，主机静态信息已重建")
+            for listener in self._listeners:
+                try:
+                    listener(net_if_addrs)
+                except Exception as e:
+                    logger.error(f"处理网卡地址变化时出错: {e}")
+
+    def get_detailed_info(self) -> Dict:
+        """
+        获取详细的主机信息
+
+        Returns:
+            Dict: 静态信息与最近一次采集的动态信息合并后的字典
+        """
+        static = self.get_static()
+        volatile = self._volatile
+        if volatile is None:
+            # 调度器尚未完成首次采集时实时读取一次
+            volatile = self._collect_volatile()
+            self._volatile = volatile
+
+        info = dict(static)
+        info.update(volatile)
+        return info
+
+    @staticmethod
+    def _fingerprint(net_if_addrs: Dict) -> Tuple:
+        """网卡地址的指纹，用于检测变化"""
+        return tuple(sorted(
+            (interface, str(addr.family), addr.address, addr.netmask)
+            for interface, addresses in net_if_addrs.items()
+            for addr in addresses
+        ))
+
+    @staticmethod
+    def _collect_static(net_if_addrs: Dict) -> Dict:
+        """采集静态主机信息"""
+        info = {}
+
+        # 操作系统信息
+        info['system'] = platform.system()
+        info['node'] = platform.node()
+        info['release'] = platform.release()
+        info['version'] = platform.version()
+        info['machine'] = platform.machine()
+        info['processor'] = platform.processor()
+
+        # Python信息
+        info['python_version'] = platform.python_version()
+        info['python_compiler'] = platform.python_compiler()
+        info['python_build'] = platform.python_build()
+
+        # CPU核心数
+        info['cpu_count_logical'] = psutil.cpu_count(logical=True)
+        info['cpu_count_physical'] = psutil.cpu_count(logical=False)
+
+        # 网络接口信息
+        info['network_interfaces'] = {}
+        for interface, addresses in net_if_addrs.items():
+            info['network_interfaces'][interface] = []
+            for addr in addresses:
+                info['network_interfaces'][interface].append({
+                    'family': str(addr.family),
+                    'address': addr.address,
+                    'netmask': addr.netmask,
+                    'broadcast': addr.broadcast
+                })
+
+        # 启动时间
+        info['boot_time'] = psutil.boot_time()
+
+        return info
+
+    @staticmethod
+    def _collect_volatile() -> Dict:
+        """采集动态主机信息"""
+        info = {}
+
+        # CPU频率
+        cpu_freq = psutil.cpu_freq()
+        info['cpu_freq'] = cpu_freq._asdict() if cpu_freq else {}
+
+        # 内存详细信息
+        vm = psutil.virtual_memory()
+        info['memory'] = {
+            'total': vm.total,
+            'available': vm.available,
+            'percent': vm.percent,
+            'used': vm.used,
+            'free': vm.free,
+            'active': getattr(vm, 'active', 0),
+            'inactive': getattr(vm, 'inactive', 0),
+            'buffers': getattr(vm, 'buffers', 0),
+            'cached': getattr(vm, 'cached', 0),
+            'shared': getattr(vm, 'shared', 0)
+        }
+
+        # 交换内存信息
+        sm = psutil.swap_memory()
+        info['swap_memory'] = {
+            'total': sm.total,
+            'used': sm.used,
+            'free': sm.free,
+            'percent': sm.percent,
+            'sin': getattr(sm, 'sin', 0),
+            'sout': getattr(sm, 'sout', 0)
+        }
+
+        # 网络统计信息
+        net_io = psutil.net_io_counters()
+        info['network_io'] = {
+            'bytes_sent': net_io.bytes_sent,
+            'bytes_recv': net_io.bytes_recv,
+            'packets_sent': net_io.packets_sent,
+            'packets_recv': net_io.packets_recv,
+            'errin': net_io.errin,
+            'errout': net_io.errout,
+            'dropin': net_io.dropin,
+            'dropout': net_io.dropout
+        } if net_io else {}
+
+        # 用户信息
+        info['users'] = []
+        for user in psutil.users():
+            info['users'].append({
+                'name': user.name,
+                'terminal': user.terminal,
+                'host': user.host,
+                'started': user.started
+            })
+
+        return info
+
+
+# 全局主机信息缓存实例
+host_facts = HostFacts()
@@ -0,0 +1,107 @@
+# app/monitoring/latest_snapshot.py
+"""最近一次采集结果的发布缓存（预先序列化为JSON字节）"""
+
+import json
+from typing import Dict, List, Optional
+
+from flask import Response
+
+from app.config.config import Config
+from app.monitoring.collector import SystemCollector
+from app.monitoring.snapshot import CollectionSnapshot
+
+
+class LatestSnapshot:
+    """最新数据缓存
+
+    调度器每次采集完成后调用 ``publish``，把"最新数据"类接口的响应体一次性序列化为JSON字节，
+    整体替换为新的字典（引用赋值是原子操作，读取方不需要加锁）。接口直接返回这些字节，
+    不查询数据库、不重新构造响应对象；发布之前（刚启动）返回None，由调用方回退到数据库查询。
+
+    采集缺失的阶段沿用上一次发布的数据，与从数据库读取各表最近一条记录的结果一致。
+    """
+
+    # 与 ``jsonify`` 的输出一致（Flask默认的JSON格式）
+    JSON_OPTIONS = {'ensure_ascii': True, 'sort_keys': True, 'separators': (',', ':')}
+
+    def __init__(self):
+        """初始化最新数据缓存"""
+        self._payloads: Dict[str, bytes] = {}
+        # 各阶段最近一次成功采集的结果
+        self._system_info: Optional[Dict] = None
+        self._disks: Optional[List[Dict]] = None
+        self._disks_time = None
+
+    def publish(self, snapshot: CollectionSnapshot) -> None:
+        """用一次采集的结果生成各接口的响应体并替换缓存（只由调度器的采集任务调用）"""
+        if snapshot.system_info is not None:
+            self._system_info = snapshot.system_info
+        if snapshot.disk_info is not None:
+            # 数值按数据库中的浮点列输出，与从数据库读取的响应一致
+            self._disks = [
+                {
+                    'device': disk.get('device'),
+                    'mountpoint': disk.get('mountpoint'),
+                    **{field: self._float(disk.get(field)) for field in ('total', 'used', 'free', 'percent')}
+                }
+                for disk in snapshot.disk_info
+            ]
+            self._disks_time = snapshot.timestamp
+
+        payloads = {}
+        applications = SystemCollector.get_application_versions()
+        if self._system_info is not None:
+            payloads['system_info'] = self._dumps({
+                'system': {
+                    'cpu_percent': self._system_info.get('cpu_percent'),
+                    'memory_percent': self._system_info.get('memory_percent'),
+                    'boot_time': self._system_info.get('boot_time'),
+                    'load_average': [value or 0 for value in self._system_info.get('load_average') or (0, 0, 0)]
+                },
+                'disks': self._disks or [],
+                'applications': applications
+            })
+            payloads['system_memory'] = self._dumps({'memory_percent': self._system_info.get('memory_percent')})
+        if self._disks is not None:
+            payloads['system_disk'] = self._dumps({
+                'disks': self._disks,
+                'max_disk_percent': max([disk['percent'] or 0 for disk in self._disks] + [0]),
+                'applications': applications,
+                'collection_time': self._disks_time.isoformat()
+            })
+
+        # 各排序字段默认数量的进程排行
+        rankings, ranked_at = SystemCollector.get_process_rankings()
+        for key, processes in rankings.items():
+            payloads[f'processes:{key}'] = self._dumps({
+                'processes': processes[:Config.PROCESS_TOP_N],
+                'sort': key,
+                'collection_time': ranked_at.isoformat() if ranked_at else None
+            })
+
+        self._payloads = payloads
+
+    def get(self, name: str) -> Optional[bytes]:
+        """已发布的响应体，尚未发布时返回None"""
+        return self._payloads.get(name)
+
+    def response(self, name: str) -> Optional[Response]:
+        """用已发布的响应体构造JSON响应，尚未发布时返回None"""
+        payload = self._payloads.get(name)
+        if payload is None:
+            return None
+        return Response(payload, mimetype='application/json')
+
+    @staticmethod
+    def _float(value) -> Optional[float]:
+        """转换为浮点数（None保持不变）"""
+        return None if value is None else float(value)
+
+    @classmethod
+    def _dumps(cls, data: Dict) -> bytes:
+        """序列化为JSON字节"""
+        return (json.dumps(data, **cls.JSON_OPTIONS) + '\n').encode('utf-8')
+
+
+# 全局最新数据缓存实例
+latest_snapshot = LatestSnapshot()
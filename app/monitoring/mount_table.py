@@ -0,0 +1,140 @@
+# app/monitoring/mount_table.py
+"""带缓存和过滤规则的挂载表"""
+
+import fnmatch
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import psutil
+from loguru import logger
+
+from app.config.config import Config
+from app.monitoring.proc_reader import ProcReader
+
+
+class MountTable:
+    """挂载表缓存
+
+    只在挂载表发生变化时重建：Linux下监听 ``/proc/self/mountinfo`` 的变化通知，
+    其他平台按 ``MOUNT_TABLE_TTL`` 定期重建。重建时按文件系统类型和挂载点规则过滤，
+    并对同一设备的多个绑定挂载去重。
+    """
+
+    def __init__(
+        self,
+        proc_reader: Optional[ProcReader] = None,
+        include_fstypes: Optional[List[str]] = None,
+        exclude_fstypes: Optional[List[str]] = None,
+        include_mountpoints: Optional[List[str]] = None,
+        exclude_mountpoints: Optional[List[str]] = None,
+        ttl: Optional[int] = None
+    ):
+        """
+        初始化挂载表
+
+        Args:
+            proc_reader: /proc读取器，为None时通过psutil读取挂载表
+            include_fstypes: 文件系统类型白名单，为空时只保留物理文件系统
+            exclude_fstypes: 文件系统类型黑名单
+            include_mountpoints: 挂载点白名单（通配符），为空时不限制
+            exclude_mountpoints: 挂载点黑名单（通配符）
+            ttl: 无法监听变化时的重建间隔（秒）
+        """
+        self.proc_reader = proc_reader
+        self.include_fstypes = set(Config.DISK_INCLUDE_FSTYPES if include_fstypes is None else include_fstypes)
+        self.exclude_fstypes = set(Config.DISK_EXCLUDE_FSTYPES if exclude_fstypes is None else exclude_fstypes)
+        self.include_mountpoints = Config.DISK_INCLUDE_MOUNTPOINTS if include_mountpoints is None else include_mountpoints
+        self.exclude_mountpoints = Config.DISK_EXCLUDE_MOUNTPOINTS if exclude_mountpoints is None else exclude_mountpoints
+        self.ttl = Config.MOUNT_TABLE_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._mounts: Optional[List[Dict]] = None
+        self._built_at = 0.0
+
+    def get_mounts(self) -> List[Dict]:
+        """
+        获取过滤后的挂载点列表
+
+        Returns:
+            List[Dict]: 挂载点列表，每项包含device、mountpoint、fstype
+        """
+        with self._lock:
+            if self._mounts is None or self._is_stale():
+                self._mounts = self._build()
+                self._built_at = time.monotonic()
+            return self._mounts
+
+    def invalidate(self) -> None:
+        """使缓存失效，下次获取时重建"""
+        with self._lock:
+            self._mounts = None
+
+    def _is_stale(self) -> bool:
+        """判断缓存是否需要重建"""
+        if self.proc_reader is not None:
+            return self.proc_reader.mountinfo_changed()
+        return time.monotonic() - self._built_at >= self.ttl
+
+    def _build(self) -> List[Dict]:
+        """读取并过滤挂载表"""
+        if self.proc_reader is not None:
+            mounts = self.proc_reader.read_mountinfo()
+            physical_fstypes = self.proc_reader.physical_fstypes()
+            # 读取后再注册变化监听，避免把首次读取之前的变化当作新的变化
+            self.proc_reader.mountinfo_changed()
+        else:
+            mounts = [
+                {'device': p.device, 'mountpoint': p.mountpoint, 'fstype': p.fstype}
+                for p in psutil.disk_partitions(all=True)
+            ]
+            physical_fstypes = {p.fstype for p in psutil.disk_partitions(all=False)}
+
+        accepted = [mount for mount in mounts if self._accept(mount, physical_fstypes)]
+        result = self._deduplicate(accepted)
+        logger.info(f"挂载表已重建，共 {len(mounts)} 个挂载点，过滤后保留 {len(result)} 个")
+        return result
+
+    def _accept(self, mount: Dict, physical_fstypes) -> bool:
+        """按过滤规则判断是否保留挂载点"""
+        fstype = mount['fstype']
+        mountpoint = mount['mountpoint']
+
+        if self.include_fstypes:
+            if fstype not in self.include_fstypes:
+                return False
+        elif mount['device'] in ('', 'none') or fstype not in physical_fstypes:
+            return False
+
+        if fstype in self.exclude_fstypes:
+            return False
+        if self.include_mountpoints and not self._match(mountpoint, self.include_mountpoints):
+            return False
+        return not self._match(mountpoint, self.exclude_mountpoints)
+
+    @staticmethod
+    def _match(mountpoint: str, patterns: List[str]) -> bool:
+        """挂载点是否匹配任一规则"""
+        return any(mountpoint == pattern or fnmatch.fnmatchcase(mountpoint, pattern) for pattern in patterns)
+
+    @staticmethod
+    def _deduplicate(mounts: List[Dict]) -> List[Dict]:
+        """同一设备的多个（绑定）挂载只保留一个：优先挂载文件系统根目录、挂载点最短的"""
+        by_device: Dict[str, Dict] = {}
+        for mount in mounts:
+            dev_id = mount.get('dev_id')
+            if dev_id is None:
+                try:
+                    dev_id = str(os.stat(mount['mountpoint']).st_dev)
+                except OSError:
+                    dev_id = mount['device']
+            rank = (mount.get('root', '/') != '/', len(mount['mountpoint']))
+            current = by_device.get(dev_id)
+            if current is None or rank < current['_rank']:
+                by_device[dev_id] = dict(mount, _rank=rank)
+
+        result = []
+        for mount in by_device.values():
+            mount.pop('_rank')
+            result.append(mount)
+        return result
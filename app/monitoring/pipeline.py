@@ -0,0 +1,99 @@
+# app/monitoring/pipeline.py
+"""并行采集流水线"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+from app.config.config import Config
+from app.monitoring.collector import SystemCollector
+from app.monitoring.host_facts import host_facts
+from app.monitoring.snapshot import CollectionSnapshot
+from app.utils.helpers import get_current_local_time
+
+
+class CollectionPipeline:
+    """采集流水线
+
+    各采集阶段在有界线程池中并发执行，本次采集的耗时取决于最慢的阶段而不是各阶段之和。
+    每次采集最多等待 ``COLLECT_STAGE_TIMEOUT`` 秒，超时的阶段记为缺口，不影响其他阶段的数据；
+    上一次仍未结束（例如卡在挂起的网络文件系统上）的阶段本次直接跳过，
+    保证每个阶段最多只有一个挂起的任务占用线程。
+    """
+
+    # 阶段名称到快照属性和采集函数的映射
+    STAGES: Dict[str, Callable] = {
+        'system_info': SystemCollector.get_system_info,
+        'disk_info': SystemCollector.get_disk_info,
+        'process_info': SystemCollector.get_process_info,
+        'disk_io_info': SystemCollector.get_disk_io_info,
+        'network_info': SystemCollector.get_network_info,
+        # 刷新主机动态信息（供首页和详细信息接口直接读取），不写入快照
+        'host_facts': host_facts.refresh,
+    }
+
+    def __init__(self, workers: Optional[int] = None, timeout: Optional[float] = None):
+        """
+        初始化采集流水线
+
+        Args:
+            workers: 线程池大小，默认读取 ``COLLECT_STAGE_WORKERS`` 配置
+            timeout: 单次采集等待各阶段的超时时间（秒），默认读取 ``COLLECT_STAGE_TIMEOUT`` 配置
+        """
+        self.workers = workers or Config.COLLECT_STAGE_WORKERS
+        self.timeout = timeout or Config.COLLECT_STAGE_TIMEOUT
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='collect-stage')
+        self._lock = threading.Lock()
+        # 各阶段仍在执行的任务
+        self._pending: Dict[str, Future] = {}
+
+    def collect(self) -> CollectionSnapshot:
+        """
+        执行一次采集
+
+        Returns:
+            CollectionSnapshot: 采集快照，未完成的阶段记录在gaps中
+        """
+        snapshot = CollectionSnapshot(get_current_local_time())
+        futures: Dict[str, Future] = {}
+
+        with self._lock:
+            for name, stage in self.STAGES.items():
+                previous = self._pending.get(name)
+                if previous is not None and not previous.done():
+                    snapshot.gaps[name] = "上一次采集仍未结束"
+                    continue
+                futures[name] = self._pending[name] = self._executor.submit(self._run_stage, stage)
+
+        wait(futures.values(), timeout=self.timeout)
+
+        for name, future in futures.items():
+            if not future.done():
+                snapshot.gaps[name] = f"超过 {self.timeout} 秒未完成"
+                continue
+            try:
+                result, duration = future.result()
+            except Exception as e:
+                snapshot.gaps[name] = f"采集出错: {e}"
+                continue
+            snapshot.durations[name] = duration
+            if hasattr(snapshot, name):
+                setattr(snapshot, name, result)
+
+        for name, reason in snapshot.gaps.items():
+            logger.warning(f"采集阶段 {name} 缺失: {reason}")
+        return snapshot
+
+    def shutdown(self) -> None:
+        """关闭线程池（不等待挂起的阶段）"""
+        self._executor.shutdown(wait=False)
+
+    @staticmethod
+    def _run_stage(stage: Callable):
+        """执行单个阶段并计时"""
+        started = time.monotonic()
+        result = stage()
+        return result, time.monotonic() - started
@@ -0,0 +1,275 @@
+# app/monitoring/proc_reader.py
+"""Linux /proc 快速读取器
+
+每个采集周期只读取一次 ``/proc/stat``、``/proc/meminfo``、``/proc/loadavg``
+和 ``/proc/self/mountinfo``，文件描述符和读取缓冲区在周期之间复用，
+返回与 ``SystemCollector`` 相同结构的字典。
+"""
+
+import os
+import select
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from app.monitoring.cpu_sampler import cpu_sampler
+
+
+class ProcFile:
+    """可复用文件描述符和缓冲区的 /proc 文件"""
+
+    def __init__(self, path: str, buffer_size: int = 8192):
+        """
+        初始化 /proc 文件
+
+        Args:
+            path: 文件路径
+            buffer_size: 初始缓冲区大小，内容超出时自动扩容
+        """
+        self.path = path
+        self._fd: Optional[int] = None
+        self._buffer = bytearray(buffer_size)
+        self._lock = threading.Lock()
+
+    def fileno(self) -> int:
+        """获取文件描述符，首次调用时打开文件"""
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDONLY)
+        return self._fd
+
+    def read(self) -> bytes:
+        """
+        从文件开头重新读取全部内容
+
+        seq_file实现的文件（如mountinfo）每次读取最多返回约一页，返回的字节数少于请求的长度
+        不表示已到文件末尾，因此按偏移量继续读取，直到读取返回0字节。
+        """
+        with self._lock:
+            self.fileno()
+            offset = 0
+            while True:
+                if offset == len(self._buffer):
+                    # 缓冲区已满，扩容后继续读取
+                    self._buffer.extend(bytes(len(self._buffer)))
+                view = memoryview(self._buffer)[offset:]
+                try:
+                    size = os.preadv(self._fd, [view], offset)
+                finally:
+                    view.release()
+                if size == 0:
+                    return bytes(memoryview(self._buffer)[:offset])
+                offset += size
+
+    def close(self) -> None:
+        """关闭文件描述符"""
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+class ProcReader:
+    """基于 /proc 的系统信息读取器"""
+
+    # /proc/stat 中CPU时间字段的顺序
+    CPU_FIELDS = ('user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal', 'guest', 'guest_nice')
+
+    def __init__(self, proc_root: str = '/proc'):
+        """
+        初始化读取器
+
+        Args:
+            proc_root: /proc 文件系统的根目录，测试时可以指向样例目录
+        """
+        self.proc_root = proc_root
+        self.clock_ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+        self._stat = ProcFile(os.path.join(proc_root, 'stat'))
+        self._meminfo = ProcFile(os.path.join(proc_root, 'meminfo'))
+        self._loadavg = ProcFile(os.path.join(proc_root, 'loadavg'), buffer_size=128)
+        self._mountinfo = ProcFile(os.path.join(proc_root, 'self', 'mountinfo'), buffer_size=65536)
+        self._physical_fstypes: Optional[frozenset] = None
+        self._mountinfo_poller = None
+
+    @staticmethod
+    def is_supported(proc_root: str = '/proc') -> bool:
+        """当前平台是否可以使用 /proc 快速读取"""
+        return sys.platform.startswith('linux') and os.path.exists(os.path.join(proc_root, 'stat'))
+
+    def close(self) -> None:
+        """关闭所有文件描述符"""
+        for proc_file in (self._stat, self._meminfo, self._loadavg, self._mountinfo):
+            proc_file.close()
+
+    def read_stat(self) -> Tuple[List[Dict[str, float]], float]:
+        """
+        读取 /proc/stat
+
+        Returns:
+            Tuple[List[Dict[str, float]], float]: 每个核心的CPU时间（秒）和系统启动时间
+        """
+        per_cpu_times = []
+        boot_time = 0.0
+        for line in self._stat.read().splitlines():
+            if line.startswith(b'cpu') and not line.startswith(b'cpu '):
+                values = line.split()[1:]
+                per_cpu_times.append({
+                    field: int(value) / self.clock_ticks for field, value in zip(self.CPU_FIELDS, values)
+                })
+            elif line.startswith(b'btime'):
+                boot_time = float(line.split()[1])
+        return per_cpu_times, boot_time
+
+    def read_meminfo(self) -> Dict[str, int]:
+        """
+        读取 /proc/meminfo
+
+        Returns:
+            Dict[str, int]: 字段名到字节数的映射
+        """
+        meminfo = {}
+        for line in self._meminfo.read().splitlines():
+            name, _, rest = line.partition(b':')
+            fields = rest.split()
+            if not fields:
+                continue
+            value = int(fields[0])
+            if len(fields) > 1 and fields[1] == b'kB':
+                value *= 1024
+            meminfo[name.decode()] = value
+        return meminfo
+
+    def read_loadavg(self) -> Tuple[float, float, float]:
+        """读取 /proc/loadavg"""
+        fields = self._loadavg.read().split()
+        return float(fields[0]), float(fields[1]), float(fields[2])
+
+    def read_mountinfo(self) -> List[Dict[str, str]]:
+        """
+        读取 /proc/self/mountinfo
+
+        Returns:
+            List[Dict[str, str]]: 挂载信息列表，包含设备号、挂载源、挂载点和文件系统类型
+        """
+        mounts = []
+        lines = [line for line in self._mountinfo.read().decode('utf-8', 'replace').splitlines() if line.strip()]
+        for line in lines:
+            fields = line.split()
+            try:
+                separator = fields.index('-')
+            except ValueError:
+                continue
+            if len(fields) < separator + 3:
+                continue
+            mounts.append({
+                'dev_id': fields[2],
+                'root': self._unescape(fields[3]),
+                'mountpoint': self._unescape(fields[4]),
+                'fstype': fields[separator + 1],
+                'device': self._unescape(fields[separator + 2])
+            })
+        if len(mounts) != len(lines):
+            # 无法解析的行对应的文件系统不会出现在磁盘采集和告警中
+            logger.warning(
+                f"{self._mountinfo.path} 共 {len(lines)} 行，只解析出 {len(mounts)} 个挂载点，部分文件系统将不会被采集"
+            )
+        return mounts
+
+    def mountinfo_changed(self) -> bool:
+        """
+        挂载表自上次检查以来是否发生变化
+
+        内核在挂载命名空间变化后会对mountinfo文件描述符报告POLLPRI/POLLERR，
+        检查本身不需要读取和解析文件内容。
+        """
+        if self._mountinfo_poller is None:
+            self._mountinfo_poller = select.poll()
+            self._mountinfo_poller.register(self._mountinfo.fileno(), select.POLLPRI | select.POLLERR)
+        return any(
+            events & (select.POLLPRI | select.POLLERR) for _, events in self._mountinfo_poller.poll(0)
+        )
+
+    def physical_fstypes(self) -> frozenset:
+        """读取 /proc/filesystems 中非nodev的文件系统类型（只读取一次）"""
+        if self._physical_fstypes is None:
+            fstypes = set()
+            with open(os.path.join(self.proc_root, 'filesystems'), 'rb') as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) == 1:
+                        fstypes.add(fields[0].decode())
+                    elif fields and fields[0] == b'nodev' and fields[1] == b'zfs':
+                        fstypes.add('zfs')
+            self._physical_fstypes = frozenset(fstypes)
+        return self._physical_fstypes
+
+    def get_system_info(self) -> Dict:
+        """获取系统基本信息，与 ``SystemCollector.get_system_info`` 的结构相同"""
+        per_cpu_times, boot_time = self.read_stat()
+        cpu_info = cpu_sampler.sample(per_cpu_times)
+
+        meminfo = self.read_meminfo()
+        memory_total = meminfo.get('MemTotal', 0)
+        memory_available = meminfo.get('MemAvailable')
+        if memory_available is None:
+            # 旧内核没有MemAvailable字段
+            memory_available = meminfo.get('MemFree', 0) + meminfo.get('Buffers', 0) + meminfo.get('Cached', 0)
+        memory_percent = round((memory_total - memory_available) / memory_total * 100, 1) if memory_total else 0.0
+
+        return {
+            'cpu_percent': cpu_info['cpu_percent'],
+            'cpu_per_core': cpu_info['cpu_per_core'],
+            'cpu_modes': cpu_info['cpu_modes'],
+            'memory_total': memory_total,
+            'memory_available': memory_available,
+            'memory_percent': memory_percent,
+            'boot_time': boot_time,
+            'load_average': self.read_loadavg()
+        }
+
+    def get_disk_info(self, mounts: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        获取磁盘信息，与 ``SystemCollector.get_disk_info`` 的结构相同
+
+        Args:
+            mounts: 需要统计的挂载点列表，默认读取mountinfo中的全部物理文件系统
+        """
+        if mounts is None:
+            fstypes = self.physical_fstypes()
+            mounts = [
+                mount for mount in self.read_mountinfo()
+                if mount['device'] not in ('', 'none') and mount['fstype'] in fstypes
+            ]
+
+        disks = []
+        for mount in mounts:
+            try:
+                stat = os.statvfs(mount['mountpoint'])
+            except OSError:
+                # 忽略无法访问的分区
+                continue
+            total = stat.f_blocks * stat.f_frsize
+            if total == 0:
+                # 忽略容量为0的伪文件系统
+                continue
+            free = stat.f_bavail * stat.f_frsize
+            used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+            disks.append({
+                'device': mount['device'],
+                'mountpoint': mount['mountpoint'],
+                'file_system': mount['fstype'],
+                'total': total,
+                'used': used,
+                'free': free,
+                'percent': round(used / total * 100, 2)
+            })
+        return disks
+
+    @staticmethod
+    def _unescape(value: str) -> str:
+        """还原mountinfo中八进制转义的空白字符"""
+        if '\\' not in value:
+            return value
+        return (value.replace('\\040', ' ').replace('\\011', '\t')
+                .replace('\\012', '\n').replace('\\134', '\\'))
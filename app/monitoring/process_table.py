@@ -0,0 +1,220 @@
+# app/monitoring/process_table.py
+"""跨采集周期复用的进程句柄缓存"""
+
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+from loguru import logger
+
+from app.config.config import Config
+from app.utils.helpers import get_current_local_time
+
+
+class ProcessEntry:
+    """进程缓存条目
+
+    保存psutil进程句柄、只需读取一次的静态字段以及上一次的CPU时间，
+    用于在下一次采集时根据差值计算CPU使用率。
+    """
+
+    __slots__ = (
+        'process', 'key', 'pid', 'name', 'create_time',
+        'cpu_time', 'sampled_at', 'cpu_percent', 'memory_percent',
+        'rss', 'status', 'num_threads', 'num_fds'
+    )
+
+    def __init__(self, process: psutil.Process, create_time: float, name: str):
+        self.process = process
+        self.pid = process.pid
+        self.create_time = create_time
+        self.key: Tuple[int, float] = (process.pid, create_time)
+        self.name = name
+        self.cpu_time: Optional[float] = None
+        self.sampled_at: Optional[float] = None
+        self.cpu_percent = 0.0
+        self.memory_percent = 0.0
+        self.rss = 0
+        self.status = ''
+        self.num_threads = 0
+        self.num_fds = 0
+
+    def update(self, now: float, memory_total: int) -> bool:
+        """
+        读取进程的动态字段并更新CPU使用率
+
+        Args:
+            now: 本次采集的单调时钟时间
+            memory_total: 物理内存总量，用于计算内存占用率
+
+        Returns:
+            bool: 进程是否仍是缓存中的同一个进程（创建时间变化或CPU时间回退说明PID已被复用）
+        """
+        process = self.process
+        # create_time()返回的是首次读取时缓存的值，无法发现PID复用；
+        # is_running()重新读取该PID当前进程的创建时间并与句柄比较
+        if not process.is_running():
+            return False
+        with process.oneshot():
+            cpu_times = process.cpu_times()
+            self.rss = process.memory_info().rss
+            self.status = process.status()
+            self.num_threads = process.num_threads()
+            try:
+                self.num_fds = process.num_fds() if hasattr(process, 'num_fds') else process.num_handles()
+            except psutil.AccessDenied:
+                self.num_fds = 0
+
+        cpu_time = cpu_times.user + cpu_times.system
+        if self.cpu_time is None:
+            # 首次观察到的进程，使用其生命周期内的平均CPU使用率
+            lifetime = time.time() - self.create_time
+            self.cpu_percent = round(cpu_time / lifetime * 100, 1) if lifetime > 0 else 0.0
+        else:
+            if cpu_time < self.cpu_time:
+                return False
+            elapsed = now - self.sampled_at
+            if elapsed > 0:
+                self.cpu_percent = round((cpu_time - self.cpu_time) / elapsed * 100, 1)
+
+        self.cpu_time = cpu_time
+        self.sampled_at = now
+        self.memory_percent = self.rss / memory_total * 100 if memory_total else 0.0
+        return True
+
+    def to_dict(self) -> Dict:
+        """转换为进程信息字典"""
+        return {
+            'pid': self.pid,
+            'name': self.name,
+            'status': self.status,
+            'cpu_percent': self.cpu_percent,
+            'memory_percent': self.memory_percent,
+            'create_time': self.create_time,
+            'rss': self.rss,
+            'num_threads': self.num_threads,
+            'num_fds': self.num_fds
+        }
+
+
+class ProcessTable:
+    """进程表缓存
+
+    以 ``(pid, create_time)`` 标识进程，进程句柄在采集周期之间保留，
+    已退出的进程在下一次刷新时淘汰。进程名称和创建时间只在首次发现时读取。
+    刷新时在同一次遍历中用有界堆维护各排序字段的前N个进程，
+    只为最终入选的进程生成字典。
+    """
+
+    # 支持排序的字段
+    RANK_KEYS = ('memory_percent', 'cpu_percent', 'rss', 'num_threads', 'num_fds')
+    DEFAULT_RANK_KEY = 'memory_percent'
+
+    def __init__(self, rank_keys: Optional[List[str]] = None, top_n: Optional[int] = None):
+        """初始化进程表"""
+        self._lock = threading.Lock()
+        self._entries: Dict[int, ProcessEntry] = {}
+        self.rank_keys = [key for key in (rank_keys or Config.PROCESS_RANK_KEYS) if key in self.RANK_KEYS]
+        # 内存占用率排行是默认排序，始终维护
+        if self.DEFAULT_RANK_KEY not in self.rank_keys:
+            self.rank_keys.insert(0, self.DEFAULT_RANK_KEY)
+        self.top_n = top_n or Config.PROCESS_TOP_N
+        self._rankings: Dict[str, List[Dict]] = {}
+        self._ranked_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def refresh(self) -> Dict[str, List[Dict]]:
+        """
+        刷新进程表并计算各字段的排行
+
+        Returns:
+            Dict[str, List[Dict]]: 排序字段到前N个进程信息列表的映射（降序）
+        """
+        with self._lock:
+            now = time.monotonic()
+            memory_total = psutil.virtual_memory().total
+            pids = psutil.pids()
+
+            # 淘汰已退出的进程
+            alive = set(pids)
+            for pid in [pid for pid in self._entries if pid not in alive]:
+                del self._entries[pid]
+
+            heaps: Dict[str, List[Tuple[float, int, ProcessEntry]]] = {key: [] for key in self.rank_keys}
+            for pid in pids:
+                entry = self._entries.get(pid)
+                if entry is None:
+                    entry = self._create_entry(pid)
+                    if entry is None:
+                        continue
+
+                try:
+                    if not entry.update(now, memory_total):
+                        # PID已被新进程复用（创建时间不同），重新建立缓存条目
+                        entry = self._create_entry(pid)
+                        if entry is None or not entry.update(now, memory_total):
+                            self._entries.pop(pid, None)
+                            continue
+                except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                    self._entries.pop(pid, None)
+                    continue
+                except psutil.AccessDenied:
+                    # 无权限读取的进程保留句柄，本次不参与统计
+                    continue
+
+                # 有界小顶堆：堆满后只有超过堆顶的进程才会替换进入
+                for key, heap in heaps.items():
+                    item = (getattr(entry, key), pid, entry)
+                    if len(heap) < self.top_n:
+                        heapq.heappush(heap, item)
+                    elif item[:2] > heap[0][:2]:
+                        heapq.heapreplace(heap, item)
+
+            # 同一进程在多个排行中共享同一个字典
+            dicts: Dict[int, Dict] = {}
+            rankings = {}
+            for key, heap in heaps.items():
+                heap.sort(key=lambda item: item[:2], reverse=True)
+                ranking = []
+                for _, pid, entry in heap:
+                    if pid not in dicts:
+                        dicts[pid] = entry.to_dict()
+                    ranking.append(dicts[pid])
+                rankings[key] = ranking
+
+            self._rankings = rankings
+            self._ranked_at = get_current_local_time()
+            return rankings
+
+    def get_rankings(self) -> Tuple[Dict[str, List[Dict]], Optional[datetime]]:
+        """
+        获取最近一次刷新的排行结果
+
+        Returns:
+            Tuple[Dict[str, List[Dict]], Optional[datetime]]: 排行结果和排行时间
+        """
+        return self._rankings, self._ranked_at
+
+    def _create_entry(self, pid: int) -> Optional[ProcessEntry]:
+        """为新发现的进程建立缓存条目"""
+        try:
+            process = psutil.Process(pid)
+            with process.oneshot():
+                entry = ProcessEntry(process, process.create_time(), process.name())
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return None
+        except psutil.AccessDenied:
+            logger.debug(f"无权限读取进程 {pid} 的基本信息")
+            return None
+
+        self._entries[pid] = entry
+        return entry
+
+
+# 全局进程表实例，在采集周期之间保留进程句柄
+process_table = ProcessTable()
@@ -0,0 +1,248 @@
+# app/monitoring/ring_buffer.py
+"""最近一段时间采集数据的环形缓冲区（供最近时间范围的趋势接口直接读取）"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+from app.config.config import Config
+from app.monitoring.snapshot import CollectionSnapshot
+from app.utils.helpers import arrays_to_points, downsample_arrays, get_current_local_time
+
+
+class RingBuffer:
+    """定长的环形缓冲区
+
+    时间戳和各字段保存在预先分配的NumPy数组中，追加时覆盖最旧的数据，不分配新的对象；
+    读取时间范围时在两段有序数组上二分查找后切片复制。
+    """
+
+    def __init__(self, capacity: int, fields: Sequence[str]):
+        """
+        初始化环形缓冲区
+
+        Args:
+            capacity: 最多保存的样本数
+            fields: 数值字段
+        """
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self._timestamps = np.zeros(capacity, dtype='datetime64[us]')
+        self._values = np.full((len(self.fields), capacity), np.nan)
+        # 下一次写入的位置和已保存的样本数
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self) -> None:
+        """丢弃所有样本"""
+        self._next = 0
+        self._size = 0
+
+    def append(self, timestamp: datetime, values: Dict) -> None:
+        """追加一个样本（缺失的字段记为NaN）"""
+        index = self._next
+        self._timestamps[index] = np.datetime64(timestamp, 'us')
+        for row, field in enumerate(self.fields):
+            value = values.get(field)
+            self._values[row, index] = np.nan if value is None else value
+        self._next = (index + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def oldest(self) -> Optional[datetime]:
+        """最早的样本时间"""
+        if not self._size:
+            return None
+        return self._timestamps[self._next if self.is_full() else 0].astype(datetime)
+
+    def newest(self) -> Optional[datetime]:
+        """最近的样本时间"""
+        if not self._size:
+            return None
+        return self._timestamps[self._next - 1].astype(datetime)
+
+    def is_full(self) -> bool:
+        """是否已经开始覆盖最旧的数据"""
+        return self._size == self.capacity
+
+    def window(self, start: datetime, end: datetime, fields: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        时间范围 [start, end] 内的样本
+
+        Returns:
+            Dict[str, np.ndarray]: timestamp（datetime64[us]）和各字段的数组（复制，不受之后的追加影响）
+        """
+        if self.is_full():
+            # 按时间顺序的两段：[next, capacity) 和 [0, next)
+            segments = [(self._next, self.capacity), (0, self._next)]
+        else:
+            segments = [(0, self._size)]
+        lower, upper = np.datetime64(start, 'us'), np.datetime64(end, 'us')
+        ranges = []
+        for first, last in segments:
+            timestamps = self._timestamps[first:last]
+            lo = first + int(np.searchsorted(timestamps, lower, side='left'))
+            hi = first + int(np.searchsorted(timestamps, upper, side='right'))
+            if hi > lo:
+                ranges.append((lo, hi))
+
+        ranges = ranges or [(0, 0)]
+        result = {'timestamp': np.concatenate([self._timestamps[lo:hi] for lo, hi in ranges])}
+        for field in fields:
+            row = self.fields.index(field)
+            result[field] = np.concatenate([self._values[row, lo:hi] for lo, hi in ranges])
+        return result
+
+
+class RecentMetrics:
+    """最近采集数据的缓冲
+
+    系统信息（CPU、内存、平均负载）一个环形缓冲区，每个磁盘设备一个环形缓冲区，由调度器在每次采集后追加，
+    容量按 ``RECENT_BUFFER_SECONDS`` 和采集间隔计算。趋势接口请求的时间范围完全落在缓冲区内时直接切片降采样，
+    不查询存储引擎；否则返回None，由调用方回退到存储引擎查询。
+
+    启动时通过 ``warm`` 从存储引擎读取最近一段时间的数据，之后每次采集都会追加，
+    因此缓冲区自开始记录的时刻（或被覆盖后最早的样本时间）起的数据与存储引擎一致。
+    """
+
+    SYSTEM_FIELDS = ('cpu_percent', 'memory_percent', 'load_avg_1', 'load_avg_5', 'load_avg_15')
+    DISK_FIELDS = ('percent',)
+
+    def __init__(self, seconds: Optional[float] = None, interval: Optional[float] = None):
+        """
+        初始化最近数据缓冲
+
+        Args:
+            seconds: 缓冲区覆盖的时间长度（秒）
+            interval: 采集间隔（秒）
+        """
+        self.seconds = seconds or Config.RECENT_BUFFER_SECONDS
+        interval = interval or Config.COLLECT_SYSTEM_DATA_INTERVAL
+        # 采集时间有抖动，留出余量保证缓冲区始终覆盖完整的时间长度
+        self.capacity = int(self.seconds / interval * 1.25) + 2
+        self._lock = threading.Lock()
+        self._system = RingBuffer(self.capacity, self.SYSTEM_FIELDS)
+        self._disks: Dict[str, RingBuffer] = {}
+        # 从该时刻起的每次采集都已追加到缓冲区
+        self._since: Optional[datetime] = None
+
+    def warm(self, db_manager) -> None:
+        """从存储引擎读取最近 ``seconds`` 秒的原始数据（在调度器开始采集之前调用）"""
+        now = get_current_local_time()
+        since = now - timedelta(seconds=self.seconds)
+        try:
+            storage = db_manager.storage
+            system = storage.range('system', self.SYSTEM_FIELDS, since, now, 0)
+            disks = storage.range('disk', self.DISK_FIELDS, since, now, 0)
+        except Exception as e:
+            logger.error(f"从存储引擎加载最近数据失败，趋势接口暂时查询存储引擎: {e}")
+            return
+
+        with self._lock:
+            self._system.clear()
+            self._disks.clear()
+            self._load(self._system, system, self.SYSTEM_FIELDS)
+            for device, arrays in disks.items():
+                self._load(self._disk_buffer(device), arrays, self.DISK_FIELDS)
+            self._since = since
+        disk_count = sum(len(arrays['timestamp']) for arrays in disks.values())
+        logger.info(f"最近数据缓冲已加载，系统信息 {len(system['timestamp'])} 条，磁盘信息 {disk_count} 条")
+
+    @staticmethod
+    def _load(buffer: RingBuffer, arrays: Dict[str, np.ndarray], fields: Sequence[str]) -> None:
+        """把按时间升序的列数组逐个样本追加到环形缓冲区"""
+        for index, timestamp in enumerate(arrays['timestamp']):
+            buffer.append(timestamp, {field: arrays[field][index] for field in fields})
+
+    def append(self, snapshot: CollectionSnapshot) -> None:
+        """追加一次采集的系统信息和磁盘使用率（缺失的阶段不追加）"""
+        timestamp = snapshot.timestamp
+        with self._lock:
+            newest = self._system.newest()
+            if self._since is None or (newest is not None and timestamp < newest):
+                # 首次追加或系统时间回退：从本次采集开始重新记录
+                self._system.clear()
+                self._disks.clear()
+                self._since = timestamp
+            if snapshot.system_info is not None:
+                load_average = snapshot.system_info.get('load_average') or (None, None, None)
+                self._system.append(timestamp, {
+                    'cpu_percent': snapshot.system_info.get('cpu_percent'),
+                    'memory_percent': snapshot.system_info.get('memory_percent'),
+                    'load_avg_1': load_average[0],
+                    'load_avg_5': load_average[1],
+                    'load_avg_15': load_average[2]
+                })
+            for disk in snapshot.disk_info or ():
+                self._disk_buffer(disk.get('device')).append(timestamp, disk)
+
+    def system_series(
+        self,
+        fields: Sequence[str],
+        start: datetime,
+        end: datetime,
+        points: int
+    ) -> Optional[List[Dict]]:
+        """
+        系统信息的时间序列
+
+        Returns:
+            Optional[List[Dict]]: 与 ``StorageEngine.range`` 的结果经 ``arrays_to_points`` 转换后的格式相同；
+                缓冲区不能覆盖该时间范围时返回None
+        """
+        with self._lock:
+            if not self._covers(start, self._system):
+                return None
+            arrays = self._system.window(start, end, fields)
+        return arrays_to_points(downsample_arrays(arrays, fields, start, end, points), fields)
+
+    def disk_series(
+        self,
+        start: datetime,
+        end: datetime,
+        points: int,
+        device: Optional[str] = None
+    ) -> Optional[Dict[str, List[Dict]]]:
+        """
+        各磁盘使用率的时间序列
+
+        Returns:
+            Optional[Dict[str, List[Dict]]]: 与 ``StorageEngine.range`` 的结果经 ``arrays_to_points`` 转换后的格式相同；
+                缓冲区不能覆盖该时间范围时返回None
+        """
+        with self._lock:
+            buffers = {
+                name: buffer for name, buffer in self._disks.items()
+                if device is None or name == device
+            }
+            if not self._covers(start, *buffers.values()):
+                return None
+            windows = {name: buffer.window(start, end, self.DISK_FIELDS) for name, buffer in buffers.items()}
+        return {
+            name: arrays_to_points(downsample_arrays(arrays, self.DISK_FIELDS, start, end, points), self.DISK_FIELDS)
+            for name, arrays in windows.items()
+            if len(arrays['timestamp'])
+        }
+
+    def _covers(self, start: datetime, *buffers: RingBuffer) -> bool:
+        """各缓冲区是否都包含start之后的全部样本"""
+        if self._since is None or self._since > start:
+            return False
+        # 已覆盖旧数据时，最早的样本之前的数据不在缓冲区中
+        return all(not buffer.is_full() or buffer.oldest() <= start for buffer in buffers)
+
+    def _disk_buffer(self, device: str) -> RingBuffer:
+        """磁盘设备的环形缓冲区，首次出现时创建"""
+        buffer = self._disks.get(device)
+        if buffer is None:
+            buffer = self._disks[device] = RingBuffer(self.capacity, self.DISK_FIELDS)
+        return buffer
+
+
+# 全局最近数据缓冲实例
+recent_metrics = RecentMetrics()
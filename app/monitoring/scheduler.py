@@ -1,12 +1,20 @@
 # app/monitoring/scheduler.py
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.events import EVENT_JOB_SUBMITTED
 from loguru import logger
 
-from app.monitoring.collector import SystemCollector
+from app.monitoring.pipeline import CollectionPipeline
+from app.monitoring.collection_stats import collection_stats
+from app.monitoring.latest_snapshot import latest_snapshot
+from app.monitoring.ring_buffer import recent_metrics
 from app.monitoring.thresholds import ThresholdChecker
+from app.monitoring.version_registry import version_registry
 from app.database.database_manager import DatabaseManager
+from app.database.retention import retention_manager
+from app.database.write_buffer import write_buffer
 from app.config.config import Config
+from app.utils.helpers import get_current_local_time
 
 class MonitoringScheduler:
     """监控调度器"""
@@ -16,11 +24,13 @@ class MonitoringScheduler:
         # 配置调度器使用本地时区
         self.scheduler = BackgroundScheduler(
             executors={'default': ThreadPoolExecutor(20)},
-            job_defaults={'coalesce': False, 'max_instances': 3},
+            # 同一任务最多只有一个实例在执行，积压的周期合并为一次
+            job_defaults={'coalesce': True, 'max_instances': 1},
             timezone=Config.LOCAL_TIMEZONE  # 使用配置中的本地时区
         )
         self.db_manager = DatabaseManager(Config.SQLALCHEMY_DATABASE_URI)
         self.threshold_checker = ThresholdChecker(self.db_manager)
+        self.pipeline = CollectionPipeline()
         self.logger = logger
     
     def start(self) -> None:
@@ -30,14 +40,9 @@ class MonitoringScheduler:
             self.collect_system_data,
             'interval',
             seconds=Config.COLLECT_SYSTEM_DATA_INTERVAL,  # 收集系统数据的时间间隔
-            id='collect_system_data'
-        )
-        
-        self.scheduler.add_job(
-            self.check_thresholds,
-            'interval',
-            seconds=Config.CHECK_THRESHOLDS_INTERVAL,  # 检查阈值的时间间隔
-            id='check_thresholds'
+            id='collect_system_data',
+            # 延迟不超过一个周期时仍然执行，否则跳过并计入统计
+            misfire_grace_time=Config.COLLECT_SYSTEM_DATA_INTERVAL
         )
         
         self.scheduler.add_job(
@@ -48,45 +53,82 @@ class MonitoringScheduler:
             timezone=Config.LOCAL_TIMEZONE  # 使用配置中的本地时区
         )
         
+        # 启动时立即探测一次应用程序版本，之后按TTL在后台刷新
+        self.scheduler.add_job(
+            version_registry.refresh,
+            'interval',
+            seconds=Config.VERSION_PROBE_TTL,  # 版本信息的刷新间隔
+            id='refresh_application_versions',
+            next_run_time=get_current_local_time()
+        )
+        
+        # 分批清理超过保留期限的数据
+        self.scheduler.add_job(
+            retention_manager.run,
+            'interval',
+            seconds=Config.RETENTION_INTERVAL,  # 过期数据清理的时间间隔
+            id='prune_expired_data'
+        )
+        
+        # 整理存储引擎中的数据（SQL：把较早的系统和磁盘数据压缩为按天的列式归档；分段文件：汇总和清理分段）
+        self.scheduler.add_job(
+            self.db_manager.storage.compact,
+            'interval',
+            seconds=Config.ARCHIVE_INTERVAL,  # 数据归档的时间间隔
+            id='compact_archive'
+        )
+        
+        self.scheduler.add_listener(self._on_job_submitted, EVENT_JOB_SUBMITTED)
+        
+        # 先启动写入线程，采集的快照由它写入数据库
+        write_buffer.start()
+        self.threshold_checker.start()
+        # 加载最近一段时间的数据，之后每次采集追加到内存中的环形缓冲区
+        recent_metrics.warm(self.db_manager)
         self.scheduler.start()
         self.logger.info("监控调度器已启动")
     
     def shutdown(self) -> None:
         """关闭调度器"""
         self.scheduler.shutdown()
+        self.pipeline.shutdown()
+        self.threshold_checker.stop()
+        write_buffer.stop()
         self.logger.info("监控调度器已关闭")
     
+    def _on_job_submitted(self, event) -> None:
+        """记录采集任务的计划开始时间"""
+        if event.job_id == 'collect_system_data':
+            collection_stats.on_submitted(event.scheduled_run_times)
+    
     def collect_system_data(self) -> None:
-        """收集系统数据并保存到数据库"""
+        """收集系统数据并提交到写入缓冲（同一时间只执行一次采集，不等待数据库写入）"""
+        if not collection_stats.start():
+            self.logger.warning("上一次系统数据收集尚未完成，跳过本次收集")
+            return
+        
+        snapshot = None
+        success = False
         try:
             self.logger.info("开始收集系统数据")
             
-            # 收集系统信息
-            system_info = SystemCollector.get_system_info()
-            
-            # 收集磁盘信息
-            disk_info = SystemCollector.get_disk_info()
+            # 并发执行各采集阶段，得到本次采集的快照
+            snapshot = self.pipeline.collect()
             
-            # 收集进程信息
-            process_info = SystemCollector.get_process_info()
+            # 用本次采集的样本检查资源阈值
+            self.threshold_checker.check_system_thresholds(snapshot.system_info, snapshot.disk_info)
             
-            # 保存到数据库
-            self.db_manager.save_system_info(system_info)
-            self.db_manager.save_disk_info(disk_info)
-            self.db_manager.save_process_info(process_info)
+            # 发布最新数据，追加到最近数据的环形缓冲区，并放入写入缓冲，由写入线程批量保存到数据库
+            latest_snapshot.publish(snapshot)
+            recent_metrics.append(snapshot)
+            write_buffer.submit(snapshot)
             
+            success = True
             self.logger.info("系统数据收集完成")
         except Exception as e:
             self.logger.error(f"收集系统数据时出错: {e}")
-    
-    def check_thresholds(self) -> None:
-        """检查资源使用阈值"""
-        try:
-            self.logger.info("开始检查资源阈值")
-            self.threshold_checker.check_system_thresholds()
-            self.logger.info("资源阈值检查完成")
-        except Exception as e:
-            self.logger.error(f"检查资源阈值时出错: {e}")
+        finally:
+            collection_stats.finish(success, list(snapshot.gaps) if snapshot is not None else None)
     
     def generate_weekly_report(self) -> None:
         """生成周报并发送邮件"""
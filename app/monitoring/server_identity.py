@@ -0,0 +1,110 @@
+# app/monitoring/server_identity.py
+"""服务器身份（主网卡IP地址）解析"""
+
+import fnmatch
+import ipaddress
+import os
+import socket
+import threading
+from typing import Dict, List, Optional
+
+import psutil
+from loguru import logger
+
+from app.config.config import Config
+from app.monitoring.host_facts import host_facts
+
+
+class ServerIdentity:
+    """服务器身份
+
+    根据本机网卡地址解析一次主IP地址并缓存，网卡地址变化时重新解析。
+    解析过程只读取本机网卡信息和路由表，不进行任何网络I/O；
+    配置了 ``SERVER_IP`` 时直接使用配置值。
+    """
+
+    # 虚拟网桥等网卡，只有在没有其他可用地址时才使用
+    VIRTUAL_INTERFACES = ('docker*', 'br-*', 'virbr*', 'cni*', 'flannel*', 'cali*', 'tun*', 'tap*')
+
+    DEFAULT_IP = "127.0.0.1"
+
+    def __init__(self, override: Optional[str] = None):
+        """
+        初始化服务器身份
+
+        Args:
+            override: 显式指定的服务器IP地址，默认读取 ``SERVER_IP`` 配置
+        """
+        self.override = Config.SERVER_IP if override is None else override
+        self._ip: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def get_ip(self) -> str:
+        """获取服务器主IP地址（读取缓存）"""
+        if self.override:
+            return self.override
+        if self._ip is None:
+            with self._lock:
+                if self._ip is None:
+                    self._ip = self._resolve(psutil.net_if_addrs())
+        return self._ip
+
+    def on_interfaces_changed(self, net_if_addrs: Dict) -> None:
+        """网卡地址变化时重新解析"""
+        ip = self._resolve(net_if_addrs)
+        if ip != self._ip:
+            logger.info(f"服务器主IP地址已更新: {self._ip} -> {ip}")
+        self._ip = ip
+
+    def _resolve(self, net_if_addrs: Dict) -> str:
+        """从网卡地址中选择主IP地址：默认路由网卡优先，虚拟网桥最后"""
+        try:
+            stats = psutil.net_if_stats()
+        except Exception:
+            stats = {}
+        default_interfaces = self._default_route_interfaces()
+
+        candidates = []
+        for interface, addresses in net_if_addrs.items():
+            if interface in stats and not stats[interface].isup:
+                continue
+            if any(fnmatch.fnmatchcase(interface, pattern) for pattern in Config.NET_EXCLUDE_INTERFACES):
+                continue
+            for addr in addresses:
+                if addr.family != socket.AF_INET:
+                    continue
+                try:
+                    ip = ipaddress.ip_address(addr.address)
+                except ValueError:
+                    continue
+                if ip.is_loopback or ip.is_link_local:
+                    continue
+                priority = (
+                    interface not in default_interfaces,
+                    any(fnmatch.fnmatchcase(interface, pattern) for pattern in self.VIRTUAL_INTERFACES)
+                )
+                candidates.append((priority, len(candidates), addr.address))
+
+        if not candidates:
+            return self.DEFAULT_IP
+        return min(candidates)[2]
+
+    @staticmethod
+    def _default_route_interfaces() -> List[str]:
+        """读取Linux路由表中默认路由所在的网卡（其他平台返回空列表）"""
+        interfaces = []
+        try:
+            with open(os.path.join(Config.PROC_ROOT, 'net', 'route')) as f:
+                next(f, None)
+                for line in f:
+                    fields = line.split()
+                    if len(fields) > 1 and fields[1] == '00000000':
+                        interfaces.append(fields[0])
+        except OSError:
+            pass
+        return interfaces
+
+
+# 全局服务器身份实例，网卡地址变化时自动重新解析
+server_identity = ServerIdentity()
+host_facts.add_interface_listener(server_identity.on_interfaces_changed)
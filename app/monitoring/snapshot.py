@@ -0,0 +1,139 @@
+# app/monitoring/snapshot.py
+"""一次采集的结果快照"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class CollectionSnapshot:
+    """采集快照
+
+    保存一次采集中各阶段的结果。超时、出错或被跳过的阶段记录在 ``gaps`` 中，
+    对应的数据为None，存储时跳过，在时间序列中表现为缺口。
+    """
+
+    def __init__(self, timestamp: datetime):
+        """
+        初始化快照
+
+        Args:
+            timestamp: 本次采集的时间（本地时间）
+        """
+        self.timestamp = timestamp
+        self.system_info: Optional[Dict] = None
+        self.disk_info: Optional[List[Dict]] = None
+        self.process_info: Optional[List[Dict]] = None
+        self.disk_io_info: Optional[List[Dict]] = None
+        self.network_info: Optional[List[Dict]] = None
+        # 阶段名称到缺口原因的映射
+        self.gaps: Dict[str, str] = {}
+        # 各阶段的耗时（秒）
+        self.durations: Dict[str, float] = {}
+
+    def is_complete(self) -> bool:
+        """所有阶段是否都已完成"""
+        return not self.gaps
+
+    def series_rows(self) -> Dict[str, List[Dict]]:
+        """
+        各数值序列待保存的记录（缺失的阶段跳过）
+        
+        Returns:
+            Dict[str, List[Dict]]: 序列名（system、disk、disk_io、network）到记录列表的映射，
+                每条记录使用本次采集的时间作为时间戳
+        """
+        timestamp = self.timestamp
+        rows = {}
+        if self.system_info is not None:
+            rows['system'] = [self.system_row(self.system_info, timestamp)]
+        if self.disk_info:
+            rows['disk'] = [self.disk_row(disk, timestamp) for disk in self.disk_info]
+        if self.disk_io_info:
+            rows['disk_io'] = [self.disk_io_row(io, timestamp) for io in self.disk_io_info]
+        if self.network_info:
+            rows['network'] = [self.network_row(nic, timestamp) for nic in self.network_info]
+        return rows
+
+    @staticmethod
+    def system_row(system_info: Dict, timestamp: datetime) -> Dict:
+        """系统信息记录（平均负载拆分为1、5、15分钟三列）"""
+        load_average = system_info.get('load_average') or (None, None, None)
+        return {
+            'timestamp': timestamp,
+            'cpu_percent': system_info.get('cpu_percent'),
+            'memory_percent': system_info.get('memory_percent'),
+            'disk_percent': system_info.get('disk_percent', 0),
+            'uptime': system_info.get('boot_time'),
+            'load_avg_1': load_average[0],
+            'load_avg_5': load_average[1],
+            'load_avg_15': load_average[2]
+        }
+
+    @staticmethod
+    def disk_row(disk: Dict, timestamp: datetime) -> Dict:
+        """磁盘信息记录"""
+        return {
+            'timestamp': timestamp,
+            'device': disk.get('device'),
+            'mountpoint': disk.get('mountpoint'),
+            'total': disk.get('total'),
+            'used': disk.get('used'),
+            'free': disk.get('free'),
+            'percent': disk.get('percent')
+        }
+
+    @staticmethod
+    def disk_io_row(io: Dict, timestamp: datetime) -> Dict:
+        """磁盘I/O信息记录"""
+        return {
+            'timestamp': timestamp,
+            'device': io.get('device'),
+            'read_bytes_per_sec': io.get('read_bytes_per_sec'),
+            'write_bytes_per_sec': io.get('write_bytes_per_sec'),
+            'read_iops': io.get('read_iops'),
+            'write_iops': io.get('write_iops'),
+            'await_ms': io.get('await_ms'),
+            'util_percent': io.get('util_percent')
+        }
+
+    @staticmethod
+    def network_row(nic: Dict, timestamp: datetime) -> Dict:
+        """网络流量信息记录"""
+        return {
+            'timestamp': timestamp,
+            'interface': nic.get('interface'),
+            'bytes_sent_per_sec': nic.get('bytes_sent_per_sec'),
+            'bytes_recv_per_sec': nic.get('bytes_recv_per_sec'),
+            'packets_sent_per_sec': nic.get('packets_sent_per_sec'),
+            'packets_recv_per_sec': nic.get('packets_recv_per_sec'),
+            'errin_per_sec': nic.get('errin_per_sec'),
+            'errout_per_sec': nic.get('errout_per_sec'),
+            'dropin_per_sec': nic.get('dropin_per_sec'),
+            'dropout_per_sec': nic.get('dropout_per_sec')
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CollectionSnapshot':
+        """从 ``to_dict`` 的结果还原快照"""
+        snapshot = cls(datetime.fromisoformat(data['timestamp']))
+        snapshot.system_info = data.get('system_info')
+        snapshot.disk_info = data.get('disk_info')
+        snapshot.process_info = data.get('process_info')
+        snapshot.disk_io_info = data.get('disk_io_info')
+        snapshot.network_info = data.get('network_info')
+        snapshot.gaps = data.get('gaps') or {}
+        snapshot.durations = data.get('durations') or {}
+        return snapshot
+
+    def to_dict(self) -> Dict:
+        """转换为字典"""
+        return {
+            'timestamp': self.timestamp.isoformat(),
+            'system_info': self.system_info,
+            'disk_info': self.disk_info,
+            'process_info': self.process_info,
+            'disk_io_info': self.disk_io_info,
+            'network_info': self.network_info,
+            'gaps': self.gaps,
+            'durations': self.durations
+        }
@@ -1,48 +1,126 @@
 # app/monitoring/thresholds.py
-from typing import Dict, List
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 from loguru import logger
 
 from app.config.config import Config
 from app.database.database_manager import DatabaseManager
-from app.monitoring.collector import SystemCollector
 
 
 class ThresholdChecker:
-    """阈值检查器"""
+    """阈值检查器
+
+    由调度器在每次采集后直接检查已经采集到的样本，不再单独采集一次系统数据。
+    每条规则（内存、各个磁盘）分别记录是否处于超限状态：刚进入超限时立即告警，
+    持续超限时每隔 ``CHECK_THRESHOLDS_INTERVAL`` 秒重复告警一次，恢复正常后重置。
+    保存预警记录和发送通知由单独的线程完成，采集线程只把预警放入队列。
+    """
+    
+    # 发送钉钉消息的超时时间（秒）
+    DINGTALK_TIMEOUT = 5
+    # 等待保存和发送的预警数上限，超出时丢弃新的预警
+    ALERT_QUEUE_SIZE = 100
     
     def __init__(self, db_manager: DatabaseManager):
         """初始化阈值检查器"""
         self.db_manager = db_manager
         self.logger = logger
+        self._lock = threading.Lock()
+        # 处于超限状态的规则及其最近一次告警的时间（单调时钟）
+        self._breaches: Dict[str, float] = {}
+        self._alerts: queue.Queue = queue.Queue(maxsize=self.ALERT_QUEUE_SIZE)
+        self._worker: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """启动预警发送线程"""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name='alert-sender', daemon=True)
+            self._worker.start()
     
-    def check_system_thresholds(self) -> None:
-        """检查系统资源阈值"""
+    def stop(self, timeout: float = 10) -> None:
+        """处理完队列中的预警后停止发送线程"""
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            self._alerts.put(None)
+            worker.join(timeout)
+    
+    def _run(self) -> None:
+        """预警发送线程：保存预警记录并发送通知"""
+        while True:
+            alert: Optional[Tuple[str, str]] = self._alerts.get()
+            if alert is None:
+                return
+            alert_type, message = alert
+            try:
+                self.db_manager.save_alert_record(alert_type, message)
+                self.send_alert(alert_type, message)
+            except Exception as e:
+                self.logger.error(f"处理预警时出错: {e}")
+    
+    def check_system_thresholds(self, system_info: Optional[Dict], disk_info: Optional[List[Dict]]) -> None:
+        """
+        检查系统资源阈值
+        
+        Args:
+            system_info: 本次采集的系统信息，采集缺失时为None
+            disk_info: 本次采集的磁盘信息，采集缺失时为None
+        """
         try:
-            self.logger.info("开始检查系统资源阈值")
-            
-            # 获取最新的系统信息
-            system_info = SystemCollector.get_system_info()
-            disk_info = SystemCollector.get_disk_info()
+            now = time.monotonic()
+            # 本次没有数据的规则保持原有状态；磁盘采集出错时可能返回空列表，同样视为没有数据
+            with self._lock:
+                active = {
+                    key for key in self._breaches
+                    if (system_info is None and key == 'memory') or (not disk_info and key.startswith('disk:'))
+                }
             
             # 检查内存使用率
-            memory_percent = system_info.get('memory_percent', 0)
+            memory_percent = (system_info or {}).get('memory_percent', 0)
             if memory_percent > Config.MEMORY_THRESHOLD:
-                message = f"内存使用率过高: {memory_percent}%"
-                self.db_manager.save_alert_record("memory", message)
-                self.send_alert("memory", message)
+                active.add('memory')
+                self._evaluate('memory', 'memory', f"内存使用率过高: {memory_percent}%", now)
             
             # 检查磁盘使用率
-            for disk in disk_info:
+            for disk in disk_info or []:
                 disk_percent = disk.get('percent', 0)
                 if disk_percent > Config.DISK_THRESHOLD:
-                    message = f"磁盘 {disk['device']} 使用率过高: {disk_percent}%"
-                    self.db_manager.save_alert_record("disk", message)
-                    self.send_alert("disk", message)
+                    key = f"disk:{disk['device']}"
+                    active.add(key)
+                    self._evaluate(key, 'disk', f"磁盘 {disk['device']} 使用率过高: {disk_percent}%", now)
             
-            self.logger.info("系统资源阈值检查完成")
+            self._reset_recovered(active)
         except Exception as e:
             self.logger.error(f"检查系统资源阈值时出错: {e}")
     
+    def _evaluate(self, key: str, alert_type: str, message: str, now: float) -> None:
+        """处理超限的规则：刚进入超限或距上次告警超过重复间隔时告警"""
+        with self._lock:
+            last_alert: Optional[float] = self._breaches.get(key)
+            if last_alert is not None and now - last_alert < Config.CHECK_THRESHOLDS_INTERVAL:
+                return
+            self._breaches[key] = now
+        
+        self.logger.warning(message)
+        self.start()
+        try:
+            self._alerts.put_nowait((alert_type, message))
+        except queue.Full:
+            self.logger.error(f"预警队列已满，丢弃预警: {message}")
+    
+    def _reset_recovered(self, active) -> None:
+        """已恢复正常的规则退出超限状态，下次超限时重新告警"""
+        with self._lock:
+            recovered = [key for key in self._breaches if key not in active]
+            for key in recovered:
+                del self._breaches[key]
+        for key in recovered:
+            self.logger.info(f"资源使用率已恢复正常: {key}")
+    
     def send_alert(self, alert_type: str, message: str) -> None:
         """发送预警消息"""
         # 这里可以实现多种预警方式，目前只实现钉钉预警
@@ -68,10 +146,10 @@ class ThresholdChecker:
                 }
             }
             
-            response = requests.post(Config.DINGTALK_WEBHOOK, json=payload)
+            response = requests.post(Config.DINGTALK_WEBHOOK, json=payload, timeout=self.DINGTALK_TIMEOUT)
             if response.status_code == 200:
                 self.logger.info("钉钉预警消息发送成功")
             else:
                 self.logger.error(f"钉钉预警消息发送失败: {response.text}")
         except Exception as e:
-            self.logger.error(f"发送钉钉预警消息时出错: {e}")
\ No newline at end of file
+            self.logger.error(f"发送钉钉预警消息时出错: {e}")
@@ -0,0 +1,120 @@
+# app/monitoring/version_registry.py
+"""应用程序版本注册表"""
+
+import platform
+import shlex
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from app.config.config import Config
+
+
+class VersionRegistry:
+    """应用程序版本注册表
+
+    启动时并发探测一次各工具的版本，之后由调度器按 ``VERSION_PROBE_TTL`` 在后台刷新。
+    接口读取时只返回内存中的结果，不会在请求线程中启动子进程。
+    """
+
+    # 内置的探测命令
+    BUILTIN_PROBES = {
+        'java': ['java', '-version'],
+        'docker': ['docker', '--version'],
+        'node': ['node', '--version'],
+        'nginx': ['nginx', '-v'],
+        'mysql': ['mysql', '--version'],
+        'redis': ['redis-server', '--version'],
+        'git': ['git', '--version'],
+    }
+
+    NOT_INSTALLED = "未安装"
+    PENDING = "检测中"
+
+    def __init__(self, tools: Optional[List[str]] = None, timeout: Optional[int] = None):
+        """
+        初始化注册表
+
+        Args:
+            tools: 需要探测的工具，可以是内置名称，也可以是 ``名称=命令`` 形式的自定义探测
+            timeout: 单个探测命令的超时时间（秒）
+        """
+        self.probes = self._parse_probes(Config.VERSION_PROBE_TOOLS if tools is None else tools)
+        self.timeout = timeout or Config.VERSION_PROBE_TIMEOUT
+        self._versions: Dict[str, str] = dict.fromkeys(self.probes, self.PENDING)
+        self._refresh_lock = threading.Lock()
+        self._started = False
+
+    @classmethod
+    def _parse_probes(cls, tools: List[str]) -> Dict[str, List[str]]:
+        """解析探测配置"""
+        probes = {}
+        for tool in tools:
+            name, separator, command = tool.partition('=')
+            name = name.strip()
+            if separator:
+                probes[name] = shlex.split(command)
+            elif name in cls.BUILTIN_PROBES:
+                probes[name] = cls.BUILTIN_PROBES[name]
+            else:
+                logger.warning(f"未知的版本探测工具: {name}，请使用 名称=命令 的形式配置")
+        return probes
+
+    def get_versions(self) -> Dict[str, str]:
+        """
+        获取应用程序版本信息（只读取内存中的结果）
+
+        Returns:
+            Dict[str, str]: 工具名称到版本信息的映射，包含Python版本
+        """
+        if not self._started:
+            # 没有通过调度器启动时（例如单独运行Web应用），在后台执行首次探测
+            self.start()
+
+        versions = {'python': platform.python_version()}
+        versions.update(self._versions)
+        return versions
+
+    def start(self) -> None:
+        """在后台线程中执行首次探测"""
+        if self._started:
+            return
+        self._started = True
+        threading.Thread(target=self.refresh, name='version-probe', daemon=True).start()
+
+    def refresh(self) -> None:
+        """并发执行所有探测命令并整体替换结果"""
+        if not self._refresh_lock.acquire(blocking=False):
+            # 上一次刷新尚未完成
+            return
+        try:
+            self._started = True
+            if not self.probes:
+                return
+            with ThreadPoolExecutor(max_workers=len(self.probes), thread_name_prefix='version-probe') as executor:
+                results = dict(zip(self.probes, executor.map(self._probe, self.probes.values())))
+            self._versions = results
+            logger.info("应用程序版本信息采集成功")
+        finally:
+            self._refresh_lock.release()
+
+    def _probe(self, command: List[str]) -> str:
+        """执行单个探测命令，返回输出的第一行"""
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=self.timeout)
+        except (subprocess.CalledProcessError, FileNotFoundError, PermissionError):
+            return self.NOT_INSTALLED
+        except subprocess.TimeoutExpired:
+            logger.warning(f"版本探测命令超时: {' '.join(command)}")
+            return "检测超时"
+
+        # 不同工具把版本信息输出到stdout或stderr（例如java -version）
+        output = (result.stdout or result.stderr).strip()
+        return output.splitlines()[0] if output else self.NOT_INSTALLED
+
+
+# 全局版本注册表实例
+version_registry = VersionRegistry()
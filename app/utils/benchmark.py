@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集与存储路径的性能基准测试
+
+用法: python -m app.utils.benchmark [proc_reader] [snapshot_writes] [archive_reads] [process_storage] [recent_trends] [latest_endpoints] [storage_engines] [--iterations N]
+"""
+
+import argparse
+import time
+from typing import Callable, Dict
+
+from loguru import logger
+
+
+def _measure(func: Callable, iterations: int) -> float:
+    """执行函数若干次，返回平均耗时（毫秒）"""
+    func()  # 预热，建立缓存和基准计数器
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def benchmark_proc_reader(iterations: int = 200) -> Dict[str, float]:
+    """对比/proc快速读取路径与psutil路径的单次采集耗时"""
+    from app.config.config import Config
+    from app.monitoring.collector import SystemCollector
+    from app.monitoring.proc_reader import ProcReader
+
+    if not ProcReader.is_supported(Config.PROC_ROOT):
+        print("当前平台不支持/proc快速读取路径，跳过")
+        return {}
+
+    reader = ProcReader(Config.PROC_ROOT)
+    try:
+        results = {
+            'psutil_system_info_ms': _measure(SystemCollector.read_system_info_psutil, iterations),
+            'proc_system_info_ms': _measure(reader.get_system_info, iterations),
+            'psutil_disk_info_ms': _measure(SystemCollector.read_disk_info_psutil, iterations),
+            'proc_disk_info_ms': _measure(reader.get_disk_info, iterations),
+        }
+    finally:
+        reader.close()
+
+    print(f"系统信息: psutil {results['psutil_system_info_ms']:.3f} ms, "
+          f"/proc {results['proc_system_info_ms']:.3f} ms "
+          f"({results['psutil_system_info_ms'] / results['proc_system_info_ms']:.1f}x)")
+    print(f"磁盘信息: psutil {results['psutil_disk_info_ms']:.3f} ms, "
+          f"/proc {results['proc_disk_info_ms']:.3f} ms "
+          f"({results['psutil_disk_info_ms'] / results['proc_disk_info_ms']:.1f}x)")
+    return results
+
+
+def _sample_snapshot(disks: int = 8, processes: int = 40):
+    """构造一个规模接近真实采集结果的快照"""
+    from app.monitoring.snapshot import CollectionSnapshot
+    from app.utils.helpers import get_current_local_time
+
+    snapshot = CollectionSnapshot(get_current_local_time())
+    snapshot.system_info = {
+        'cpu_percent': 12.5, 'memory_percent': 43.2, 'disk_percent': 55.0,
+        'boot_time': 1700000000.0, 'load_average': (0.5, 0.4, 0.3)
+    }
+    snapshot.disk_info = [
+        {'device': f'/dev/sd{chr(97 + i)}1', 'mountpoint': f'/data{i}', 'total': 1e12,
+         'used': 4e11, 'free': 6e11, 'percent': 40.0}
+        for i in range(disks)
+    ]
+    snapshot.process_info = [
+        {'pid': 1000 + i, 'name': f'worker-{i}', 'status': 'sleeping', 'cpu_percent': 1.5,
+         'memory_percent': 0.8, 'create_time': 1700000000.0 + i}
+        for i in range(processes)
+    ]
+    return snapshot
+
+
+def benchmark_snapshot_writes(iterations: int = 200) -> Dict[str, float]:
+    """对比逐表逐行ORM写入与单事务批量写入一次采集快照的吞吐量（SQLite文件库）"""
+    import os
+    import tempfile
+
+    from app.database.database_manager import DatabaseManager
+    from app.database.models import Base, DiskInfo, ProcessInfo, SystemInfo
+    from app.database.process_store import ProcessStore
+    from app.monitoring.snapshot import CollectionSnapshot
+    from app.utils.helpers import get_current_local_time
+
+    snapshot = _sample_snapshot()
+    rows = 1 + len(snapshot.disk_info) + len(snapshot.process_info)
+    # 独立的编码状态，不影响全局的process_store
+    store = ProcessStore()
+
+    def save_per_table():
+        # 对照组：每张表一个事务，逐行添加ORM对象
+        with db_manager.get_session() as session:
+            session.add(SystemInfo(**CollectionSnapshot.system_row(snapshot.system_info, get_current_local_time())))
+        with db_manager.get_session() as session:
+            for disk in snapshot.disk_info:
+                session.add(DiskInfo(
+                    device=disk.get('device'),
+                    mountpoint=disk.get('mountpoint'),
+                    total=disk.get('total'),
+                    used=disk.get('used'),
+                    free=disk.get('free'),
+                    percent=disk.get('percent')
+                ))
+        with db_manager.get_session() as session:
+            for row in store.encode(session.connection(), None, get_current_local_time(), snapshot.process_info):
+                session.add(ProcessInfo(**row))
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+        Base.metadata.create_all(db_manager.engine)
+        try:
+            per_table_ms = _measure(save_per_table, iterations)
+            snapshot_ms = _measure(lambda: db_manager.save_snapshot(snapshot), iterations)
+        finally:
+            db_manager.engine.dispose()
+
+    results = {
+        'per_table_ms': per_table_ms,
+        'snapshot_ms': snapshot_ms,
+        'per_table_rows_per_sec': rows / per_table_ms * 1000,
+        'snapshot_rows_per_sec': rows / snapshot_ms * 1000,
+    }
+    print(f"每次采集 {rows} 行: 逐表ORM写入 {per_table_ms:.3f} ms ({results['per_table_rows_per_sec']:.0f} 行/秒), "
+          f"单事务批量写入 {snapshot_ms:.3f} ms ({results['snapshot_rows_per_sec']:.0f} 行/秒) "
+          f"({per_table_ms / snapshot_ms:.1f}x)")
+    return results
+
+
+def benchmark_archive_reads(iterations: int = 200, days: int = 30) -> Dict[str, float]:
+    """对比ORM逐行读取与列式归档读取一段较长历史（每分钟一条系统信息）的耗时"""
+    import os
+    import tempfile
+    from datetime import timedelta
+
+    import numpy as np
+    from sqlalchemy import insert
+
+    from app.database.archive import ArchiveManager
+    from app.database.database_manager import DatabaseManager
+    from app.database.models import Base, SystemInfo
+    from app.utils.helpers import get_current_local_time
+
+    end = get_current_local_time().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=days)
+    rows = [
+        {'timestamp': start + timedelta(minutes=i), 'cpu_percent': float(i % 100), 'memory_percent': 50.0}
+        for i in range(days * 24 * 60)
+    ]
+    iterations = max(iterations // 20, 3)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+        Base.metadata.create_all(db_manager.engine)
+        try:
+            with db_manager.engine.begin() as connection:
+                connection.execute(insert(SystemInfo.__table__), rows)
+            archive = ArchiveManager(db_manager, directory=os.path.join(directory, 'archive'), after_days=0)
+            archive.compact()
+
+            def read_orm():
+                # 与原周报代码相同：查询ORM行后构造Python列表，再计算平均值
+                with db_manager.get_session() as session:
+                    records = session.query(SystemInfo.timestamp, SystemInfo.cpu_percent, SystemInfo.memory_percent)\
+                        .filter(SystemInfo.timestamp >= start, SystemInfo.timestamp < end)\
+                        .order_by(SystemInfo.timestamp).all()
+                    cpu = [record.cpu_percent for record in records]
+                    return sum(cpu) / len(cpu)
+
+            def read_archive():
+                arrays = archive.system_arrays(start, end)
+                return float(np.mean(arrays['cpu_percent']))
+
+            orm_ms = _measure(read_orm, iterations)
+            archive_ms = _measure(read_archive, iterations)
+        finally:
+            db_manager.engine.dispose()
+
+    results = {'orm_ms': orm_ms, 'archive_ms': archive_ms}
+    print(f"读取 {days} 天 {len(rows)} 条系统信息: ORM逐行 {orm_ms:.3f} ms, 列式归档 {archive_ms:.3f} ms "
+          f"({orm_ms / archive_ms:.1f}x)")
+    return results
+
+
+def _process_workload(ticks: int, population: int = 150, busy: int = 8, top_n: int = 20, seed: int = 7):
+    """模拟一台常规服务器上每次采集保存的进程排行（内存前N与CPU前N的并集，按内存降序）
+
+    内存占用率缓慢漂移；少数繁忙进程的CPU占用率在各自的基线附近抖动，
+    其余进程大多空闲，偶尔出现短暂的CPU尖峰。
+    """
+    import random
+
+    rng = random.Random(seed)
+    processes = [
+        {'pid': 1000 + i, 'name': f'service-{i % 60}', 'status': 'sleeping', 'create_time': 1700000000.0 + i,
+         'memory_percent': rng.lognormvariate(-1.5, 1.2), 'cpu_base': rng.uniform(5, 40) if i < busy else 0.0}
+        for i in range(population)
+    ]
+    for _ in range(ticks):
+        for proc in processes:
+            proc['memory_percent'] = max(proc['memory_percent'] + rng.gauss(0, 0.01), 0.0)
+            if proc['cpu_base']:
+                proc['cpu_percent'] = max(rng.gauss(proc['cpu_base'], 0.8), 0.0)
+            else:
+                proc['cpu_percent'] = rng.uniform(0.5, 15) if rng.random() < 0.02 else 0.0
+            proc['status'] = 'running' if proc['cpu_percent'] > 10 else 'sleeping'
+        ranked = {}
+        for key in ('memory_percent', 'cpu_percent'):
+            for proc in sorted(processes, key=lambda item: item[key], reverse=True)[:top_n]:
+                ranked[proc['pid']] = proc
+        yield [
+            {key: proc[key] for key in ('pid', 'name', 'status', 'cpu_percent', 'memory_percent', 'create_time')}
+            for proc in sorted(ranked.values(), key=lambda item: item['memory_percent'], reverse=True)
+        ]
+
+
+def _table_bytes(engine, tables) -> int:
+    """表及其索引占用的字节数（SQLite的dbstat虚拟表）"""
+    from sqlalchemy import text
+
+    with engine.connect() as connection:
+        return int(connection.execute(text(
+            "SELECT COALESCE(SUM(dbstat.pgsize), 0) FROM dbstat JOIN sqlite_master ON sqlite_master.name = dbstat.name "
+            f"WHERE sqlite_master.tbl_name IN ({', '.join(repr(table) for table in tables)})"
+        )).scalar())
+
+
+def benchmark_process_storage(iterations: int = 200, hours: int = 6) -> Dict[str, float]:
+    """对比每次采集保存完整进程排行（字符串名称和状态）与字典编码加增量记录的行数和存储空间"""
+    import os
+    import tempfile
+    from datetime import timedelta
+
+    from sqlalchemy import Column, DateTime, Float, Index, Integer, MetaData, String, Table, create_engine, insert
+
+    from app.config.config import Config
+    from app.database.models import Base, Collection
+    from app.database.process_store import ProcessStore
+    from app.utils.helpers import get_current_local_time
+
+    # 迁移前的进程表结构
+    legacy_metadata = MetaData()
+    legacy_table = Table(
+        'process_info', legacy_metadata,
+        Column('id', Integer, primary_key=True),
+        Column('collection_id', Integer, index=True),
+        Column('timestamp', DateTime),
+        Column('pid', Integer),
+        Column('name', String(100)),
+        Column('status', String(50)),
+        Column('cpu_percent', Float),
+        Column('memory_percent', Float),
+        Column('create_time', Float),
+        Index('ix_process_info_timestamp_memory', 'timestamp', 'memory_percent'),
+        Index('ix_process_info_timestamp_cpu', 'timestamp', 'cpu_percent'),
+    )
+
+    interval = Config.COLLECT_SYSTEM_DATA_INTERVAL
+    ticks = hours * 3600 // interval
+    start = get_current_local_time() - timedelta(hours=hours)
+    store = ProcessStore()
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_engine = create_engine(f"sqlite:///{os.path.join(directory, 'legacy.db')}")
+        delta_engine = create_engine(f"sqlite:///{os.path.join(directory, 'delta.db')}")
+        legacy_metadata.create_all(legacy_engine)
+        Base.metadata.create_all(delta_engine)
+        legacy_rows = delta_rows = 0
+        try:
+            with legacy_engine.begin() as legacy, delta_engine.begin() as delta:
+                for tick, processes in enumerate(_process_workload(ticks)):
+                    timestamp = start + timedelta(seconds=tick * interval)
+                    rows = [dict(proc, collection_id=tick + 1, timestamp=timestamp) for proc in processes]
+                    legacy.execute(insert(legacy_table), rows)
+                    legacy_rows += len(rows)
+
+                    collection_id = delta.execute(
+                        insert(Collection.__table__).values(timestamp=timestamp)
+                    ).inserted_primary_key[0]
+                    rows = store.encode(delta, collection_id, timestamp, processes)
+                    if rows:
+                        delta.execute(insert(Base.metadata.tables['process_info']), rows)
+                    delta_rows += len(rows)
+            legacy_bytes = _table_bytes(legacy_engine, ['process_info'])
+            delta_bytes = _table_bytes(delta_engine, ['process_info', 'process_name', 'process_status'])
+        finally:
+            legacy_engine.dispose()
+            delta_engine.dispose()
+
+    results = {
+        'legacy_rows': legacy_rows,
+        'delta_rows': delta_rows,
+        'legacy_bytes': legacy_bytes,
+        'delta_bytes': delta_bytes,
+    }
+    print(f"{hours} 小时 {ticks} 次采集: 完整排行 {legacy_rows} 行 {legacy_bytes / 1024:.0f} KiB, "
+          f"字典编码加增量 {delta_rows} 行 {delta_bytes / 1024:.0f} KiB "
+          f"(行数 {legacy_rows / delta_rows:.1f}x, 空间 {legacy_bytes / delta_bytes:.1f}x)")
+    return results
+
+
+def benchmark_recent_trends(iterations: int = 200) -> Dict[str, float]:
+    """对比最近1小时的CPU和磁盘趋势从数据库查询与从内存环形缓冲区切片的耗时"""
+    import os
+    import tempfile
+    from datetime import timedelta
+
+    from app.config.config import Config
+    from app.database.database_manager import DatabaseManager
+    from app.database.models import Base
+    from app.monitoring.ring_buffer import RecentMetrics
+    from app.utils.helpers import arrays_to_points, get_current_local_time, trend_window
+
+    interval = Config.COLLECT_SYSTEM_DATA_INTERVAL
+    now = get_current_local_time()
+    snapshots = []
+    for i in range(3600 // interval):
+        snapshot = _sample_snapshot()
+        snapshot.timestamp = now - timedelta(seconds=3600 - i * interval)
+        snapshot.process_info = None
+        snapshots.append(snapshot)
+    recent = RecentMetrics(3600, interval)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+        Base.metadata.create_all(db_manager.engine)
+        try:
+            db_manager.save_snapshots(snapshots)
+            recent.warm(db_manager)
+
+            def read_database():
+                start, end, points = trend_window(None, None, 1, Config.TREND_MAX_POINTS)
+                arrays_to_points(db_manager.storage.range('system', ('cpu_percent',), start, end, points), ('cpu_percent',))
+                for series in db_manager.storage.range('disk', ('percent',), start, end, points).values():
+                    arrays_to_points(series, ('percent',))
+
+            def read_buffer():
+                start, end, points = trend_window(None, None, 1, Config.TREND_MAX_POINTS)
+                recent.system_series(('cpu_percent',), start, end, points)
+                recent.disk_series(start, end, points)
+
+            database_ms = _measure(read_database, iterations)
+            buffer_ms = _measure(read_buffer, iterations)
+        finally:
+            db_manager.engine.dispose()
+
+    results = {'database_ms': database_ms, 'buffer_ms': buffer_ms}
+    print(f"最近1小时CPU和 {len(snapshots[0].disk_info)} 个磁盘的趋势（{len(snapshots)} 次采集）: "
+          f"数据库查询 {database_ms:.3f} ms, 环形缓冲区 {buffer_ms:.3f} ms ({database_ms / buffer_ms:.1f}x)")
+    return results
+
+
+def benchmark_latest_endpoints(iterations: int = 200) -> Dict[str, float]:
+    """对比系统信息和磁盘信息接口从数据库查询最新数据与返回预先序列化字节的耗时"""
+    import os
+    import tempfile
+    from datetime import timedelta
+
+    from flask import Flask
+
+    from app.api.handlers.disk_handler import DiskHandler
+    from app.api.handlers.system_handler import SystemHandler
+    from app.config.config import Config
+    from app.database.database_manager import DatabaseManager
+    from app.database.models import Base
+    from app.monitoring.latest_snapshot import LatestSnapshot
+    from app.utils.helpers import get_current_local_time
+
+    interval = Config.COLLECT_SYSTEM_DATA_INTERVAL
+    now = get_current_local_time()
+    snapshots = []
+    for i in range(3600 // interval):
+        snapshot = _sample_snapshot()
+        snapshot.timestamp = now - timedelta(seconds=3600 - i * interval)
+        snapshot.process_info = None
+        snapshots.append(snapshot)
+    latest = LatestSnapshot()
+    latest.publish(snapshots[-1])
+
+    app = Flask(__name__)
+    with tempfile.TemporaryDirectory() as directory, app.app_context():
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+        Base.metadata.create_all(db_manager.engine)
+        try:
+            db_manager.save_snapshots(snapshots)
+            system_handler = SystemHandler(db_manager)
+            disk_handler = DiskHandler(db_manager)
+
+            def read_database():
+                system_handler.get_system_info()
+                disk_handler.get_system_disk()
+
+            def read_published():
+                latest.response('system_info')
+                latest.response('system_disk')
+
+            database_ms = _measure(read_database, iterations)
+            published_ms = _measure(read_published, iterations)
+        finally:
+            db_manager.engine.dispose()
+
+    results = {'database_ms': database_ms, 'published_ms': published_ms}
+    print(f"系统信息和磁盘信息接口（{len(snapshots)} 次采集）: "
+          f"数据库查询 {database_ms:.3f} ms, 预先序列化 {published_ms:.3f} ms ({database_ms / published_ms:.1f}x)")
+    return results
+
+
+def benchmark_storage_engines(iterations: int = 200, days: int = 3) -> Dict[str, float]:
+    """用同一组操作对比SQL存储引擎与分段文件存储引擎：批量写入、最新数据、范围查询和时间范围统计"""
+    import os
+    import tempfile
+    from datetime import timedelta
+
+    from app.config.config import Config
+    from app.database.archive import ArchiveManager
+    from app.database.database_manager import DatabaseManager
+    from app.database.models import Base
+    from app.database.segment_store import SegmentStorageEngine
+    from app.database.storage import SQLStorageEngine
+    from app.monitoring.snapshot import CollectionSnapshot
+    from app.utils.helpers import get_current_local_time
+
+    interval = Config.COLLECT_SYSTEM_DATA_INTERVAL
+    now = get_current_local_time()
+    count = days * 86400 // interval
+    sample = _sample_snapshot()
+    snapshots = []
+    for i in range(count):
+        snapshot = CollectionSnapshot(now - timedelta(seconds=(count - i) * interval))
+        snapshot.system_info = dict(sample.system_info, cpu_percent=float(i % 100))
+        snapshot.disk_info = [dict(disk, percent=float((i + j) % 100)) for j, disk in enumerate(sample.disk_info)]
+        snapshots.append(snapshot)
+
+    fields = ('cpu_percent', 'memory_percent', 'load_avg_1', 'load_avg_5', 'load_avg_15')
+    hour_ago = now - timedelta(hours=1)
+    start = now - timedelta(days=days)
+    points = Config.TREND_MAX_POINTS
+    operations = {
+        'latest': lambda engine: (engine.latest('system'), engine.latest('disk')),
+        'range_raw_1h': lambda engine: (
+            engine.range('system', fields, hour_ago, now, 0), engine.range('disk', ('percent',), hour_ago, now, 0)
+        ),
+        'range_history': lambda engine: (
+            engine.range('system', fields, start, now, points), engine.range('disk', ('percent',), start, now, points)
+        ),
+        'aggregate': lambda engine: (
+            engine.aggregate('system', fields, start, now), engine.peak('disk', 'percent', start, now)
+        ),
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        db_manager = DatabaseManager(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+        Base.metadata.create_all(db_manager.engine)
+        try:
+            engines = [
+                SQLStorageEngine(db_manager, ArchiveManager(db_manager, directory=os.path.join(directory, 'archive'))),
+                SegmentStorageEngine(db_manager, directory=os.path.join(directory, 'segments'))
+            ]
+            for engine in engines:
+                started = time.perf_counter()
+                for offset in range(0, count, Config.WRITE_BUFFER_BATCH_SIZE):
+                    engine.write_snapshots(snapshots[offset:offset + Config.WRITE_BUFFER_BATCH_SIZE])
+                results[f'{engine.name}_snapshots_per_sec'] = count / (time.perf_counter() - started)
+                for name, operation in operations.items():
+                    results[f'{engine.name}_{name}_ms'] = _measure(lambda: operation(engine), iterations)
+        finally:
+            db_manager.engine.dispose()
+
+    print(f"{days} 天 {count} 次采集（每次 {len(sample.disk_info)} 个磁盘），"
+          f"每批 {Config.WRITE_BUFFER_BATCH_SIZE} 次写入:")
+    print(f"  写入: SQL {results['sql_snapshots_per_sec']:.0f} 次/秒, "
+          f"分段文件 {results['segment_snapshots_per_sec']:.0f} 次/秒 "
+          f"({results['segment_snapshots_per_sec'] / results['sql_snapshots_per_sec']:.1f}x)")
+    for name in operations:
+        sql_ms, segment_ms = results[f'sql_{name}_ms'], results[f'segment_{name}_ms']
+        print(f"  {name}: SQL {sql_ms:.3f} ms, 分段文件 {segment_ms:.3f} ms ({sql_ms / segment_ms:.1f}x)")
+    return results
+
+
+BENCHMARKS = {
+    'proc_reader': benchmark_proc_reader,
+    'snapshot_writes': benchmark_snapshot_writes,
+    'archive_reads': benchmark_archive_reads,
+    'process_storage': benchmark_process_storage,
+    'recent_trends': benchmark_recent_trends,
+    'latest_endpoints': benchmark_latest_endpoints,
+    'storage_engines': benchmark_storage_engines,
+}
+
+
+def main() -> None:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='采集与存储路径的性能基准测试')
+    parser.add_argument('names', nargs='*', help=f"要运行的基准测试（{', '.join(BENCHMARKS)}），默认全部运行")
+    parser.add_argument('--iterations', type=int, default=200, help='每项测试的执行次数')
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"未知的基准测试: {', '.join(unknown)}")
+
+    # 基准测试期间屏蔽采集器的INFO日志
+    logger.remove()
+    for name in args.names or BENCHMARKS:
+        print(f"== {name} ==")
+        BENCHMARKS[name](args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 # app/utils/helpers.py
 """工具函数模块"""
 
-from datetime import datetime
+from datetime import datetime, timedelta
 import time
-from typing import Union
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 
 def to_local_time(dt: Union[datetime, str, None]) -> Union[datetime, None]:
@@ -57,4 +59,74 @@ def get_current_local_time() -> datetime:
     Returns:
         当前本地时间的datetime对象
     """
-    return datetime.fromtimestamp(time.time())
\ No newline at end of file
+    return datetime.fromtimestamp(time.time())
+
+
+def trend_window(
+    hours: Optional[float],
+    points: Optional[int],
+    max_hours: float,
+    default_points: int
+) -> Tuple[datetime, datetime, int]:
+    """
+    解析趋势接口的时间范围和数据点数参数
+    
+    Args:
+        hours: 查询最近多少小时，为空或非正数时为1小时
+        points: 最大数据点数，为空或非正数时使用default_points
+        max_hours: 允许查询的最长时间范围（小时）
+        default_points: 默认的最大数据点数
+        
+    Returns:
+        时间范围起点、终点和最大数据点数
+    """
+    if hours is None or hours <= 0:
+        hours = 1
+    hours = min(hours, max_hours)
+    if points is None or points <= 0:
+        points = default_points
+    end = get_current_local_time()
+    return end - timedelta(hours=hours), end, points
+
+
+def downsample_arrays(
+    arrays: Dict[str, np.ndarray],
+    fields: Sequence[str],
+    start: datetime,
+    end: datetime,
+    points: int
+) -> Dict[str, np.ndarray]:
+    """
+    把 [start, end) 等分为points个时间桶，每个桶内的字段取平均值，时间戳取桶内第一条记录的时间
+    
+    输入为按时间升序的列数组（timestamp为datetime64[us]），记录数不超过points时原样返回，
+    否则使用 ``np.bincount`` 一次完成所有时间桶的聚合。
+    """
+    timestamps = arrays['timestamp']
+    if len(timestamps) <= points or points <= 0:
+        return arrays
+    bucket_us = max(int((end - start).total_seconds() * 1e6 / points), 1)
+    offsets = (timestamps - np.datetime64(start, 'us')).astype(np.int64)
+    index = np.clip(offsets // bucket_us, 0, points - 1)
+    buckets, first = np.unique(index, return_index=True)
+    result = {'timestamp': timestamps[first]}
+    for field in fields:
+        # 空值不计入平均值，时间桶内全部为空时结果为NaN（与汇总数据的规则一致）
+        values = np.asarray(arrays[field], dtype=np.float64)
+        valid = ~np.isnan(values)
+        sums = np.bincount(index, weights=np.where(valid, values, 0.0), minlength=points)[buckets]
+        counts = np.bincount(index, weights=valid, minlength=points)[buckets]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[field] = np.round(np.where(counts > 0, sums / counts, np.nan), 2)
+    return result
+
+
+def arrays_to_points(series: Dict[str, np.ndarray], fields: Sequence[str]) -> List[Dict]:
+    """把列数组形式的时间序列转换为接口返回的字典列表（空值转换为None）"""
+    # 时间戳一次性格式化为ISO字符串（总是带微秒），不逐行创建datetime对象
+    columns = [np.datetime_as_string(series['timestamp'].astype('datetime64[us]'), unit='us').tolist()]
+    for field in fields:
+        array = np.round(series[field].astype(np.float64), 2)
+        columns.append(np.where(np.isnan(array), None, array).tolist())
+    keys = ('timestamp',) + tuple(fields)
+    return [dict(zip(keys, row)) for row in zip(*columns)]
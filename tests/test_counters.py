@@ -0,0 +1,34 @@
+# tests/test_counters.py
+"""累计计数器：重置与32位回绕"""
+
+import unittest
+
+from app.monitoring.counters import COUNTER_32BIT_MAX, CounterRateTracker
+
+
+class CounterRateTrackerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tracker = CounterRateTracker()
+
+    def test_rate(self):
+        self.assertIsNone(self.tracker.update('eth0', {'bytes': 100}, now=0.0))
+        self.assertEqual(self.tracker.update('eth0', {'bytes': 300}, now=2.0), ({'bytes': 200}, 2.0))
+
+    def test_decrease_is_reset(self):
+        self.tracker.update('eth0', {'bytes': 5_000_000}, now=0.0)
+        self.assertIsNone(self.tracker.update('eth0', {'bytes': 1_000}, now=1.0))
+        # 重置后以新的读数为基准
+        self.assertEqual(self.tracker.update('eth0', {'bytes': 1_500}, now=2.0), ({'bytes': 500}, 1.0))
+
+    def test_32bit_wrap_near_limit(self):
+        self.tracker.update('eth0', {'bytes': COUNTER_32BIT_MAX - 100}, now=0.0)
+        self.assertEqual(self.tracker.update('eth0', {'bytes': 50}, now=1.0), ({'bytes': 150}, 1.0))
+
+    def test_64bit_counter_decrease_is_reset(self):
+        self.tracker.update('eth0', {'bytes': COUNTER_32BIT_MAX * 3}, now=0.0)
+        self.assertIsNone(self.tracker.update('eth0', {'bytes': 10}, now=1.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
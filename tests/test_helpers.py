@@ -0,0 +1,39 @@
+# tests/test_helpers.py
+"""列数组形式时间序列的降采样"""
+
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.utils.helpers import arrays_to_points, downsample_arrays
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+class DownsampleArraysTest(unittest.TestCase):
+
+    def test_nan_values_are_skipped(self):
+        timestamps = np.array([START + timedelta(seconds=second) for second in range(6)], dtype='datetime64[us]')
+        arrays = {
+            'timestamp': timestamps,
+            'cpu_percent': np.array([10.0, 20.0, 30.0, 40.0, 50.0, 60.0]),
+            # 迁移前的记录和旧的归档分段没有平均负载
+            'load_avg_1': np.array([np.nan, 2.0, 4.0, np.nan, np.nan, np.nan]),
+        }
+
+        result = downsample_arrays(arrays, ('cpu_percent', 'load_avg_1'), START, START + timedelta(seconds=6), 2)
+
+        self.assertEqual(result['timestamp'].tolist(), [START, START + timedelta(seconds=3)])
+        self.assertEqual(result['cpu_percent'].tolist(), [20.0, 50.0])
+        self.assertEqual(result['load_avg_1'][0], 3.0)
+        self.assertTrue(np.isnan(result['load_avg_1'][1]))
+        self.assertIsNone(arrays_to_points(result, ('load_avg_1',))[1]['load_avg_1'])
+
+    def test_few_records_are_returned_unchanged(self):
+        arrays = {'timestamp': np.array([START], dtype='datetime64[us]'), 'cpu_percent': np.array([np.nan])}
+        self.assertIs(downsample_arrays(arrays, ('cpu_percent',), START, START + timedelta(hours=1), 10), arrays)
+
+
+if __name__ == '__main__':
+    unittest.main()
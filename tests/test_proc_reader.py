@@ -0,0 +1,116 @@
+# tests/test_proc_reader.py
+"""/proc 快速读取器：使用 tests/fixtures/proc 样例目录"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from loguru import logger
+
+from app.monitoring import proc_reader
+from app.monitoring.mount_table import MountTable
+from app.monitoring.proc_reader import ProcFile, ProcReader
+
+FIXTURE_ROOT = os.path.join(os.path.dirname(__file__), 'fixtures', 'proc')
+PAGE_SIZE = 4096
+
+
+def _one_page_preadv(real_preadv):
+    """模拟seq_file：每次读取最多返回一页"""
+    def preadv(fd, buffers, offset):
+        return real_preadv(fd, [memoryview(buffers[0])[:PAGE_SIZE]], offset)
+    return preadv
+
+
+@unittest.skipUnless(hasattr(os, 'preadv'), '当前平台没有os.preadv')
+class ProcReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.reader = ProcReader(FIXTURE_ROOT)
+
+    def tearDown(self):
+        self.reader.close()
+
+    def _mountinfo_lines(self):
+        with open(os.path.join(FIXTURE_ROOT, 'self', 'mountinfo'), encoding='utf-8') as f:
+            return [line for line in f.read().splitlines() if line]
+
+    def test_mountinfo_fixture_is_larger_than_a_page(self):
+        self.assertGreater(os.path.getsize(os.path.join(FIXTURE_ROOT, 'self', 'mountinfo')), PAGE_SIZE)
+
+    def test_read_mountinfo_with_short_reads(self):
+        with mock.patch.object(proc_reader.os, 'preadv', _one_page_preadv(os.preadv)):
+            mounts = self.reader.read_mountinfo()
+        self.assertEqual(len(mounts), len(self._mountinfo_lines()))
+        self.assertEqual(mounts[-1]['fstype'], 'overlay')
+
+    def test_read_mountinfo_unescapes_mountpoint(self):
+        mounts = {mount['mountpoint']: mount for mount in self.reader.read_mountinfo()}
+        self.assertIn('/mnt/backup disk', mounts)
+        self.assertEqual(mounts['/mnt/backup disk']['device'], '/dev/sdc1')
+        self.assertEqual(mounts['/data']['fstype'], 'xfs')
+
+    def test_read_mountinfo_warns_when_lines_are_skipped(self):
+        proc_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, proc_root)
+        os.makedirs(os.path.join(proc_root, 'self'))
+        with open(os.path.join(proc_root, 'self', 'mountinfo'), 'w', encoding='utf-8') as f:
+            f.write('22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw\n')
+            f.write('23 22 8:17 / /data rw,relatime shared:2\n')
+
+        messages = []
+        sink_id = logger.add(messages.append, level='WARNING', format='{message}')
+        reader = ProcReader(proc_root)
+        try:
+            mounts = reader.read_mountinfo()
+        finally:
+            reader.close()
+            logger.remove(sink_id)
+
+        self.assertEqual([mount['mountpoint'] for mount in mounts], ['/'])
+        self.assertEqual(len(messages), 1)
+        self.assertIn('共 2 行，只解析出 1 个挂载点', messages[0])
+
+    def test_mount_table_keeps_physical_mounts(self):
+        mount_table = MountTable(
+            self.reader, include_fstypes=[], exclude_fstypes=[],
+            include_mountpoints=[], exclude_mountpoints=[]
+        )
+        with mock.patch.object(proc_reader.os, 'preadv', _one_page_preadv(os.preadv)):
+            mounts = mount_table.get_mounts()
+        self.assertEqual(
+            sorted(mount['mountpoint'] for mount in mounts), ['/', '/data', '/mnt/backup disk']
+        )
+
+    def test_proc_file_grows_buffer_across_short_reads(self):
+        proc_file = ProcFile(os.path.join(FIXTURE_ROOT, 'self', 'mountinfo'), buffer_size=1024)
+        try:
+            with mock.patch.object(proc_reader.os, 'preadv', _one_page_preadv(os.preadv)):
+                content = proc_file.read()
+        finally:
+            proc_file.close()
+        with open(os.path.join(FIXTURE_ROOT, 'self', 'mountinfo'), 'rb') as f:
+            self.assertEqual(content, f.read())
+
+    def test_read_stat(self):
+        per_cpu_times, boot_time = self.reader.read_stat()
+        self.assertEqual(len(per_cpu_times), 2)
+        self.assertEqual(boot_time, 1700000000.0)
+        self.assertAlmostEqual(per_cpu_times[0]['user'], 2300 / self.reader.clock_ticks)
+
+    def test_read_meminfo(self):
+        meminfo = self.reader.read_meminfo()
+        self.assertEqual(meminfo['MemTotal'], 16384000 * 1024)
+        self.assertEqual(meminfo['HugePages_Total'], 0)
+
+    def test_read_loadavg(self):
+        self.assertEqual(self.reader.read_loadavg(), (0.52, 0.41, 0.30))
+
+    def test_physical_fstypes(self):
+        self.assertEqual(self.reader.physical_fstypes(), frozenset({'ext4', 'xfs'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
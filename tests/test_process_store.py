@@ -0,0 +1,103 @@
+# tests/test_process_store.py
+"""进程排行按关键帧和增量保存，任一时刻都能重建出当时的排行"""
+
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.database.models import Base, Collection, ProcessInfo
+from app.database.process_store import ProcessStore
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _proc(pid, memory_percent, create_time=1.0, cpu_percent=1.0, status='sleeping'):
+    return {'pid': pid, 'name': f'proc-{pid}', 'status': status, 'cpu_percent': cpu_percent,
+            'memory_percent': memory_percent, 'create_time': create_time}
+
+
+class ProcessStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        Base.metadata.create_all(self.engine)
+        self.store = ProcessStore(cpu_delta=2.0, memory_delta=0.5, keyframe_interval=60)
+
+    def _write(self, seconds, processes):
+        timestamp = START + timedelta(seconds=seconds)
+        with self.engine.begin() as connection:
+            collection_id = connection.execute(
+                insert(Collection.__table__).values(timestamp=timestamp)
+            ).inserted_primary_key[0]
+            rows = self.store.encode(connection, collection_id, timestamp, processes)
+            if rows:
+                connection.execute(insert(ProcessInfo.__table__), rows)
+        return rows
+
+    def _ranking(self, at=None):
+        with Session(self.engine) as session:
+            timestamp, processes = self.store.snapshot_at(session, at)
+        return timestamp, [(proc['pid'], proc['create_time'], proc['memory_percent']) for proc in processes]
+
+    def test_reconstructs_every_collection(self):
+        history = [
+            (0, [_proc(1, 10.0), _proc(2, 5.0), _proc(3, 1.0)]),
+            # 2的内存变化超过阈值，3离开排行，4进入排行
+            (10, [_proc(1, 10.0), _proc(2, 8.0), _proc(4, 2.0)]),
+            (20, [_proc(1, 12.0), _proc(2, 8.0)]),
+            # 关键帧
+            (70, [_proc(1, 12.0), _proc(2, 8.0)]),
+            # PID 3被新进程复用
+            (80, [_proc(1, 12.0), _proc(3, 9.0, create_time=75.0), _proc(2, 8.0)]),
+        ]
+        written = [self._write(seconds, processes) for seconds, processes in history]
+
+        # 只有第一次和关键帧写入全部进程，之后只写入变化和离开排行的记录
+        self.assertTrue(all(row['is_keyframe'] for row in written[0] + written[3]))
+        self.assertEqual(len(written[1]), 3)
+        self.assertEqual(len(written[4]), 1)
+
+        for seconds, processes in history:
+            at = START + timedelta(seconds=seconds)
+            expected = sorted(((proc['pid'], proc['create_time'], proc['memory_percent']) for proc in processes),
+                              key=lambda item: item[2], reverse=True)
+            with self.subTest(seconds=seconds):
+                self.assertEqual(self._ranking(at), (at, expected))
+                # 两次采集之间的时刻得到前一次采集的排行
+                self.assertEqual(self._ranking(at + timedelta(seconds=5)), (at, expected))
+
+        self.assertEqual(self._ranking()[1], [(1, 1.0, 12.0), (3, 75.0, 9.0), (2, 1.0, 8.0)])
+
+    def test_small_changes_keep_previous_values(self):
+        self._write(0, [_proc(1, 10.0)])
+        self.assertEqual(self._write(10, [_proc(1, 10.2, cpu_percent=2.0)]), [])
+        self.assertEqual(self._ranking()[1], [(1, 1.0, 10.0)])
+
+    def test_close_processes_swapping_order_are_written(self):
+        self._write(0, [_proc(2, 10.2), _proc(1, 10.0)])
+        # 两个进程的变化都未超过阈值，但名次交换了
+        rows = self._write(10, [_proc(1, 10.3), _proc(2, 10.2)])
+        self.assertEqual(sorted(row['pid'] for row in rows), [1, 2])
+        self.assertEqual(self._ranking()[1], [(1, 1.0, 10.3), (2, 1.0, 10.2)])
+
+    def test_order_kept_without_swap(self):
+        self._write(0, [_proc(2, 10.2), _proc(1, 10.0), _proc(3, 5.0)])
+        # 名次未变，旧值的先后仍然正确
+        self.assertEqual(self._write(10, [_proc(2, 10.4), _proc(1, 10.1), _proc(3, 5.0)]), [])
+
+    def test_reset_starts_with_keyframe(self):
+        self._write(0, [_proc(1, 10.0)])
+        self.store.reset()
+        rows = self._write(10, [_proc(1, 10.0)])
+        self.assertEqual(len(rows), 1)
+        self.assertTrue(rows[0]['is_keyframe'])
+
+    def test_before_first_keyframe(self):
+        self._write(10, [_proc(1, 10.0)])
+        self.assertEqual(self._ranking(START), (None, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
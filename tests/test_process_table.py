@@ -0,0 +1,43 @@
+# tests/test_process_table.py
+"""进程表缓存：PID被复用时重新建立缓存条目"""
+
+import os
+import unittest
+
+import psutil
+
+from app.monitoring.process_table import ProcessEntry, ProcessTable
+
+
+def _stale_entry(pid: int) -> ProcessEntry:
+    """模拟该PID上已退出的旧进程：句柄的创建时间早于当前进程"""
+    process = psutil.Process(pid)
+    create_time = process.create_time() - 60
+    process._ident = (pid, process._ident[1] - 60)
+    return ProcessEntry(process, create_time, 'old')
+
+
+class ProcessTableTest(unittest.TestCase):
+
+    def test_entry_detects_reused_pid(self):
+        memory_total = psutil.virtual_memory().total
+        process = psutil.Process(os.getpid())
+        self.assertTrue(ProcessEntry(process, process.create_time(), process.name()).update(0.0, memory_total))
+        self.assertFalse(_stale_entry(os.getpid()).update(0.0, memory_total))
+
+    def test_refresh_replaces_entry_of_reused_pid(self):
+        table = ProcessTable(top_n=5)
+        table.refresh()
+        pid = os.getpid()
+        current = table._entries[pid]
+        table._entries[pid] = _stale_entry(pid)
+
+        table.refresh()
+
+        entry = table._entries[pid]
+        self.assertEqual(entry.create_time, current.create_time)
+        self.assertEqual(entry.name, current.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
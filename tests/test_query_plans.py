@@ -0,0 +1,133 @@
+# tests/test_query_plans.py
+"""接口和周报使用的时序查询在SQLite上命中预期的索引（EXPLAIN QUERY PLAN）"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+from unittest import mock
+
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from loguru import logger
+from sqlalchemy import desc, func
+from sqlalchemy.dialects import sqlite
+
+from app.config.config import Config
+from app.database.database_manager import DatabaseManager
+from app.database.models import (
+    Base, Collection, SystemInfo, DiskInfo, ProcessInfo, ProcessName, ProcessStatus, DiskIOInfo, NetworkInfo,
+    SystemRollup1h, DiskRollup1h
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _handler_queries() -> Dict[str, Tuple[Callable, str]]:
+    """与各处理器查询形状一致的查询（参数为会话）及其应使用的索引"""
+    now = datetime.now()
+    hour_ago = now - timedelta(hours=1)
+    week_ago = now - timedelta(days=7)
+    two_weeks_ago = now - timedelta(days=14)
+
+    return {
+        '最新系统信息': (lambda s: s.query(SystemInfo).order_by(desc(SystemInfo.timestamp)).limit(1),
+                   'ix_system_info_timestamp_cpu_memory'),
+        'CPU趋势': (lambda s: s.query(SystemInfo.timestamp, SystemInfo.cpu_percent)
+                  .filter(SystemInfo.timestamp >= hour_ago).order_by(SystemInfo.timestamp),
+                  'ix_system_info_timestamp_cpu_memory'),
+        '平均负载趋势': (lambda s: s.query(
+            SystemInfo.timestamp, SystemInfo.load_avg_1, SystemInfo.load_avg_5, SystemInfo.load_avg_15
+        ).filter(SystemInfo.timestamp >= hour_ago).order_by(SystemInfo.timestamp), 'ix_system_info_timestamp_cpu_memory'),
+        '周报上周内存平均值': (lambda s: s.query(func.avg(SystemInfo.memory_percent))
+                      .filter(SystemInfo.timestamp >= two_weeks_ago, SystemInfo.timestamp < week_ago),
+                      'ix_system_info_timestamp_cpu_memory'),
+        '最新磁盘采集批次': (lambda s: s.query(Collection.id, Collection.timestamp)
+                     .filter(Collection.id == s.query(func.max(DiskInfo.collection_id)).scalar_subquery()),
+                     'ix_disk_info_collection_id'),
+        '磁盘趋势': (lambda s: s.query(DiskInfo.timestamp, DiskInfo.device, DiskInfo.percent)
+                 .filter(DiskInfo.timestamp >= hour_ago).order_by(DiskInfo.timestamp), 'ix_disk_info_timestamp'),
+        '周报磁盘最高使用率记录': (lambda s: s.query(DiskInfo)
+                        .filter(DiskInfo.timestamp >= week_ago).order_by(desc(DiskInfo.percent)).limit(1),
+                        'ix_disk_info_timestamp'),
+        '进程排行关键帧': (lambda s: s.query(ProcessInfo.timestamp)
+                    .filter(ProcessInfo.is_keyframe, ProcessInfo.timestamp <= now)
+                    .order_by(desc(ProcessInfo.timestamp)).limit(1), 'ix_process_info_keyframe_timestamp'),
+        '进程排行变化记录': (lambda s: s.query(ProcessInfo.id, ProcessName.name, ProcessStatus.status)
+                     .outerjoin(ProcessName, ProcessInfo.name_id == ProcessName.id)
+                     .outerjoin(ProcessStatus, ProcessInfo.status_id == ProcessStatus.id)
+                     .filter(ProcessInfo.timestamp >= hour_ago, ProcessInfo.timestamp <= now)
+                     .order_by(ProcessInfo.timestamp, ProcessInfo.id), 'ix_process_info_timestamp'),
+        '进程排行采集时间': (lambda s: s.query(Collection.timestamp)
+                     .filter(Collection.timestamp <= now).order_by(desc(Collection.timestamp)).limit(1),
+                     'ix_collection_timestamp'),
+        '单设备磁盘I/O趋势': (lambda s: s.query(DiskIOInfo)
+                       .filter(DiskIOInfo.timestamp >= hour_ago, DiskIOInfo.device == 'sda')
+                       .order_by(DiskIOInfo.timestamp), 'ix_disk_io_info_device_timestamp'),
+        '网络流量趋势': (lambda s: s.query(NetworkInfo)
+                   .filter(NetworkInfo.timestamp >= hour_ago).order_by(NetworkInfo.timestamp),
+                   'ix_network_info_timestamp'),
+        '单网卡网络流量趋势': (lambda s: s.query(NetworkInfo)
+                      .filter(NetworkInfo.timestamp >= hour_ago, NetworkInfo.interface == 'eth0')
+                      .order_by(NetworkInfo.timestamp), 'ix_network_info_interface_timestamp'),
+        '汇总系统平均值': (lambda s: s.query(
+            func.sum(SystemRollup1h.cpu_percent_sum) / func.sum(SystemRollup1h.cpu_percent_count),
+            func.max(SystemRollup1h.cpu_percent_max)
+        ).filter(SystemRollup1h.timestamp >= week_ago, SystemRollup1h.timestamp < now), 'ix_system_rollup_1h_timestamp'),
+        '汇总磁盘趋势': (lambda s: s.query(DiskRollup1h.timestamp, DiskRollup1h.device,
+                                     DiskRollup1h.percent_sum / DiskRollup1h.percent_count)
+                   .filter(DiskRollup1h.timestamp >= week_ago, DiskRollup1h.timestamp <= now)
+                   .order_by(DiskRollup1h.timestamp), 'ix_disk_rollup_1h_timestamp'),
+    }
+
+
+def _explain(db_manager: DatabaseManager, query) -> List[str]:
+    """返回查询的执行计划（每个步骤一行）"""
+    compiled = query.statement.compile(dialect=sqlite.dialect())
+    params = [
+        str(value) if isinstance(value, datetime) else value
+        for value in (compiled.params[name] for name in compiled.positiontup)
+    ]
+    connection = db_manager.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"EXPLAIN QUERY PLAN {compiled}", params)
+        return [row[-1] for row in cursor.fetchall()]
+    finally:
+        connection.close()
+
+
+class QueryPlanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        logger.disable('app')
+        self.addCleanup(logger.enable, 'app')
+
+    def _assert_indexes_used(self, db_manager: DatabaseManager):
+        with db_manager.get_session() as session:
+            for name, (build, index) in _handler_queries().items():
+                plan = '; '.join(_explain(db_manager, build(session)))
+                with self.subTest(query=name):
+                    self.assertRegex(plan, rf'USING (COVERING )?INDEX {index}\b')
+
+    def test_models(self):
+        db_manager = DatabaseManager('sqlite:///' + os.path.join(self.directory, 'models.db'))
+        Base.metadata.create_all(db_manager.engine)
+        self._assert_indexes_used(db_manager)
+
+    def test_migrations(self):
+        database_url = 'sqlite:///' + os.path.join(self.directory, 'migrated.db')
+        # 不读取alembic.ini，避免其中的日志配置输出到测试结果
+        alembic_config = AlembicConfig()
+        alembic_config.set_main_option('script_location', os.path.join(ROOT, 'alembic'))
+        with mock.patch.object(Config, 'SQLALCHEMY_DATABASE_URI', database_url):
+            command.upgrade(alembic_config, 'head')
+        self._assert_indexes_used(DatabaseManager(database_url))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+# tests/test_retention.py
+"""过期数据清理：进程排行按关键帧对齐，保留策略按表覆盖默认值"""
+
+import os
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from loguru import logger
+from sqlalchemy import select
+
+from app.config import config
+from app.database.database_manager import DatabaseManager
+from app.database.models import Base, ProcessInfo
+from app.database.retention import RetentionManager
+from app.utils.helpers import get_current_local_time
+
+
+class RetentionManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db_manager = DatabaseManager('sqlite://')
+        Base.metadata.create_all(self.db_manager.engine)
+        self.now = get_current_local_time().replace(microsecond=0)
+        logger.disable('app.database.retention')
+        self.addCleanup(logger.enable, 'app.database.retention')
+
+    def _add_process_rows(self, rows):
+        with self.db_manager.engine.begin() as connection:
+            connection.execute(ProcessInfo.__table__.insert(), [
+                {'timestamp': self.now - timedelta(days=days), 'pid': 1, 'create_time': 1.0,
+                 'cpu_percent': 1.0, 'memory_percent': 1.0, 'is_keyframe': is_keyframe}
+                for days, is_keyframe in rows
+            ])
+
+    def _remaining_days(self):
+        with self.db_manager.engine.connect() as connection:
+            timestamps = connection.execute(select(ProcessInfo.timestamp).order_by(ProcessInfo.timestamp)).scalars()
+            return [round((self.now - timestamp).total_seconds() / 86400, 1) for timestamp in timestamps]
+
+    def test_process_cutoff_aligns_to_keyframe(self):
+        self._add_process_rows([(5, True), (4.5, False), (3, True), (2.5, False), (1, False)])
+
+        report = RetentionManager(self.db_manager, {'process_info': 2}, batch_pause=0).run()
+
+        # 2天前之后的增量依赖3天前的关键帧，关键帧及其后的增量都保留
+        self.assertEqual(self._remaining_days(), [3.0, 2.5, 1.0])
+        self.assertEqual(report['tables']['process_info']['deleted'], 2)
+        self.assertEqual(report['tables']['process_info']['cutoff'], (self.now - timedelta(days=3)).isoformat())
+
+    def test_process_rows_without_keyframe_use_cutoff(self):
+        self._add_process_rows([(4, False), (1, True), (0.5, False)])
+
+        RetentionManager(self.db_manager, {'process_info': 2}, batch_pause=0).run()
+
+        self.assertEqual(self._remaining_days(), [1.0, 0.5])
+
+    def test_retention_days_env_overrides_defaults(self):
+        with mock.patch.dict(os.environ, {'RETENTION_DAYS': 'process_info=7, alert_record=0'}):
+            policies = config._split_env_mapping('RETENTION_DAYS', 'process_info=2,system_info=14,alert_record=365')
+        self.assertEqual(policies, {'process_info': 7.0, 'system_info': 14.0, 'alert_record': 0.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# tests/test_rollup.py
+"""汇总数据：缺失的值不参与汇总"""
+
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+
+from app.database.models import Base, SystemRollup1m
+from app.database.rollup import RollupManager
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _system(cpu_percent, load_avg_1=None):
+    return {'cpu_percent': cpu_percent, 'memory_percent': 50.0, 'load_avg_1': load_avg_1,
+            'load_avg_5': None, 'load_avg_15': None}
+
+
+class RollupManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        Base.metadata.create_all(self.engine)
+        self.rollups = RollupManager(summary_min_buckets=1)
+
+    def _apply(self, samples):
+        with self.engine.begin() as connection:
+            self.rollups.apply(connection, samples)
+
+    def _bucket(self):
+        with self.engine.connect() as connection:
+            return connection.execute(select(SystemRollup1m)).one()
+
+    def test_missing_values_stay_null(self):
+        self._apply([(START, _system(10.0), None), (START + timedelta(seconds=10), _system(None), None)])
+
+        bucket = self._bucket()
+        self.assertEqual(bucket.count, 2)
+        self.assertEqual((bucket.cpu_percent_min, bucket.cpu_percent_max, bucket.cpu_percent_count), (10.0, 10.0, 1))
+        self.assertIsNone(bucket.load_avg_1_sum)
+        self.assertIsNone(bucket.load_avg_1_min)
+        self.assertEqual(bucket.load_avg_1_count, 0)
+
+    def test_upsert_merges_with_null_fields(self):
+        self._apply([(START, _system(10.0), None)])
+        self._apply([(START + timedelta(seconds=10), _system(30.0, load_avg_1=2.0), None)])
+        self._apply([(START + timedelta(seconds=20), _system(None, load_avg_1=4.0), None)])
+
+        bucket = self._bucket()
+        self.assertEqual(bucket.count, 3)
+        self.assertEqual((bucket.cpu_percent_sum, bucket.cpu_percent_count), (40.0, 2))
+        self.assertEqual((bucket.load_avg_1_min, bucket.load_avg_1_max, bucket.load_avg_1_sum), (2.0, 4.0, 6.0))
+        self.assertEqual(bucket.load_avg_1_count, 2)
+
+        with self.engine.connect() as connection:
+            rows = self.rollups.series_rows(connection, 'system', ('cpu_percent', 'load_avg_5'), START,
+                                            START + timedelta(minutes=1), 60)
+            summary = self.rollups.summary(connection, 'system', ('cpu_percent', 'load_avg_1', 'load_avg_5'),
+                                           START, START + timedelta(minutes=1), 60)
+        self.assertEqual(rows[0].cpu_percent, 20.0)
+        self.assertIsNone(rows[0].load_avg_5)
+        self.assertEqual(summary['cpu_percent_avg'], 20.0)
+        self.assertEqual(summary['load_avg_1_avg'], 3.0)
+        self.assertIsNone(summary['load_avg_5_avg'])
+        self.assertIsNone(summary['load_avg_5_max'])
+
+
+if __name__ == '__main__':
+    unittest.main()
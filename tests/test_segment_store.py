@@ -0,0 +1,77 @@
+# tests/test_segment_store.py
+"""分段文件存储引擎：写入失败时分段文件和进程排行都不保留部分结果"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+
+from app.database.database_manager import DatabaseManager
+from app.database.models import Base, ProcessInfo
+from app.database.process_store import process_store
+from app.database.segment_store import SegmentStorageEngine
+from app.monitoring.snapshot import CollectionSnapshot
+from app.utils.helpers import get_current_local_time
+
+
+class SegmentStorageEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.db_manager = DatabaseManager('sqlite:///' + os.path.join(self.directory, 'monitor.db'))
+        Base.metadata.create_all(self.db_manager.engine)
+        process_store.reset()
+        self.addCleanup(process_store.reset)
+        logger.disable('app.database')
+        self.addCleanup(logger.enable, 'app.database')
+        self.engine = SegmentStorageEngine(self.db_manager, os.path.join(self.directory, 'segments'), 0, 0)
+        self.now = get_current_local_time().replace(microsecond=0)
+
+    def _snapshot(self, offset: int) -> CollectionSnapshot:
+        snapshot = CollectionSnapshot(self.now + timedelta(seconds=offset))
+        snapshot.system_info = {'cpu_percent': 10.0, 'memory_percent': 20.0, 'load_average': (1.0, 0.5, 0.2)}
+        snapshot.process_info = [{'pid': 1, 'name': 'init', 'status': 'sleeping', 'cpu_percent': 0.1,
+                                  'memory_percent': 0.2 + offset * 10, 'create_time': 1.0}]
+        return snapshot
+
+    def _segment_size(self) -> int:
+        return os.path.getsize(self.engine._path('system', self.now.date()))
+
+    def _process_rows(self) -> int:
+        with self.db_manager.engine.connect() as connection:
+            return connection.execute(select(func.count()).select_from(ProcessInfo)).scalar()
+
+    def test_failed_process_write_truncates_segments(self):
+        self.engine.write_snapshots([self._snapshot(0)])
+        size = self._segment_size()
+
+        error = OperationalError('INSERT', {}, Exception('database is locked'))
+        with mock.patch.object(self.engine._processes, 'write_snapshots', side_effect=error):
+            with self.assertRaises(OperationalError):
+                self.engine.write_snapshots([self._snapshot(1)])
+
+        self.assertEqual(self._segment_size(), size)
+        # 重放整批快照时数值序列不会重复
+        self.engine.write_snapshots([self._snapshot(1)])
+        self.assertEqual(len(self.engine.range('system', ('cpu_percent',), self.now, self.now + timedelta(seconds=5), 0)['timestamp']), 2)
+
+    def test_failed_append_writes_no_process_rows(self):
+        self.engine.write_snapshots([self._snapshot(0)])
+        rows = self._process_rows()
+
+        with mock.patch.object(self.engine, '_append', side_effect=OSError('No space left on device')):
+            with self.assertRaises(OSError):
+                self.engine.write_snapshots([self._snapshot(1)])
+
+        self.assertEqual(self._process_rows(), rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
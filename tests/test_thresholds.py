@@ -0,0 +1,73 @@
+# tests/test_thresholds.py
+"""阈值检查：预警在后台线程中保存和发送，采集缺失时保持规则状态"""
+
+import threading
+import unittest
+from unittest import mock
+
+from loguru import logger
+
+from app.config.config import Config
+from app.monitoring.thresholds import ThresholdChecker
+
+
+class FakeDatabaseManager:
+    """记录保存的预警"""
+
+    def __init__(self):
+        self.alerts = []
+
+    def save_alert_record(self, alert_type, message, is_sent=0):
+        self.alerts.append((alert_type, message))
+
+
+class ThresholdCheckerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db_manager = FakeDatabaseManager()
+        self.checker = ThresholdChecker(self.db_manager)
+        self.addCleanup(self.checker.stop)
+        logger.disable('app.monitoring.thresholds')
+        self.addCleanup(logger.enable, 'app.monitoring.thresholds')
+
+    def _disk(self, percent):
+        return [{'device': '/dev/sda1', 'percent': percent}]
+
+    def test_alert_is_sent_off_the_collection_thread(self):
+        release = threading.Event()
+        sent = []
+
+        def send_alert(alert_type, message):
+            release.wait(5)
+            sent.append(message)
+
+        with mock.patch.object(self.checker, 'send_alert', send_alert):
+            self.checker.check_system_thresholds({'memory_percent': Config.MEMORY_THRESHOLD + 1}, None)
+            # 发送阻塞时采集线程已经返回
+            self.assertEqual(sent, [])
+            release.set()
+            self.checker.stop()
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(self.db_manager.alerts[0][0], 'memory')
+
+    def test_failed_disk_stage_keeps_breach_state(self):
+        with mock.patch.object(self.checker, 'send_alert'):
+            self.checker.check_system_thresholds(None, self._disk(Config.DISK_THRESHOLD + 1))
+            self.checker.check_system_thresholds(None, [])
+            self.checker.check_system_thresholds(None, self._disk(Config.DISK_THRESHOLD + 1))
+            self.checker.stop()
+        # 磁盘阶段失败不会重置状态，重复间隔内不会再次告警
+        self.assertEqual(len(self.db_manager.alerts), 1)
+        self.assertIn('disk:/dev/sda1', self.checker._breaches)
+
+    def test_recovered_disk_resets_breach_state(self):
+        with mock.patch.object(self.checker, 'send_alert'):
+            self.checker.check_system_thresholds(None, self._disk(Config.DISK_THRESHOLD + 1))
+            self.checker.check_system_thresholds(None, self._disk(0))
+            self.checker.check_system_thresholds(None, self._disk(Config.DISK_THRESHOLD + 1))
+            self.checker.stop()
+        self.assertEqual(len(self.db_manager.alerts), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
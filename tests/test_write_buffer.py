@@ -0,0 +1,140 @@
+# tests/test_write_buffer.py
+"""快照写入缓冲：溢出、重放和隔离无法写入的快照"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from loguru import logger
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.database.write_buffer import WriteBuffer
+from app.monitoring.snapshot import CollectionSnapshot
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _snapshot(index: int) -> CollectionSnapshot:
+    snapshot = CollectionSnapshot(START + timedelta(seconds=index))
+    snapshot.system_info = {'cpu_percent': float(index)}
+    return snapshot
+
+
+class FakeDatabaseManager:
+    """记录写入的快照，可以模拟数据库不可用和无法写入的快照"""
+
+    def __init__(self):
+        self.available = True
+        self.poison = set()
+        self.saved = []
+
+    def save_snapshots(self, snapshots):
+        if not self.available:
+            raise OperationalError('INSERT', {}, Exception('database is locked'))
+        for snapshot in snapshots:
+            if snapshot.timestamp in self.poison:
+                raise IntegrityError('INSERT', {}, Exception('UNIQUE constraint failed'))
+        self.saved.extend(snapshot.timestamp for snapshot in snapshots)
+
+
+class WriteBufferTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.db_manager = FakeDatabaseManager()
+        self.buffer = WriteBuffer(
+            self.db_manager,
+            max_size=100,
+            batch_size=3,
+            retry_interval=0,
+            spill_path=os.path.join(directory, 'snapshots.jsonl'),
+            max_attempts=3,
+            quarantine_path=os.path.join(directory, 'quarantine.jsonl')
+        )
+        logger.disable('app.database.write_buffer')
+        self.addCleanup(logger.enable, 'app.database.write_buffer')
+
+    def _read_lines(self, path):
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_spill_and_replay_keep_order(self):
+        self.db_manager.available = False
+        self.buffer._flush([_snapshot(0), _snapshot(1)])
+        self.buffer._flush([_snapshot(2)])
+        self.assertEqual(len(self._read_lines(self.buffer.spill_path)), 3)
+
+        self.db_manager.available = True
+        self.buffer._flush([_snapshot(3)])
+
+        self.assertEqual(self.db_manager.saved, [START + timedelta(seconds=i) for i in range(4)])
+        self.assertFalse(self.buffer._spill_pending())
+        self.assertEqual(self.buffer.replayed, 3)
+
+    def test_replay_failure_puts_remaining_back_in_order(self):
+        self.db_manager.available = False
+        self.buffer._flush([_snapshot(i) for i in range(3)])
+        self.buffer._flush([_snapshot(i) for i in range(3, 5)])
+
+        self.buffer._replay()
+        self.buffer._spill([_snapshot(5)])
+
+        timestamps = [line['timestamp'] for line in self._read_lines(self.buffer.spill_path)]
+        self.assertEqual(timestamps, [(START + timedelta(seconds=i)).isoformat() for i in range(6)])
+
+    def test_poison_snapshot_is_quarantined(self):
+        poison = START + timedelta(seconds=1)
+        self.db_manager.poison.add(poison)
+
+        self.buffer._flush([_snapshot(0), _snapshot(1), _snapshot(2)])
+        self.assertEqual(self.db_manager.saved, [START, START + timedelta(seconds=2)])
+        self.assertEqual(self._read_lines(self.buffer.spill_path)[0]['attempts'], 1)
+
+        # 之后的快照照常写入，无法写入的快照在重试达到上限后移入隔离文件
+        for index in range(3, 6):
+            self.buffer._flush([_snapshot(index)])
+
+        self.assertFalse(self.buffer._spill_pending())
+        self.assertNotIn(poison, self.db_manager.saved)
+        self.assertEqual(len(self.db_manager.saved), 5)
+        quarantined = self._read_lines(self.buffer.quarantine_path)
+        self.assertEqual(len(quarantined), 1)
+        self.assertEqual(quarantined[0]['timestamp'], poison.isoformat())
+        self.assertEqual(quarantined[0]['attempts'], 3)
+        self.assertIn('IntegrityError', quarantined[0]['error'])
+        self.assertEqual(self.buffer.quarantined, 1)
+
+    def test_transient_error_does_not_count_as_attempt(self):
+        self.db_manager.available = False
+        for _ in range(5):
+            self.buffer._flush([_snapshot(0)])
+            self.buffer._replay()
+
+        self.assertFalse(os.path.exists(self.buffer.quarantine_path))
+        self.assertTrue(all('attempts' not in line for line in self._read_lines(self.buffer.spill_path)))
+
+    def test_stop_flushes_whole_queue(self):
+        for index in range(10):
+            self.buffer.submit(_snapshot(index))
+
+        self.buffer.stop()
+
+        self.assertEqual(len(self.db_manager.saved), 10)
+        self.assertEqual(self.buffer._queue.qsize(), 0)
+
+    def test_stop_spills_whole_queue_when_database_is_down(self):
+        self.db_manager.available = False
+        for index in range(10):
+            self.buffer.submit(_snapshot(index))
+
+        self.buffer.stop()
+
+        self.assertEqual(len(self._read_lines(self.buffer.spill_path)), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()